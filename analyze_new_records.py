@@ -1,8 +1,12 @@
 import pandas as pd
 import os
 import glob
+import argparse
 from datetime import datetime
 
+from instrumentation import run_profiled
+from categories import category_name, rank_categories
+
 def get_pool_length(pool_val):
     """Extract pool length from the pool value."""
     if pd.isna(pool_val):
@@ -225,13 +229,9 @@ def compare_records(new_records, current_records):
         current_event = current_records[event_name]
         event_improvements = []
         
-        # Compare by category (Male_25m, Male_50m, Female_25m, Female_50m)
-        for category in ['Male_25m', 'Male_50m', 'Female_25m', 'Female_50m']:
-            # Filter new records for this category
-            gender = 'Male' if category.startswith('Male') else 'Female'
-            pool = '25m' if category.endswith('25m') else '50m'
-            
-            new_category_df = new_df[(new_df['Gender'] == gender) & (new_df['Pool'] == pool)].copy()
+        # Compare by category (Male_25m, Male_50m, Female_25m, Female_50m), split in one pass
+        for key, new_category_df in rank_categories(new_df).items():
+            category = category_name(key)
             
             if new_category_df.empty:
                 continue
@@ -311,6 +311,44 @@ def compare_records(new_records, current_records):
     
     return improvements
 
+def print_improvements(improvements):
+    """Print the improvements found by compare_records, per event."""
+    print("\n" + "=" * 80)
+    print("SUMMARY OF POTENTIAL IMPROVEMENTS")
+    print("=" * 80)
+    
+    if not improvements:
+        print("\n✅ No new records found that beat current records")
+        return
+    
+    for event_name, data in improvements.items():
+        print(f"\n📊 EVENT: {event_name}")
+        print("-" * 80)
+        
+        if data['new_event']:
+            print("  ⚠️  NEW EVENT - Not in current records")
+            print(f"  Records found: {len(data['records'])}")
+        else:
+            for imp in data['improvements']:
+                category = imp['category']
+                imp_type = imp['type']
+                
+                if imp_type == 'new_category':
+                    print(f"  ✅ NEW CATEGORY: {category}")
+                    print(f"     Records: {len(imp['records'])}")
+                elif imp_type == 'new_swimmer':
+                    print(f"  🆕 NEW SWIMMER in {category}:")
+                    print(f"     {imp['swimmer']} - {imp['points']} points ({imp['time']}) - {imp['date']}")
+                elif imp_type == 'improved_record':
+                    print(f"  📈 IMPROVED RECORD in {category}:")
+                    print(f"     {imp['swimmer']}")
+                    print(f"     Old: {imp['old_points']} points ({imp['old_time']})")
+                    print(f"     New: {imp['new_points']} points ({imp['new_time']}) - {imp['date']}")
+                elif imp_type == 'top10_improvement':
+                    print(f"  ⬆️  TOP 10 IMPROVEMENT in {category}:")
+                    print(f"     {imp['swimmer']} - {imp['points']} points ({imp['time']}) - {imp['date']}")
+                    print(f"     (Beats current minimum: {imp['beats_min']} points)")
+
 def main():
     """Main function to analyze new records."""
     print("=" * 80)
@@ -361,43 +399,16 @@ def main():
     print("=" * 80)
     improvements = compare_records(new_records, current_records)
     
-    # Print summary
-    print("\n" + "=" * 80)
-    print("SUMMARY OF POTENTIAL IMPROVEMENTS")
-    print("=" * 80)
-    
-    if not improvements:
-        print("\n✅ No new records found that beat current records")
-        return
-    
-    for event_name, data in improvements.items():
-        print(f"\n📊 EVENT: {event_name}")
-        print("-" * 80)
-        
-        if data['new_event']:
-            print("  ⚠️  NEW EVENT - Not in current records")
-            print(f"  Records found: {len(data['records'])}")
-        else:
-            for imp in data['improvements']:
-                category = imp['category']
-                imp_type = imp['type']
-                
-                if imp_type == 'new_category':
-                    print(f"  ✅ NEW CATEGORY: {category}")
-                    print(f"     Records: {len(imp['records'])}")
-                elif imp_type == 'new_swimmer':
-                    print(f"  🆕 NEW SWIMMER in {category}:")
-                    print(f"     {imp['swimmer']} - {imp['points']} points ({imp['time']}) - {imp['date']}")
-                elif imp_type == 'improved_record':
-                    print(f"  📈 IMPROVED RECORD in {category}:")
-                    print(f"     {imp['swimmer']}")
-                    print(f"     Old: {imp['old_points']} points ({imp['old_time']})")
-                    print(f"     New: {imp['new_points']} points ({imp['new_time']}) - {imp['date']}")
-                elif imp_type == 'top10_improvement':
-                    print(f"  ⬆️  TOP 10 IMPROVEMENT in {category}:")
-                    print(f"     {imp['swimmer']} - {imp['points']} points ({imp['time']}) - {imp['date']}")
-                    print(f"     (Beats current minimum: {imp['beats_min']} points)")
+    print_improvements(improvements)
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Compare new grdRanking files with the current records")
+    parser.add_argument("--profile", action="store_true",
+                        help="Run under cProfile, write a .prof and .collapsed file to profiles/ and print the top functions")
+    args = parser.parse_args()
+    
+    if args.profile:
+        run_profiled(main, "analyze_new_records")
+    else:
+        main()
 
@@ -0,0 +1,265 @@
+"""
+Read-only JSON API over the results store, used by `python3 tslk.py api`.
+
+    GET /api/events                                         events with result counts per category
+    GET /api/events/<event>?gender=Male&pool=25m&limit=10   best results of an event
+    GET /api/swimmers/<name>                                all results of a swimmer, with positions
+    GET /api/latest?gender=Female&pool=50m&limit=20         newest results in the top 10 lists
+    GET /api/diff                                           grdRanking results that beat the current records
+
+Everything is answered from memory and works offline. Every successful response carries
+the hash of the data as ETag, so clients revalidate with If-None-Match and get a 304
+without the body being sent. Serialized responses are kept in an LRU cache, and requests
+are handled by a fixed pool of worker threads.
+"""
+
+import http.server
+import json
+import math
+import threading
+import traceback
+import urllib.parse
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from categories import CATEGORIES, CATEGORY_NAMES, DIMENSIONS
+
+# Number of serialized responses kept in memory
+API_CACHE_SIZE = 256
+
+# Worker threads answering requests
+API_WORKERS = 8
+
+# Default and largest number of results in a list response
+API_DEFAULT_LIMIT = 10
+API_MAX_LIMIT = 1000
+
+class ApiError(Exception):
+    """A request that cannot be answered, with the HTTP status to answer it with."""
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def new_api(results, events, data_hash, load_diff):
+    """
+    The state of the API: the results store (see generate_website.build_results_store),
+    the events in display order, the hash of the data (used as ETag), a function computing
+    the record diff on first use, and the response cache.
+    """
+    return {
+        "results": results,
+        "events": events,
+        "etag": f'"{data_hash[:16]}"',
+        "load_diff": load_diff,
+        "diff": None,
+        "diff_lock": threading.Lock(),
+        "cache": OrderedDict(),
+        "cache_lock": threading.Lock(),
+    }
+
+def json_value(value):
+    """Convert results (DataFrames, numpy scalars, NaN) into plain JSON values."""
+    if hasattr(value, "to_dict") and hasattr(value, "columns"):
+        return [json_value(row) for row in value.to_dict("records")]
+    if isinstance(value, dict):
+        return {str(key): json_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [json_value(item) for item in value]
+    if hasattr(value, "item") and not isinstance(value, (str, bytes)):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+def parse_date(date):
+    """'dd.mm.yyyy' as a sortable (year, month, day); anything else sorts as oldest, like the page does."""
+    parts = str(date).split('.') if isinstance(date, str) else []
+    if len(parts) != 3:
+        return (0, 0, 0)
+    try:
+        day, month, year = (int(part) for part in parts)
+    except ValueError:
+        return (0, 0, 0)
+    return (year, month, day)
+
+def query_limit(query):
+    """The limit query parameter, between 1 and API_MAX_LIMIT."""
+    value = query.get("limit", [str(API_DEFAULT_LIMIT)])[0]
+    if not value.isdigit() or int(value) < 1:
+        raise ApiError(400, f"limit must be a positive number, got {value!r}")
+    return min(int(value), API_MAX_LIMIT)
+
+def filter_category(results, query):
+    """Keep the results matching the gender and pool query parameters (both when absent)."""
+    for dimension in ("gender", "pool"):
+        column, allowed = DIMENSIONS[dimension]
+        value = query.get(dimension, [None])[0]
+        if value is None:
+            continue
+        if value not in allowed:
+            raise ApiError(400, f"{dimension} must be one of {', '.join(allowed)}, got {value!r}")
+        results = results[results[column] == value]
+    return results
+
+def result_rows(results):
+    """Result rows as returned by the API."""
+    columns = ['Event', 'Gender', 'Pool', 'Rank', 'Name', 'Tid', 'Poeng', 'Dato', 'Sted']
+    return json_value(results[columns])
+
+def find_event(api, name):
+    """The event named name (ignoring case), or a 404."""
+    for event_name in api["events"]:
+        if event_name.casefold() == name.casefold():
+            return event_name
+    raise ApiError(404, f"Unknown event: {name}")
+
+def events_response(api, query):
+    """/api/events: the events with their number of results per category."""
+    results = api["results"]
+    counts = results.groupby(["Event", "Gender", "Pool"]).size()
+    return {
+        "events": [
+            {"event": event_name,
+             "counts": {name: int(counts.get((event_name, *key), 0)) for key, name in zip(CATEGORIES, CATEGORY_NAMES)}}
+            for event_name in api["events"]
+        ]
+    }
+
+def event_response(api, query, name):
+    """/api/events/<event>: the limit best results per category."""
+    event_name = find_event(api, name)
+    results = api["results"]
+    results = filter_category(results[results["Event"] == event_name], query)
+    limit = query_limit(query)
+    # Best results per category, in the category order of the site
+    top = results[results["Rank"] <= limit]
+    return {"event": event_name, "limit": limit, "results": result_rows(top)}
+
+def swimmer_response(api, query, name):
+    """/api/swimmers/<name>: every result of the swimmer, in event order."""
+    results = api["results"]
+    matches = results[results["Name"].str.casefold() == name.casefold()]
+    if matches.empty:
+        raise ApiError(404, f"Unknown swimmer: {name}")
+    event_order = {event_name: index for index, event_name in enumerate(api["events"])}
+    rows = sorted(result_rows(matches), key=lambda row: event_order[row["Event"]])
+    return {"name": rows[0]["Name"], "results": rows}
+
+def latest_response(api, query):
+    """/api/latest: the newest results in the top 10 lists, like the site's latest registrations."""
+    results = api["results"]
+    results = filter_category(results[results["Rank"] <= 10], query)
+    limit = query_limit(query)
+    rows = sorted(result_rows(results), key=lambda row: parse_date(row["Dato"]), reverse=True)
+    return {"limit": limit, "results": rows[:limit]}
+
+def diff_response(api, query):
+    """/api/diff: computed on the first request, as it parses the grdRanking files."""
+    with api["diff_lock"]:
+        if api["diff"] is None:
+            api["diff"] = json_value(api["load_diff"]())
+    return {"events": api["diff"]}
+
+def route(api, path, query):
+    """Answer a GET request with a JSON-serializable value, or raise ApiError."""
+    parts = [urllib.parse.unquote(part) for part in path.strip("/").split("/")]
+    if parts[:1] != ["api"]:
+        raise ApiError(404, f"Not found: {path}")
+    parts = parts[1:]
+    
+    if parts == ["events"]:
+        return events_response(api, query)
+    if len(parts) == 2 and parts[0] == "events":
+        return event_response(api, query, parts[1])
+    if len(parts) == 2 and parts[0] == "swimmers":
+        return swimmer_response(api, query, parts[1])
+    if parts == ["latest"]:
+        return latest_response(api, query)
+    if parts == ["diff"]:
+        return diff_response(api, query)
+    raise ApiError(404, f"Not found: {path}")
+
+def cached_response(api, path, query):
+    """The serialized response for a request, from the LRU cache when it was answered before."""
+    key = path + "?" + urllib.parse.urlencode(sorted((name, value) for name, values in query.items() for value in values))
+    cache = api["cache"]
+    with api["cache_lock"]:
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+    
+    body = json.dumps(route(api, path, query), ensure_ascii=False, allow_nan=False).encode("utf-8")
+    with api["cache_lock"]:
+        cache[key] = body
+        if len(cache) > API_CACHE_SIZE:
+            cache.popitem(last=False)
+    return body
+
+def api_handler(api):
+    """Request handler class answering API requests from api."""
+    class ApiHandler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urllib.parse.urlsplit(self.path)
+            query = urllib.parse.parse_qs(url.query)
+            
+            # Route and validate first, so unknown paths and bad parameters are never a 304
+            status = 200
+            try:
+                body = cached_response(api, url.path, query)
+            except ApiError as e:
+                status = e.status
+                body = json.dumps({"error": str(e)}, ensure_ascii=False).encode("utf-8")
+            except Exception as e:
+                # Answer with an error instead of dropping the connection
+                self.log_error("%s", traceback.format_exc())
+                status = 500
+                body = json.dumps({"error": f"Internal error: {e}"}, ensure_ascii=False).encode("utf-8")
+            
+            if status == 200 and self.headers.get("If-None-Match") == api["etag"]:
+                self.send_response(304)
+                self.send_header("ETag", api["etag"])
+                self.end_headers()
+                return
+            
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Cache-Control", "no-cache")
+            # Other club tools call the API from their own pages
+            self.send_header("Access-Control-Allow-Origin", "*")
+            if status == 200:
+                self.send_header("ETag", api["etag"])
+            self.end_headers()
+            self.wfile.write(body)
+    
+    return ApiHandler
+
+class PooledHTTPServer(http.server.HTTPServer):
+    """HTTPServer that handles requests on a fixed pool of worker threads."""
+    def __init__(self, address, handler, workers=API_WORKERS):
+        super().__init__(address, handler)
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+    
+    def process_request(self, request, client_address):
+        self.pool.submit(self.process_request_thread, request, client_address)
+    
+    def process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+    
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=False)
+
+def api_server(api, port, host="127.0.0.1"):
+    """A server for api on host:port; call serve_forever() to run it."""
+    return PooledHTTPServer((host, port), api_handler(api))
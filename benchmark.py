@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Benchmark the processing pipeline on synthetic grdRanking data.
+
+Generates medley.no-style exports with synthetic_data.py and times each stage
+separately: process_single_file, event merging, Excel export and generate_html.
+Results are written as JSON so runs can be compared over time, and --baseline
+compares a run with a committed baseline and exits non-zero on a slowdown.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+
+import process_all_events
+import synthetic_data
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "www"))
+import generate_website
+
+STAGES = ["process_single_file", "merge", "export", "generate_html"]
+
+# Stages that fail the --baseline comparison when they get slower
+GATED_STAGES = ["process_single_file", "merge", "generate_html"]
+
+BASELINE_FILE = "benchmark_baseline.json"
+
+def prepare_dataset(workspace, total_results, seed):
+    """Generate the synthetic Rawdata folder in workspace unless the same dataset is already there."""
+    rawdata_folder = os.path.join(workspace, "Rawdata")
+    marker_file = os.path.join(workspace, "synthetic.json")
+    dataset = {"results": total_results, "seed": seed}
+    
+    if os.path.exists(marker_file):
+        with open(marker_file, "r", encoding="utf-8") as f:
+            if json.load(f) == dataset:
+                print(f"📂 Reusing synthetic dataset in {workspace}")
+                return
+    
+    shutil.rmtree(rawdata_folder, ignore_errors=True)
+    print(f"🏗️  Generating {total_results} synthetic results in {rawdata_folder}...")
+    start = time.perf_counter()
+    files = synthetic_data.generate_rawdata(rawdata_folder, total_results, seed)
+    print(f"   {len(files)} files in {time.perf_counter() - start:.1f}s")
+    
+    with open(marker_file, "w", encoding="utf-8") as f:
+        json.dump(dataset, f)
+
+def run_pipeline(workspace):
+    """Run every stage once in workspace and return {stage: {seconds, rows_in, rows_out}}."""
+    timings = {}
+    cwd = os.getcwd()
+    
+    # Start each run from an empty site folder so generate_html does a full build
+    www_folder = os.path.join(workspace, "www")
+    shutil.rmtree(www_folder, ignore_errors=True)
+    os.makedirs(www_folder)
+    
+    try:
+        os.chdir(workspace)
+        # The pipeline prints per file and per swimmer; keep the benchmark output readable
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            grd_files = process_all_events.find_grd_files("Rawdata")
+            
+            start = time.perf_counter()
+            processed_files = [process_all_events.process_single_file(file_path) for file_path in grd_files]
+            rows_parsed = sum(len(df) for _, df, _ in processed_files if df is not None)
+            timings["process_single_file"] = {
+                "seconds": time.perf_counter() - start,
+                "rows_in": len(grd_files),
+                "rows_out": rows_parsed,
+            }
+            
+            start = time.perf_counter()
+            all_events = process_all_events.merge_event_results(processed_files)
+            rows_merged = sum(len(df) for df in all_events.values())
+            timings["merge"] = {
+                "seconds": time.perf_counter() - start,
+                "rows_in": rows_parsed,
+                "rows_out": rows_merged,
+            }
+            
+            start = time.perf_counter()
+            process_all_events.export_events(all_events)
+            timings["export"] = {
+                "seconds": time.perf_counter() - start,
+                "rows_in": rows_merged,
+                "rows_out": len(all_events),
+            }
+            
+            os.chdir(www_folder)
+            start = time.perf_counter()
+            # Synthetic datasets are far bigger than the club's, so don't fail on the payload budgets
+            generate_website.generate_html(enforce_budgets=False)
+            timings["generate_html"] = {
+                "seconds": time.perf_counter() - start,
+                "rows_in": len(all_events),
+                "rows_out": len(os.listdir(".")),
+            }
+    finally:
+        os.chdir(cwd)
+    
+    return timings
+
+def benchmark_size(total_results, seed, repeat, workspace):
+    """Benchmark one dataset size, repeating the pipeline and keeping all samples."""
+    prepare_dataset(workspace, total_results, seed)
+    
+    samples = []
+    for run in range(repeat):
+        timings = run_pipeline(workspace)
+        samples.append(timings)
+        print(f"   run {run + 1}/{repeat}: " +
+              ", ".join(f"{stage} {timings[stage]['seconds']:.2f}s" for stage in STAGES))
+    
+    stages = {}
+    for stage in STAGES:
+        seconds = [sample[stage]["seconds"] for sample in samples]
+        stages[stage] = {
+            "median_seconds": statistics.median(seconds),
+            "min_seconds": min(seconds),
+            "samples": seconds,
+            "rows_in": samples[-1][stage]["rows_in"],
+            "rows_out": samples[-1][stage]["rows_out"],
+        }
+    
+    return {"results": total_results, "seed": seed, "repeat": repeat, "stages": stages}
+
+def print_summary(runs):
+    """Print a table of median seconds per stage and dataset size."""
+    print(f"\n{'Results':>10} " + " ".join(f"{stage:>20}" for stage in STAGES))
+    for run in runs:
+        print(f"{run['results']:>10} " +
+              " ".join(f"{run['stages'][stage]['median_seconds']:>19.3f}s" for stage in STAGES))
+
+def compare_runs(baseline, runs, stages, threshold, min_delta):
+    """
+    Compare median seconds per dataset size and stage with a baseline report.
+    
+    A stage regresses when it is more than threshold (0.25 = 25%) slower than the
+    baseline and at least min_delta seconds slower, so tiny stages don't flap on noise.
+    """
+    baseline_runs = {run["results"]: run for run in baseline["runs"]}
+    
+    rows = []
+    for run in runs:
+        baseline_run = baseline_runs.get(run["results"])
+        if baseline_run is None:
+            continue
+        for stage in stages:
+            if stage not in baseline_run["stages"] or stage not in run["stages"]:
+                continue
+            before = baseline_run["stages"][stage]["median_seconds"]
+            after = run["stages"][stage]["median_seconds"]
+            change = (after - before) / before if before > 0 else 0.0
+            rows.append({
+                "results": run["results"],
+                "stage": stage,
+                "baseline_seconds": before,
+                "current_seconds": after,
+                "change": change,
+                "regression": change > threshold and after - before >= min_delta,
+            })
+    return rows
+
+def print_comparison(rows, threshold):
+    """Print the baseline comparison as a table, marking regressions."""
+    print(f"\n{'Results':>10} {'Stage':<20} {'Baseline':>10} {'Current':>10} {'Change':>9}")
+    for row in rows:
+        marker = "❌" if row["regression"] else "✅"
+        print(f"{row['results']:>10} {row['stage']:<20} {row['baseline_seconds']:>9.3f}s "
+              f"{row['current_seconds']:>9.3f}s {row['change']:>+8.1%} {marker}")
+    
+    regressions = [row for row in rows if row["regression"]]
+    if regressions:
+        print(f"\n❌ {len(regressions)} stage(s) more than {threshold:.0%} slower than the baseline")
+    else:
+        print(f"\n✅ No stage more than {threshold:.0%} slower than the baseline")
+    return regressions
+
+def main():
+    """Run the benchmark suite and write the results as JSON."""
+    parser = argparse.ArgumentParser(description="Benchmark the TSLK pipeline on synthetic data")
+    parser.add_argument("--results", type=int, nargs="+",
+                        help="Dataset sizes in number of results, 1k to 1M (default: 1000 10000, "
+                             "or the sizes in the baseline)")
+    parser.add_argument("--seed", type=int, help="Random seed for the synthetic data (default: 42, or the baseline seed)")
+    parser.add_argument("--repeat", type=int, default=3, help="Pipeline runs per dataset size (default: 3)")
+    parser.add_argument("--workspace", help="Folder for the synthetic data (default: a temporary folder)")
+    parser.add_argument("--output", help="JSON file for the results (default: benchmark_results/<timestamp>.json)")
+    parser.add_argument("--baseline", nargs="?", const=BASELINE_FILE,
+                        help=f"Compare with a baseline report and exit non-zero on a regression (default: {BASELINE_FILE})")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed slowdown per stage as a fraction of the baseline (default: 0.25)")
+    parser.add_argument("--min-delta", type=float, default=0.05,
+                        help="Ignore slowdowns smaller than this many seconds (default: 0.05)")
+    parser.add_argument("--stages", nargs="+", default=GATED_STAGES, choices=STAGES,
+                        help=f"Stages checked against the baseline (default: {' '.join(GATED_STAGES)})")
+    parser.add_argument("--save-baseline", metavar="PATH", nargs="?", const=BASELINE_FILE,
+                        help=f"Also write the results as the new baseline (default: {BASELINE_FILE})")
+    args = parser.parse_args()
+    
+    # Run the baseline's dataset so the comparison uses the same synthetic data
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        args.results = args.results or [run["results"] for run in baseline["runs"]]
+        args.seed = args.seed if args.seed is not None else baseline["runs"][0]["seed"]
+    args.results = args.results or [1000, 10000]
+    args.seed = args.seed if args.seed is not None else 42
+    
+    output_file = args.output or os.path.join(
+        "benchmark_results", f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    
+    runs = []
+    for total_results in args.results:
+        print(f"\n🏊 Benchmarking {total_results} results")
+        if args.workspace:
+            workspace = os.path.join(args.workspace, str(total_results))
+            os.makedirs(workspace, exist_ok=True)
+            runs.append(benchmark_size(total_results, args.seed, args.repeat, workspace))
+        else:
+            with tempfile.TemporaryDirectory(prefix="tslk_bench_") as workspace:
+                runs.append(benchmark_size(total_results, args.seed, args.repeat, workspace))
+    
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "runs": runs,
+    }
+    
+    os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    
+    print_summary(runs)
+    print(f"\n✅ Results written to {output_file}")
+    
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"📌 Baseline written to {args.save_baseline}")
+    
+    if baseline:
+        rows = compare_runs(baseline, runs, args.stages, args.threshold, args.min_delta)
+        if not rows:
+            print(f"⚠️  No dataset sizes in common with {args.baseline}")
+            sys.exit(2)
+        if print_comparison(rows, args.threshold):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Result categories: the splits the records are kept for.
+
+A category is a tuple of dimension values, e.g. ('Male', '25m'). The records have always
+been split by gender and pool (the Male_25m, Male_50m, Female_25m and Female_50m sheets
+and site categories); further dimensions such as an age group or a season are just more
+columns of the results. rank_categories ranks every category of any set of dimensions
+with one groupby, instead of one filter pass over the results per category.
+"""
+
+from itertools import product
+
+# Age groups as (name, highest age); the age is the one reached in the year of the result
+AGE_GROUPS = [
+    ("12 and under", 12),
+    ("13-14", 14),
+    ("15-16", 16),
+    ("17-19", 19),
+    ("Senior", 24),
+    ("Master", None),
+]
+
+# Age group and season value of results counted over all age groups or seasons
+ALL = "All"
+
+# Dimension name -> (results column, values in display order; None takes the values found in the results)
+DIMENSIONS = {
+    "gender": ("Gender", ["Male", "Female"]),
+    "pool": ("Pool", ["25m", "50m"]),
+    "age_group": ("AgeGroup", [ALL] + [name for name, _ in AGE_GROUPS]),
+    "season": ("Season", None),
+}
+
+# Dimensions of the Excel sheets and the website's categories
+STANDARD_DIMENSIONS = ("gender", "pool")
+
+def dimension_values(dimension, results=None):
+    """The values of a dimension in display order (the sorted values in results when they are open-ended)."""
+    column, values = DIMENSIONS[dimension]
+    if values is not None:
+        return list(values)
+    if results is None:
+        return []
+    return sorted(results[column].dropna().unique())
+
+def category_keys(dimensions=STANDARD_DIMENSIONS, results=None):
+    """Every category of the dimensions as a tuple of values, in display order."""
+    return list(product(*(dimension_values(dimension, results) for dimension in dimensions)))
+
+def category_name(key):
+    """The sheet and website name of a category, e.g. 'Male_25m'."""
+    return "_".join(str(value) for value in key)
+
+def category_label(key):
+    """A category for printing, e.g. 'Male 25m'."""
+    return " ".join(str(value) for value in key)
+
+def category_key(name):
+    """The (gender, pool) tuple of a standard category name."""
+    gender, pool = name.split("_")
+    return (gender, pool)
+
+CATEGORIES = category_keys()
+CATEGORY_NAMES = [category_name(key) for key in CATEGORIES]
+
+def rank_results(results, dimensions=STANDARD_DIMENSIONS, top_n=None, by=()):
+    """
+    Add a Rank column (1 = best) within each category of the dimensions to results, which
+    must be sorted best first, and keep the top_n of each category (all when None). by
+    names further columns to rank separately for, e.g. ['Event'].
+    """
+    columns = list(by) + [DIMENSIONS[dimension][0] for dimension in dimensions]
+    ranks = results.groupby(columns, sort=False).cumcount() + 1
+    results = results.assign(Rank=ranks)
+    if top_n is not None:
+        results = results[results["Rank"] <= top_n]
+    return results
+
+def rank_categories(results, dimensions=STANDARD_DIMENSIONS, top_n=None):
+    """
+    Split results (sorted best first) into {category key: results} for every category of
+    the dimensions, keeping their order and the top_n of each (all when None). One groupby
+    covers all categories; categories without results get an empty frame, and results
+    outside the categories (e.g. an unknown gender) are left out.
+    """
+    columns = [DIMENSIONS[dimension][0] for dimension in dimensions]
+    if top_n is not None:
+        results = results[results.groupby(columns, sort=False).cumcount() < top_n]
+    
+    groups = {key: group for key, group in results.groupby(columns, sort=False)}
+    empty = results.iloc[0:0]
+    return {key: groups.get(key, empty) for key in category_keys(dimensions, results)}
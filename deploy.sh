@@ -1,13 +1,41 @@
 #!/bin/bash
 
+# Copy a file only if its content differs, so unchanged files keep their timestamps
+copy_if_changed() {
+    if ! cmp -s "$1" "$2"; then
+        mkdir -p "$(dirname "$2")"
+        cp "$1" "$2"
+        echo "  - updated $2"
+    fi
+}
+
+# Mirror a generated folder from www/ to the root, removing files that are no longer generated
+sync_folder() {
+    for file in www/"$1"/*; do
+        [ -e "$file" ] || continue
+        copy_if_changed "$file" "$1/$(basename "$file")"
+    done
+    for file in "$1"/*; do
+        [ -e "$file" ] || continue
+        [ -e "www/$file" ] || rm "$file"
+    done
+}
+
 echo "🔄 Regenerating website..."
-cd www
-python3 generate_website.py
+python3 tslk.py build-site
 
-echo "📁 Copying files to root directory..."
-cd ..
-cp www/index.html .
-cp www/logo.png .
+echo "📁 Copying changed files to root directory..."
+copy_if_changed www/index.html index.html
+copy_if_changed www/statistics.html statistics.html
+copy_if_changed www/records.html records.html
+copy_if_changed www/logo.png logo.png
+copy_if_changed www/sw.js sw.js
+copy_if_changed www/precache-manifest.json precache-manifest.json
+sync_folder swimmers
+sync_folder records
+sync_folder data
+sync_folder assets
+sync_folder images
 
 echo "✅ Website files updated and ready for GitHub Pages!"
 echo "🌐 Push to GitHub to trigger automatic deployment"
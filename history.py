@@ -0,0 +1,160 @@
+"""
+Results history and progression.
+
+History/results.csv keeps every result ever read from the grdRanking and Exceptions files,
+not only each swimmer's best. Rows are only ever appended: results that are already in the
+table are skipped, so results stay in the history after their export is removed from
+Rawdata/. The progression is computed from it with grouped running maxima:
+
+- personal bests: the results that beat the swimmer's earlier best in the event and pool
+- club records: the results that beat the earlier club record of the event, gender and pool
+
+    python3 history.py    # write History/progression.xlsx from History/results.csv
+"""
+
+import os
+import argparse
+from datetime import date
+
+import pandas as pd
+
+from instrumentation import stage, start_run, finish_run, run_profiled
+from categories import DIMENSIONS
+
+HISTORY_FOLDER = "History"
+HISTORY_FILE = "results.csv"
+PROGRESSION_FILE = "progression.xlsx"
+
+# Columns of the history table: those of process_all_events.ALL_RESULTS_COLUMNS, and the date the row was added
+HISTORY_COLUMNS = ['Event', 'Name', 'Tid', 'Poeng', 'Dato', 'Sted', 'Pool', 'Gender', 'BirthYear', 'Added']
+
+# A result is already in the history when these columns match
+HISTORY_KEY = ['Event', 'Name', 'Tid', 'Poeng', 'Dato', 'Sted', 'Pool']
+
+PROGRESSION_COLUMNS = ['Event', 'Gender', 'Pool', 'Name', 'Dato', 'Tid', 'Poeng', 'Improvement', 'Sted']
+
+def load_history(history_folder=HISTORY_FOLDER):
+    """The history table, empty when it has not been written yet."""
+    history_path = os.path.join(history_folder, HISTORY_FILE)
+    if not os.path.exists(history_path):
+        return pd.DataFrame(columns=HISTORY_COLUMNS)
+    text_columns = ['Event', 'Name', 'Tid', 'Dato', 'Sted', 'Pool', 'Gender', 'Added']
+    return pd.read_csv(history_path, dtype={column: str for column in text_columns})
+
+def history_keys(results):
+    """
+    A 64-bit hash of the HISTORY_KEY of each row, with the text as strings and the points
+    as floats so 553 and 553.0 match. Hashes are compared as plain integers, which is much
+    faster than an index of string tuples.
+    """
+    text_columns = [column for column in HISTORY_KEY if column != 'Poeng']
+    keys = results[text_columns].fillna('').astype(str).assign(
+        Poeng=pd.to_numeric(results['Poeng'], errors='coerce').astype('float64'))
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy()
+
+def new_history_rows(history, all_results, added=None):
+    """The rows of all_results that are not in history yet, in HISTORY_COLUMNS."""
+    new_rows = all_results.reindex(columns=HISTORY_COLUMNS)
+    keys = pd.Index(history_keys(new_rows))
+    is_new = ~keys.duplicated() & ~keys.isin(history_keys(history))
+    return new_rows[is_new].assign(Added=added or date.today().isoformat())
+
+def merge_history(history, all_results):
+    """history with the new rows of all_results added, without writing anything."""
+    new_rows = new_history_rows(history, all_results)
+    if new_rows.empty:
+        return history
+    if history.empty:
+        return new_rows.reset_index(drop=True)
+    return pd.concat([history, new_rows], ignore_index=True)
+
+def append_history(all_results, history_folder=HISTORY_FOLDER):
+    """Append the new rows of all_results to the history file; returns the whole history."""
+    history = load_history(history_folder)
+    new_rows = new_history_rows(history, all_results)
+    history_path = os.path.join(history_folder, HISTORY_FILE)
+    
+    if not new_rows.empty:
+        os.makedirs(history_folder, exist_ok=True)
+        new_rows.to_csv(history_path, mode='a', header=not os.path.exists(history_path), index=False)
+    print(f"History: {len(new_rows)} new results added to {history_path} ({len(history) + len(new_rows)} in total)")
+    
+    if history.empty:
+        return new_rows.reset_index(drop=True)
+    return pd.concat([history, new_rows], ignore_index=True)
+
+def improvements(results, keys):
+    """The results (sorted by date) that beat every earlier result with the same keys, with the gain in points."""
+    best = results.groupby(keys, sort=False)['Poeng'].cummax()
+    previous_best = best.groupby([results[key] for key in keys], sort=False).shift()
+    improved = results[previous_best.isna() | (results['Poeng'] > previous_best)]
+    return improved.assign(Improvement=(improved['Poeng'] - previous_best[improved.index]).astype('Int64'))
+
+def compute_progression(history):
+    """
+    The personal best and club record progression: {'PersonalBests': DataFrame,
+    'ClubRecords': DataFrame}, both with PROGRESSION_COLUMNS in date order.
+    """
+    from process_all_events import clean_event_file_name
+    
+    dates = pd.to_datetime(history['Dato'], format='%d.%m.%Y', errors='coerce')
+    valid = dates.notna() & history['Gender'].isin(DIMENSIONS["gender"][1]) & history['Pool'].isin(DIMENSIONS["pool"][1])
+    results = history[valid].assign(
+        Event=history.loc[valid, 'Event'].map(clean_event_file_name),
+        Poeng=pd.to_numeric(history.loc[valid, 'Poeng'], errors='coerce'),
+        _date=dates[valid],
+    )
+    results = results[results['Poeng'].notna()]
+    
+    # In date order, and the best result first within a day, so only it can be an improvement
+    results = results.sort_values(['_date', 'Poeng'], ascending=[True, False], kind='stable')
+    
+    progression = {
+        'PersonalBests': improvements(results, ['Event', 'Pool', 'Name']),
+        'ClubRecords': improvements(results, ['Event', 'Gender', 'Pool']),
+    }
+    return {name: df.sort_values(['Event', 'Gender', 'Pool', '_date'], kind='stable')[PROGRESSION_COLUMNS].reset_index(drop=True)
+            for name, df in progression.items()}
+
+def export_progression(progression, history_folder=HISTORY_FOLDER):
+    """Write the progression tables to one Excel file with a sheet per table."""
+    os.makedirs(history_folder, exist_ok=True)
+    progression_path = os.path.join(history_folder, PROGRESSION_FILE)
+    
+    with pd.ExcelWriter(progression_path, engine='openpyxl') as writer:
+        for name, df in progression.items():
+            df.to_excel(writer, sheet_name=name, index=False)
+    
+    print(f"Created progression file: {progression_path} ({len(progression['PersonalBests'])} personal bests, "
+          f"{len(progression['ClubRecords'])} club records)")
+    return progression_path
+
+def site_progression(progression):
+    """The progression in the shape the website generator loads from the progression file: {table: [results]}."""
+    return {name: df.astype(object).where(df.notna(), None).to_dict('records') for name, df in progression.items()}
+
+def process_progression():
+    """Compute the progression from the history file and write History/progression.xlsx."""
+    history = load_history()
+    with stage("progression", rows_in=len(history)) as record:
+        progression = compute_progression(history)
+        record["rows_out"] = sum(len(df) for df in progression.values())
+    export_progression(progression)
+    return progression
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compute the personal best and club record progression from the results history")
+    parser.add_argument("--report", metavar="PATH",
+                        help="Write a JSON run report with per-stage timing and memory to PATH")
+    parser.add_argument("--summary", action="store_true", help="Print a per-stage summary table")
+    parser.add_argument("--profile", action="store_true",
+                        help="Run under cProfile, write a .prof and .collapsed file to profiles/ and print the top functions")
+    args = parser.parse_args()
+    
+    if args.report or args.summary:
+        start_run("history")
+    if args.profile:
+        run_profiled(process_progression, "history")
+    else:
+        process_progression()
+    finish_run(args.report, summary=args.summary)
@@ -0,0 +1,225 @@
+"""
+Per-stage timing and memory instrumentation for the pipeline scripts.
+
+Stages are recorded into the active run report with wall time, CPU time,
+peak traced memory (tracemalloc) and rows in/out. When no run is active the
+stage() context manager only yields a scratch record, so the instrumented
+code costs next to nothing in normal runs.
+
+Usage:
+
+    start_run("process_all_events")
+    with stage("read", file=path) as record:
+        df = pd.read_excel(path)
+        record["rows_out"] = len(df)
+    finish_run("run_report.json", summary=True)
+
+run_profiled() wraps a whole entry point in cProfile for the --profile flag.
+"""
+
+import io
+import json
+import os
+import platform
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+# The report of the run in progress, or None when instrumentation is off
+current_report = None
+
+# Where --profile writes its .prof and .collapsed files
+PROFILE_FOLDER = "profiles"
+
+# Number of functions printed after a profiled run
+PROFILE_TOP_FUNCTIONS = 20
+
+# Collapsed stacks deeper than this, or below this share of the run time, are cut off
+COLLAPSED_MAX_DEPTH = 60
+COLLAPSED_MIN_SHARE = 0.001
+
+def start_run(name, track_memory=True):
+    """Start recording stages for a run of the named entry point."""
+    global current_report
+    
+    if track_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    
+    current_report = {
+        "run": name,
+        "started": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "track_memory": track_memory,
+        "stages": [],
+        "_wall_start": time.perf_counter(),
+        "_cpu_start": time.process_time(),
+    }
+    return current_report
+
+@contextmanager
+def stage(name, rows_in=None, **details):
+    """
+    Record one pipeline stage in the active run report.
+    
+    Yields a dict where the caller can set rows_out (and other details).
+    Stages should not be nested: the tracemalloc peak is reset per stage.
+    """
+    record = {"stage": name, "rows_in": rows_in, "rows_out": None}
+    record.update(details)
+    
+    report = current_report
+    if report is None:
+        yield record
+        return
+    
+    if report["track_memory"]:
+        tracemalloc.reset_peak()
+        memory_start = tracemalloc.get_traced_memory()[0]
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    
+    try:
+        yield record
+    finally:
+        record["wall_seconds"] = round(time.perf_counter() - wall_start, 6)
+        record["cpu_seconds"] = round(time.process_time() - cpu_start, 6)
+        if report["track_memory"]:
+            # Peak above what was already allocated when the stage started
+            record["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1] - memory_start
+        report["stages"].append(record)
+
+def summarize_stages(stages):
+    """Total wall/CPU time, peak memory and rows per stage name, in order of first appearance."""
+    totals = {}
+    for record in stages:
+        total = totals.setdefault(record["stage"], {
+            "count": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0,
+            "peak_memory_bytes": 0, "rows_in": 0, "rows_out": 0,
+        })
+        total["count"] += 1
+        total["wall_seconds"] += record.get("wall_seconds", 0.0)
+        total["cpu_seconds"] += record.get("cpu_seconds", 0.0)
+        total["peak_memory_bytes"] = max(total["peak_memory_bytes"], record.get("peak_memory_bytes") or 0)
+        total["rows_in"] += record.get("rows_in") or 0
+        total["rows_out"] += record.get("rows_out") or 0
+    return totals
+
+def print_summary(report):
+    """Print a table of the stages in a run report, plus the slowest single stages."""
+    totals = summarize_stages(report["stages"])
+    
+    print(f"\n📊 Run report: {report['run']} ({report['wall_seconds']:.2f}s wall, {report['cpu_seconds']:.2f}s CPU)")
+    print(f"{'Stage':<16} {'Count':>6} {'Wall (s)':>10} {'CPU (s)':>10} {'Peak MB':>9} {'Rows in':>10} {'Rows out':>10}")
+    for name, total in totals.items():
+        print(f"{name:<16} {total['count']:>6} {total['wall_seconds']:>10.3f} {total['cpu_seconds']:>10.3f} "
+              f"{total['peak_memory_bytes'] / 1024 / 1024:>9.1f} {total['rows_in']:>10} {total['rows_out']:>10}")
+    
+    slowest = sorted(report["stages"], key=lambda record: record.get("wall_seconds", 0), reverse=True)[:5]
+    if slowest:
+        print("\nSlowest stages:")
+        for record in slowest:
+            target = record.get("file") or record.get("event") or ""
+            print(f"  {record['wall_seconds']:>8.3f}s  {record['stage']:<12} {target}")
+
+def finish_run(report_path=None, summary=False):
+    """Finish the active run, write the JSON report and optionally print a summary table."""
+    global current_report
+    
+    report = current_report
+    if report is None:
+        return None
+    current_report = None
+    
+    report["wall_seconds"] = round(time.perf_counter() - report.pop("_wall_start"), 6)
+    report["cpu_seconds"] = round(time.process_time() - report.pop("_cpu_start"), 6)
+    report["totals"] = summarize_stages(report["stages"])
+    if report["track_memory"]:
+        report["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    
+    if report_path:
+        folder = os.path.dirname(os.path.abspath(report_path))
+        os.makedirs(folder, exist_ok=True)
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, default=str)
+        print(f"📝 Run report written to {report_path}")
+    
+    if summary:
+        print_summary(report)
+    
+    return report
+
+def function_label(func):
+    """Label a pstats function key as 'file:function' (or just the name for built-ins)."""
+    filename, line, name = func
+    if filename == "~":
+        return name
+    return f"{os.path.basename(filename)}:{name}"
+
+def write_collapsed_stacks(stats, path):
+    """
+    Write profile stats in the collapsed-stack format used by flamegraph.pl and speedscope.
+    
+    cProfile only records caller/callee pairs, so stacks are rebuilt by walking the call
+    graph from the entry points and splitting each function's time over its callers.
+    """
+    callees = {}
+    for func, (_, _, _, _, callers) in stats.stats.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge))
+    
+    lines = {}
+    roots = [func for func, (_, _, _, _, callers) in stats.stats.items() if not callers]
+    # Without a floor the number of paths through pandas' call graph explodes
+    min_seconds = sum(stats.stats[root][3] for root in roots) * COLLAPSED_MIN_SHARE
+    
+    def walk(func, stack, share):
+        cc, nc, tt, ct, _ = stats.stats[func]
+        stack = stack + [function_label(func)]
+        microseconds = int(tt * share * 1000000)
+        if microseconds > 0:
+            key = ";".join(stack)
+            lines[key] = lines.get(key, 0) + microseconds
+        if len(stack) >= COLLAPSED_MAX_DEPTH:
+            return
+        for callee, edge in callees.get(func, []):
+            callee_ct = stats.stats[callee][3]
+            # Skip recursion and branches below the time floor
+            if callee_ct <= 0 or edge[3] * share < min_seconds or function_label(callee) in stack:
+                continue
+            walk(callee, stack, share * edge[3] / callee_ct)
+    
+    for root in roots:
+        walk(root, [], 1.0)
+    
+    with open(path, "w", encoding="utf-8") as f:
+        for key in sorted(lines):
+            f.write(f"{key} {lines[key]}\n")
+
+def run_profiled(func, name, output_folder=PROFILE_FOLDER, top=PROFILE_TOP_FUNCTIONS):
+    """
+    Run func under cProfile, then write <name>_<timestamp>.prof and .collapsed files
+    to output_folder and print the hottest functions by cumulative time.
+    """
+    # Imported here so that scripts run without --profile do not pay for them at startup
+    import cProfile
+    import pstats
+    
+    os.makedirs(output_folder, exist_ok=True)
+    base_path = os.path.join(output_folder, f"{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func)
+    finally:
+        profiler.dump_stats(f"{base_path}.prof")
+        
+        stream = io.StringIO()
+        stats = pstats.Stats(profiler, stream=stream)
+        write_collapsed_stacks(stats, f"{base_path}.collapsed")
+        
+        stats.sort_stats("cumulative").print_stats(top)
+        print(f"\n🔥 Top {top} functions by cumulative time ({name}):")
+        print(stream.getvalue())
+        print(f"📝 Profile written to {base_path}.prof and {base_path}.collapsed")
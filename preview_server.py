@@ -0,0 +1,142 @@
+"""
+Local preview server for the website, used by `python3 tslk.py serve`.
+
+The site is built into memory (generate_html(memory=...)) and served from there: every
+response has an ETag, so unchanged data shards and assets are answered with 304, and
+HTML pages get a small script that reloads the page when the site is rebuilt. Source files
+the pages link to (logo.png) are served from www/; earlier builds' outputs there are not.
+"""
+
+import hashlib
+import http.server
+import mimetypes
+import os
+import threading
+import urllib.parse
+
+# Event stream the pages listen on for reloads
+LIVE_RELOAD_PATH = "/__livereload"
+LIVE_RELOAD_SCRIPT = f"<script>new EventSource('{LIVE_RELOAD_PATH}').onmessage = () => location.reload();</script>"
+
+# Seconds between keep-alive comments on an idle live-reload stream
+LIVE_RELOAD_KEEPALIVE = 15
+
+# Served as sw.js, so no service worker caches the preview (and an earlier one is removed)
+PREVIEW_SERVICE_WORKER_JS = """self.addEventListener('install', () => self.skipWaiting());
+self.addEventListener('activate', () => self.registration.unregister());
+"""
+
+def new_preview():
+    """The in-memory site: files by path, their ETags, and a version bumped on every rebuild."""
+    return {"files": {}, "etags": {}, "version": 0, "changed": threading.Condition()}
+
+def publish_preview(preview, files):
+    """Replace the served site with a new build and tell the open pages to reload."""
+    etags = {key: f'"{hashlib.sha256(data).hexdigest()[:16]}"' for key, data in files.items()}
+    with preview["changed"]:
+        preview["files"], preview["etags"] = files, etags
+        preview["version"] += 1
+        preview["changed"].notify_all()
+
+def preview_handler(preview, static_folder, static_files):
+    """Request handler class serving preview from memory, and static_files from static_folder."""
+    
+    class PreviewHandler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_file(send_body=True)
+        
+        def do_HEAD(self):
+            self.send_file(send_body=False)
+        
+        def send_file(self, send_body):
+            """Answer a request for a file of the site (or the live-reload stream)."""
+            path = urllib.parse.unquote(urllib.parse.urlsplit(self.path).path)
+            if path == LIVE_RELOAD_PATH and send_body:
+                self.send_live_reload()
+                return
+            
+            key = path.lstrip("/")
+            if key == "" or key.endswith("/"):
+                key += "index.html"
+            
+            if key == "sw.js":
+                content = PREVIEW_SERVICE_WORKER_JS.encode("utf-8")
+                etag = None
+            elif key in preview["files"]:
+                content = preview["files"][key]
+                etag = preview["etags"][key]
+            elif key in static_files:
+                content, etag = self.read_static(key)
+            else:
+                content = None
+            
+            if content is None:
+                self.send_error(404)
+                return
+            
+            if etag is not None and self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            
+            content_type = mimetypes.guess_type(key)[0] or "application/octet-stream"
+            if key.endswith(".html"):
+                content = content.replace(b"</body>", LIVE_RELOAD_SCRIPT.encode("utf-8") + b"</body>", 1)
+                content_type += "; charset=utf-8"
+            
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(content)))
+            # Always revalidate, so a rebuild is picked up; unchanged files cost a 304
+            self.send_header("Cache-Control", "no-cache")
+            if etag is not None:
+                self.send_header("ETag", etag)
+            self.end_headers()
+            if send_body:
+                self.wfile.write(content)
+        
+        def read_static(self, key):
+            """A file from the static folder and its ETag, or (None, None) if it does not exist."""
+            path = os.path.join(static_folder, key)
+            if not os.path.isfile(path):
+                return None, None
+            file_stat = os.stat(path)
+            with open(path, "rb") as f:
+                return f.read(), f'"{file_stat.st_mtime_ns:x}-{file_stat.st_size:x}"'
+        
+        def send_live_reload(self):
+            """Server-sent events: one 'reload' message per rebuild, for as long as the page is open."""
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            
+            condition = preview["changed"]
+            with condition:
+                version = preview["version"]
+            try:
+                while True:
+                    with condition:
+                        condition.wait_for(lambda: preview["version"] != version, timeout=LIVE_RELOAD_KEEPALIVE)
+                        current = preview["version"]
+                    if current != version:
+                        version = current
+                        self.wfile.write(b"data: reload\n\n")
+                    else:
+                        self.wfile.write(b": keep-alive\n\n")
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                return
+        
+        def log_message(self, format, *args):
+            # Every page load fetches dozens of files; only the rebuilds are worth printing
+            pass
+    
+    return PreviewHandler
+
+def start_preview_server(preview, static_folder, static_files, port, host="127.0.0.1"):
+    """Serve preview on host:port from a background thread; returns the server (call shutdown() to stop)."""
+    server = http.server.ThreadingHTTPServer((host, port), preview_handler(preview, static_folder, static_files))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
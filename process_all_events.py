@@ -1,8 +1,13 @@
 import pandas as pd
 import re
 import os
+import argparse
 from datetime import datetime
 
+from instrumentation import stage, start_run, finish_run, run_profiled
+from categories import category_label, category_name, rank_categories
+import history
+
 def identify_gender(name):
     """
     Identify gender based on the swimmer's name.
@@ -104,6 +109,21 @@ def format_name_for_display(name):
 
 
 
+# Header of the birth year column, in exports that have one
+BIRTH_YEAR_HEADERS = ['Født', 'Fødselsår', 'Årsklasse']
+
+# Columns of the table of all parsed results (see collect_all_results)
+ALL_RESULTS_COLUMNS = ['Event', 'Name', 'Tid', 'Poeng', 'Dato', 'Sted', 'Pool', 'Gender', 'BirthYear']
+
+def birth_year_column(df):
+    """
+    Index of the birth year column of a grdRanking sheet, or None when the export has none.
+    """
+    for column, header in df.iloc[0].items():
+        if isinstance(header, str) and header.strip() in BIRTH_YEAR_HEADERS:
+            return column
+    return None
+
 def read_exceptions_file():
     """
     Read the Exceptions file and return a dictionary mapping event names to DataFrames.
@@ -134,148 +154,167 @@ def read_exceptions_file():
 
 def process_single_file(input_file):
     """
-    Process a single swim results Excel file and return the processed data.
+    Process a single swim results Excel file and return the processed data: the event name,
+    the best result per swimmer and pool, and all results of the file (ALL_RESULTS_COLUMNS).
     """
     print(f"\nProcessing file: {input_file}")
     
     # Read the Excel file
-    df = pd.read_excel(input_file, header=None)
-    
-    # Find the event name from data rows (where times are shown)
-    event_name = None
-    for idx, row in df.iterrows():
-        # Look for rows that have time data (usually in column 2 or 3)
-        if pd.notna(row[1]) and isinstance(row[1], str):
-            # Check if this looks like an event name (contains distance and stroke)
-            if any(keyword in row[1].lower() for keyword in ['m', 'butterfly', 'freestyle', 'backstroke', 'breaststroke', 'medley']):
-                event_name = row[1]
-                break
-    
-    if not event_name:
-        print(f"Could not find event name in {input_file}")
-        return None, None
-    
-    print(f"Event name found: {event_name}")
-    
-    # Rename "Individuell Medley" to "Medley" (case insensitive)
-    if "individuell medley" in event_name.lower():
-        # Handle all possible case variations
-        event_name = event_name.replace("Individuell Medley", "Medley")
-        event_name = event_name.replace("Individuell medley", "Medley")
-        event_name = event_name.replace("individuell medley", "Medley")
-        print(f"Event name updated to: {event_name}")
-    
-    # Initialize lists to store data
-    swimmers_data = []
-    current_swimmer = None
-    current_swimmer_data = []
-    
-    # Process each row
-    for idx, row in df.iterrows():
-        # Check if this is a swimmer name row (usually has a name in first column)
-        if pd.notna(row[0]) and isinstance(row[0], str):
-            # If we have data from previous swimmer, process it
-            if current_swimmer and current_swimmer_data:
-                swimmers_data.append((current_swimmer, current_swimmer_data))
-            
-            # Start new swimmer
-            current_swimmer = row[0]
-            current_swimmer_data = []
-        else:
-            # This is a result row for the current swimmer
-            if current_swimmer:
-                # Extract relevant data (adjust column indices based on your file structure)
-                # Assuming: Time, Points, Date, Location, Pool Length are in specific columns
-                try:
-                    time_val = row[2] if pd.notna(row[2]) else None  # Time column
-                    points_val = row[3] if pd.notna(row[3]) else None  # Points column
-                    date_val = row[4] if pd.notna(row[4]) else None  # Date column
-                    location_val = row[5] if pd.notna(row[5]) else None  # Location column
-                    pool_val = row[6] if pd.notna(row[6]) else None  # Pool length column G
-                    
-                    # Only add if we have valid points
-                    if points_val is not None and isinstance(points_val, (int, float)):
-                        current_swimmer_data.append({
-                            'Name': current_swimmer,
-                            'Tid': time_val,
-                            'Poeng': points_val,
-                            'Dato': date_val,
-                            'Sted': location_val,
-                            'Pool': pool_val
-                        })
-                except:
-                    continue
-    
-    # Add the last swimmer's data
-    if current_swimmer and current_swimmer_data:
-        swimmers_data.append((current_swimmer, current_swimmer_data))
-    
-    # Keep all results for each swimmer (we'll handle pool-specific best results later)
-    all_results = []
-    for swimmer, results in swimmers_data:
-        if results:
-            all_results.extend(results)
-    
-    # Create DataFrame
-    if all_results:
-        result_df = pd.DataFrame(all_results)
+    with stage("read", file=input_file) as record:
+        df = pd.read_excel(input_file, header=None)
+        record["rows_out"] = len(df)
+    
+    with stage("parse", rows_in=len(df), file=input_file) as record:
+        # Find the event name from data rows (where times are shown)
+        event_name = None
+        for idx, row in df.iterrows():
+            # Look for rows that have time data (usually in column 2 or 3)
+            if pd.notna(row[1]) and isinstance(row[1], str):
+                # Check if this looks like an event name (contains distance and stroke)
+                if any(keyword in row[1].lower() for keyword in ['m', 'butterfly', 'freestyle', 'backstroke', 'breaststroke', 'medley']):
+                    event_name = row[1]
+                    break
         
-        # Add gender column
-        result_df['Gender'] = result_df['Name'].apply(identify_gender)
+        if not event_name:
+            print(f"Could not find event name in {input_file}")
+            return None, None, None
         
-        # Debug: Count pool lengths
-        pool_counts = result_df['Pool'].value_counts()
-        print(f"Pool length distribution: {dict(pool_counts)}")
+        print(f"Event name found: {event_name}")
         
-        # Add cleaned name column for comparison
-        result_df['CleanName'] = result_df['Name'].apply(clean_swimmer_name)
+        # Rename "Individuell Medley" to "Medley" (case insensitive)
+        if "individuell medley" in event_name.lower():
+            # Handle all possible case variations
+            event_name = event_name.replace("Individuell Medley", "Medley")
+            event_name = event_name.replace("Individuell medley", "Medley")
+            event_name = event_name.replace("individuell medley", "Medley")
+            print(f"Event name updated to: {event_name}")
         
-        # Check for duplicate names and merge them
-        print(f"Total swimmers before duplicate check: {len(result_df)}")
+        birth_year_col = birth_year_column(df)
         
-        # Group by cleaned name and pool type, keep the best result for each unique swimmer per pool
-        merged_results = []
-        seen_combinations = set()
+        # Initialize lists to store data
+        swimmers_data = []
+        current_swimmer = None
+        current_swimmer_data = []
         
-        for _, group in result_df.groupby(['CleanName', 'Pool']):
-            if len(group) > 1:
-                print(f"Found duplicate swimmer: {group.iloc[0]['CleanName']} in {group.iloc[0]['Pool']} pool ({len(group)} entries)")
-                # Keep the one with highest points for this pool type
-                best_entry = group.loc[group['Poeng'].idxmax()]
-                merged_results.append(best_entry)
-                seen_combinations.add((best_entry['CleanName'], best_entry['Pool']))
+        # Process each row
+        for idx, row in df.iterrows():
+            # Check if this is a swimmer name row (usually has a name in first column)
+            if pd.notna(row[0]) and isinstance(row[0], str):
+                # If we have data from previous swimmer, process it
+                if current_swimmer and current_swimmer_data:
+                    swimmers_data.append((current_swimmer, current_swimmer_data))
+                
+                # Start new swimmer
+                current_swimmer = row[0]
+                current_swimmer_data = []
             else:
-                merged_results.append(group.iloc[0])
-                seen_combinations.add((group.iloc[0]['CleanName'], group.iloc[0]['Pool']))
+                # This is a result row for the current swimmer
+                if current_swimmer:
+                    # Extract relevant data (adjust column indices based on your file structure)
+                    # Assuming: Time, Points, Date, Location, Pool Length are in specific columns
+                    try:
+                        time_val = row[2] if pd.notna(row[2]) else None  # Time column
+                        points_val = row[3] if pd.notna(row[3]) else None  # Points column
+                        date_val = row[4] if pd.notna(row[4]) else None  # Date column
+                        location_val = row[5] if pd.notna(row[5]) else None  # Location column
+                        pool_val = row[6] if pd.notna(row[6]) else None  # Pool length column G
+                        birth_year_val = None
+                        if birth_year_col is not None and pd.notna(row[birth_year_col]):
+                            birth_year_val = pd.to_numeric(row[birth_year_col], errors='coerce')
+                        
+                        # Only add if we have valid points
+                        if points_val is not None and isinstance(points_val, (int, float)):
+                            current_swimmer_data.append({
+                                'Name': current_swimmer,
+                                'Tid': time_val,
+                                'Poeng': points_val,
+                                'Dato': date_val,
+                                'Sted': location_val,
+                                'Pool': pool_val,
+                                'BirthYear': birth_year_val
+                            })
+                    except:
+                        continue
         
-        # Create new DataFrame with merged results
-        result_df = pd.DataFrame(merged_results)
-        result_df = result_df.drop('CleanName', axis=1)  # Remove the temporary column
+        # Add the last swimmer's data
+        if current_swimmer and current_swimmer_data:
+            swimmers_data.append((current_swimmer, current_swimmer_data))
         
-        print(f"Total swimmers after duplicate check: {len(result_df)}")
+        # Keep all results for each swimmer (we'll handle pool-specific best results later)
+        all_results = []
+        for swimmer, results in swimmers_data:
+            if results:
+                all_results.extend(results)
         
-        # Clean the names by removing "Navn: " prefix and format for display
-        result_df['Name'] = result_df['Name'].apply(format_name_for_display)
+        record["event"] = event_name
+        record["rows_out"] = len(all_results)
+    
+    # Create DataFrame
+    if all_results:
+        with stage("classify", rows_in=len(all_results), file=input_file, event=event_name) as record:
+            result_df = pd.DataFrame(all_results)
+            
+            # Add gender column
+            result_df['Gender'] = result_df['Name'].apply(identify_gender)
+            
+            # Debug: Count pool lengths
+            pool_counts = result_df['Pool'].value_counts()
+            print(f"Pool length distribution: {dict(pool_counts)}")
+            
+            # Add cleaned name column for comparison
+            result_df['CleanName'] = result_df['Name'].apply(clean_swimmer_name)
+            
+            # Every result of the file, for the age group and season records. Swimmers have many
+            # results each, so every name is formatted once
+            display_names = {name: format_name_for_display(name) for name in result_df['Name'].unique()}
+            all_results = result_df.assign(Event=event_name, Name=result_df['Name'].map(display_names))
+            all_results = all_results[ALL_RESULTS_COLUMNS]
+            result_df = result_df.drop('BirthYear', axis=1)
+            
+            record["rows_out"] = len(result_df)
         
-        # Sort by Poeng in descending order (highest on top)
-        result_df = result_df.sort_values('Poeng', ascending=False)
+        with stage("dedupe", rows_in=len(result_df), file=input_file, event=event_name) as record:
+            # Check for duplicate names and merge them
+            print(f"Total swimmers before duplicate check: {len(result_df)}")
+            
+            # Group by cleaned name and pool type, keep the best result for each unique swimmer per pool
+            merged_results = []
+            seen_combinations = set()
+            
+            for _, group in result_df.groupby(['CleanName', 'Pool']):
+                if len(group) > 1:
+                    print(f"Found duplicate swimmer: {group.iloc[0]['CleanName']} in {group.iloc[0]['Pool']} pool ({len(group)} entries)")
+                    # Keep the one with highest points for this pool type
+                    best_entry = group.loc[group['Poeng'].idxmax()]
+                    merged_results.append(best_entry)
+                    seen_combinations.add((best_entry['CleanName'], best_entry['Pool']))
+                else:
+                    merged_results.append(group.iloc[0])
+                    seen_combinations.add((group.iloc[0]['CleanName'], group.iloc[0]['Pool']))
+            
+            # Create new DataFrame with merged results
+            result_df = pd.DataFrame(merged_results)
+            result_df = result_df.drop('CleanName', axis=1)  # Remove the temporary column
+            
+            print(f"Total swimmers after duplicate check: {len(result_df)}")
+            
+            # Clean the names by removing "Navn: " prefix and format for display
+            result_df['Name'] = result_df['Name'].map(display_names)
+            
+            # Sort by Poeng in descending order (highest on top)
+            result_df = result_df.sort_values('Poeng', ascending=False)
+            
+            record["rows_out"] = len(result_df)
         
-        return event_name, result_df
+        return event_name, result_df, all_results
     else:
         print("No valid results found")
-        return None, None
+        return None, None, None
 
-def process_all_files():
+def find_grd_files(rawdata_folder="Rawdata"):
     """
-    Process all grdRanking files in the Rawdata folder and create separate files for each event.
+    Find all grdRanking files in the Rawdata folder and its Org subfolder.
     """
-    rawdata_folder = "Rawdata"
-    endresult_folder = "EndResult"
-    
-    # Read exceptions file first
-    exceptions_by_event = read_exceptions_file()
-    
-    # Get all files starting with "grdRanking" in the Rawdata folder and Org subfolder
     grd_files = []
     
     # Process files in Rawdata folder
@@ -290,16 +329,15 @@ def process_all_files():
             if file.startswith("grdRanking") and file.endswith(".xlsx") and not file.startswith("~$"):
                 grd_files.append(os.path.join(org_folder, file))
     
-    print(f"Found {len(grd_files)} grdRanking files to process:")
-    for file in sorted(grd_files):
-        print(f"  - {file}")
-    
-    # Process each file
+    return grd_files
+
+def merge_event_results(processed_files):
+    """
+    Merge the results from process_single_file into one DataFrame per event.
+    """
     all_events = {}
     
-    for file_path in grd_files:
-        event_name, result_df = process_single_file(file_path)
-        
+    for event_name, result_df, _ in processed_files:
         if event_name and result_df is not None:
             # If we already have this event, combine the data
             if event_name in all_events:
@@ -311,7 +349,12 @@ def process_all_files():
             else:
                 all_events[event_name] = result_df
     
-    # Add exceptions data to the events
+    return all_events
+
+def add_exceptions(all_events, exceptions_by_event):
+    """
+    Add the manual entries from the Exceptions file to the merged events.
+    """
     for event_name, exceptions_df in exceptions_by_event.items():
         # Rename "Individuell Medley" to "Medley" in exceptions as well
         if "Individuell Medley" in event_name:
@@ -339,64 +382,165 @@ def process_all_files():
             # Create new event from exceptions only
             all_events[event_name] = exceptions_df_clean.sort_values('Poeng', ascending=False)
     
-    # Create separate files for each event
+    return all_events
+
+def collect_all_results(processed_files, exceptions_by_event):
+    """
+    All results from process_single_file (not only each swimmer's best) and the Exceptions
+    file in one DataFrame with ALL_RESULTS_COLUMNS.
+    """
+    frames = [all_results for _, _, all_results in processed_files if all_results is not None]
+    
+    for event_name, exceptions_df in exceptions_by_event.items():
+        event_name = event_name.replace("Individuell Medley", "Medley")
+        frames.append(exceptions_df.assign(Event=event_name, Name=exceptions_df['Name'].apply(format_name_for_display)))
+    
+    if not frames:
+        return pd.DataFrame(columns=ALL_RESULTS_COLUMNS)
+    return pd.concat([frame.reindex(columns=ALL_RESULTS_COLUMNS) for frame in frames], ignore_index=True)
+
+def clean_event_file_name(event_name):
+    """
+    Clean an event name for use as a file name (and as the event name the website reads back).
+    """
+    return re.sub(r'[<>:"/\\|?*]', '_', event_name).strip()
+
+def split_categories(result_df):
+    """
+    Split an event's results into the Male_25m, Male_50m, Female_25m and Female_50m categories.
+    """
+    return {category_name(key): df for key, df in rank_categories(result_df).items()}
+
+def site_data(all_events):
+    """
+    The display (top 10) and statistics (all data) results per event and category, in the
+    shape (and event order) the website generator loads from the EndResult and Statistics files.
+    """
+    display_data = {}
+    statistics_data = {}
+    
+    for event_name in sorted(all_events, key=clean_event_file_name):
+        clean_event_name = clean_event_file_name(event_name)
+        categories = split_categories(all_events[event_name])
+        display_data[clean_event_name] = {category: df.head(10).to_dict('records') for category, df in categories.items()}
+        statistics_data[clean_event_name] = {category: df.to_dict('records') for category, df in categories.items()}
+    
+    return display_data, statistics_data
+
+def export_events(all_events, endresult_folder="EndResult", statistics_folder="Statistics"):
+    """
+    Write the display (top 10) and statistics (all data) Excel files for each event.
+    """
     print(f"\nCreating separate files for {len(all_events)} events:")
     
+    # Create output folders if they don't exist
+    for folder in [endresult_folder, statistics_folder]:
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+    
     for event_name, result_df in all_events.items():
-        # Create separate DataFrames for each category (top 10 for display, all data for statistics)
-        males_25m_all = result_df[(result_df['Gender'] == 'Male') & (result_df['Pool'] == '25m')]
-        males_50m_all = result_df[(result_df['Gender'] == 'Male') & (result_df['Pool'] == '50m')]
-        females_25m_all = result_df[(result_df['Gender'] == 'Female') & (result_df['Pool'] == '25m')]
-        females_50m_all = result_df[(result_df['Gender'] == 'Female') & (result_df['Pool'] == '50m')]
-        
-        # Top 10 for website display
-        males_25m = males_25m_all.head(10)
-        males_50m = males_50m_all.head(10)
-        females_25m = females_25m_all.head(10)
-        females_50m = females_50m_all.head(10)
+        # Split into the categories in one pass (all data for statistics, top 10 for display)
+        categories = rank_categories(result_df)
         
         # Clean the event name for filename
-        clean_event_name = re.sub(r'[<>:"/\\|?*]', '_', event_name)
-        clean_event_name = clean_event_name.strip()
+        clean_event_name = clean_event_file_name(event_name)
         
         # Create output filename for display (top 10)
         output_filename = os.path.join(endresult_folder, f"{clean_event_name}.xlsx")
         
-        # Save to Excel with four sheets (top 10 for display)
+        # Save to Excel with one sheet per category (top 10 for display)
         with pd.ExcelWriter(output_filename, engine='openpyxl') as writer:
-            males_25m.to_excel(writer, sheet_name='Male_25m', index=False)
-            males_50m.to_excel(writer, sheet_name='Male_50m', index=False)
-            females_25m.to_excel(writer, sheet_name='Female_25m', index=False)
-            females_50m.to_excel(writer, sheet_name='Female_50m', index=False)
+            for key, df in categories.items():
+                df.head(10).to_excel(writer, sheet_name=category_name(key), index=False)
         
         print(f"Created display file: {output_filename}")
-        print(f"  - Male 25m swimmers: {len(males_25m)}")
-        print(f"  - Male 50m swimmers: {len(males_50m)}")
-        print(f"  - Female 25m swimmers: {len(females_25m)}")
-        print(f"  - Female 50m swimmers: {len(females_50m)}")
-        
-        # Create statistics folder if it doesn't exist
-        statistics_folder = "Statistics"
-        if not os.path.exists(statistics_folder):
-            os.makedirs(statistics_folder)
+        for key, df in categories.items():
+            print(f"  - {category_label(key)} swimmers: {len(df.head(10))}")
         
         # Create output filename for statistics (all data)
         statistics_filename = os.path.join(statistics_folder, f"{clean_event_name}_statistics.xlsx")
         
-        # Save to Excel with four sheets (all data for statistics)
+        # Save to Excel with one sheet per category (all data for statistics)
         with pd.ExcelWriter(statistics_filename, engine='openpyxl') as writer:
-            males_25m_all.to_excel(writer, sheet_name='Male_25m', index=False)
-            males_50m_all.to_excel(writer, sheet_name='Male_50m', index=False)
-            females_25m_all.to_excel(writer, sheet_name='Female_25m', index=False)
-            females_50m_all.to_excel(writer, sheet_name='Female_50m', index=False)
+            for key, df in categories.items():
+                df.to_excel(writer, sheet_name=category_name(key), index=False)
         
         print(f"Created statistics file: {statistics_filename}")
-        print(f"  - Male 25m swimmers: {len(males_25m_all)}")
-        print(f"  - Male 50m swimmers: {len(males_50m_all)}")
-        print(f"  - Female 25m swimmers: {len(females_25m_all)}")
-        print(f"  - Female 50m swimmers: {len(females_50m_all)}")
+        for key, df in categories.items():
+            print(f"  - {category_label(key)} swimmers: {len(df)}")
+
+def read_all_files(rawdata_folder="Rawdata"):
+    """
+    Read all grdRanking files and the Exceptions file into merged results per event.
+    
+    Returns the merged results per event and the table of all results (see collect_all_results).
+    """
+    # Read exceptions file first
+    with stage("read", file=os.path.join(rawdata_folder, "Exceptions.xlsx")) as record:
+        exceptions_by_event = read_exceptions_file()
+        record["rows_out"] = sum(len(df) for df in exceptions_by_event.values())
+    
+    # Get all files starting with "grdRanking" in the Rawdata folder and Org subfolder
+    grd_files = find_grd_files(rawdata_folder)
+    
+    print(f"Found {len(grd_files)} grdRanking files to process:")
+    for file in sorted(grd_files):
+        print(f"  - {file}")
+    
+    # Process each file
+    processed_files = [process_single_file(file_path) for file_path in grd_files]
+    
+    rows_parsed = sum(len(df) for _, df, _ in processed_files if df is not None)
+    with stage("merge", rows_in=rows_parsed) as record:
+        all_events = merge_event_results(processed_files)
+        record["rows_out"] = sum(len(df) for df in all_events.values())
+    
+    all_results = collect_all_results(processed_files, exceptions_by_event)
+    
+    # Add exceptions data to the events
+    with stage("exceptions", rows_in=record["rows_out"]) as record:
+        all_events = add_exceptions(all_events, exceptions_by_event)
+        record["rows_out"] = sum(len(df) for df in all_events.values())
+    
+    return all_events, all_results
+
+def process_all_files():
+    """
+    Process all grdRanking files in the Rawdata folder and create separate files for each event.
+    
+    Returns the merged results per event and the table of all results, so callers in the
+    same process can use them without reading the Excel files back.
+    """
+    rawdata_folder = "Rawdata"
+    endresult_folder = "EndResult"
+    
+    all_events, all_results = read_all_files(rawdata_folder)
+    
+    # Create separate files for each event
+    with stage("export", rows_in=sum(len(df) for df in all_events.values())) as record:
+        export_events(all_events, endresult_folder)
+        record["rows_out"] = len(all_events)
+    
+    # Keep every result in the append-only history table
+    with stage("history", rows_in=len(all_results)) as record:
+        record["rows_out"] = len(history.append_history(all_results))
     
     print(f"\nProcessing complete! Created {len(all_events)} files in the EndResult folder.")
+    return all_events, all_results
 
 if __name__ == "__main__":
-    process_all_files() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Process grdRanking files into per-event Excel files")
+    parser.add_argument("--report", metavar="PATH",
+                        help="Write a JSON run report with per-stage timing and memory to PATH")
+    parser.add_argument("--summary", action="store_true", help="Print a per-stage summary table")
+    parser.add_argument("--profile", action="store_true",
+                        help="Run under cProfile, write a .prof and .collapsed file to profiles/ and print the top functions")
+    args = parser.parse_args()
+    
+    if args.report or args.summary:
+        start_run("process_all_events")
+    if args.profile:
+        run_profiled(process_all_files, "process_all_events")
+    else:
+        process_all_files()
+    finish_run(args.report, summary=args.summary) 
\ No newline at end of file
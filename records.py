@@ -0,0 +1,133 @@
+"""
+Age group and season records: the best results per event, gender, pool, age group and season.
+
+The records are computed from the table of all parsed results (see
+process_all_events.collect_all_results), not from the merged results, which only keep each
+swimmer's best result. Every result is counted for its season, and, when the export has the
+swimmer's birth year, for its age group in that season and for the age group over all
+seasons. All tables are then ranked in one groupby.
+
+    python3 records.py    # read Rawdata/ and write Records/records.xlsx
+"""
+
+import os
+import argparse
+
+import pandas as pd
+
+from instrumentation import stage, start_run, finish_run, run_profiled
+from categories import AGE_GROUPS, ALL, CATEGORIES, DIMENSIONS, category_name, rank_results
+
+# A season runs from August to July and is named after its years, e.g. "2025/26"
+SEASON_START_MONTH = 8
+
+# Best results kept per record table
+RECORDS_TOP_N = 3
+
+RECORDS_FOLDER = "Records"
+RECORDS_FILE = "records.xlsx"
+
+RECORD_DIMENSIONS = ("gender", "pool", "age_group", "season")
+RECORD_COLUMNS = ['Event', 'Gender', 'Pool', 'AgeGroup', 'Season', 'Rank', 'Name', 'Tid', 'Poeng', 'Dato', 'Sted']
+
+def add_season_columns(results):
+    """Add the Season and AgeGroup of each result (missing when the date or birth year is unknown)."""
+    dates = pd.to_datetime(results['Dato'], format='%d.%m.%Y', errors='coerce')
+    start_year = dates.dt.year - (dates.dt.month < SEASON_START_MONTH)
+    seasons = start_year.astype('Int64').astype('string') + '/' + ((start_year + 1) % 100).astype('Int64').astype('string').str.zfill(2)
+    
+    ages = dates.dt.year - pd.to_numeric(results['BirthYear'], errors='coerce')
+    limits = [-1] + [age for _, age in AGE_GROUPS[:-1]] + [200]
+    age_groups = pd.cut(ages, bins=limits, labels=[name for name, _ in AGE_GROUPS])
+    
+    return results.assign(Season=seasons.astype(object), AgeGroup=age_groups.astype(object))
+
+def compute_records(all_results, top_n=RECORDS_TOP_N):
+    """
+    The top_n results of every (event, gender, pool, age group, season) table, one result
+    per swimmer, as a DataFrame with RECORD_COLUMNS sorted by table and rank. The tables
+    over all ages and all seasons are the ordinary records and are left out.
+    """
+    from process_all_events import clean_event_file_name
+    
+    genders, pools = DIMENSIONS["gender"][1], DIMENSIONS["pool"][1]
+    results = all_results[all_results['Gender'].isin(genders) & all_results['Pool'].isin(pools)]
+    results = add_season_columns(results.assign(Event=results['Event'].map(clean_event_file_name)))
+    
+    # Each result once per table it counts for: its season (all ages), and with a known age
+    # group also that age group in its season and over all seasons
+    dated = results[results['Season'].notna()]
+    with_age = results[results['AgeGroup'].notna()]
+    tables = pd.concat([
+        dated.assign(AgeGroup=ALL),
+        with_age[with_age['Season'].notna()],
+        with_age.assign(Season=ALL),
+    ], ignore_index=True)
+    
+    # Best result per swimmer and table, then ranked within every table in one pass
+    tables = tables.sort_values('Poeng', ascending=False, kind='stable')
+    tables = tables.drop_duplicates(subset=['Event', 'Gender', 'Pool', 'AgeGroup', 'Season', 'Name'])
+    records = rank_results(tables, RECORD_DIMENSIONS, top_n, by=['Event'])
+    
+    # Display order: event, category, age group, newest season first (all seasons last), rank
+    age_order = {name: index for index, name in enumerate(DIMENSIONS["age_group"][1])}
+    records = records.assign(
+        _category=records['Gender'].map({gender: index for index, gender in enumerate(genders)}) * len(pools)
+        + records['Pool'].map({pool: index for index, pool in enumerate(pools)}),
+        _age=records['AgeGroup'].map(age_order),
+        _season=records['Season'].where(records['Season'] != ALL, ''),
+    )
+    records = records.sort_values(['Event', '_category', '_age', '_season', 'Rank'],
+                                  ascending=[True, True, True, False, True], kind='stable')
+    return records[RECORD_COLUMNS].reset_index(drop=True)
+
+def records_by_category(records):
+    """Split the records into {category name: records} with one entry per standard category."""
+    return {category_name(key): records[(records['Gender'] == key[0]) & (records['Pool'] == key[1])]
+            for key in CATEGORIES}
+
+def export_records(records, records_folder=RECORDS_FOLDER):
+    """Write the records to one Excel file with a sheet per category."""
+    os.makedirs(records_folder, exist_ok=True)
+    records_path = os.path.join(records_folder, RECORDS_FILE)
+    
+    with pd.ExcelWriter(records_path, engine='openpyxl') as writer:
+        for category, df in records_by_category(records).items():
+            df.drop(columns=['Gender', 'Pool']).to_excel(writer, sheet_name=category, index=False)
+    
+    print(f"Created records file: {records_path} ({len(records)} results in "
+          f"{len(records.drop_duplicates(['Event', 'Gender', 'Pool', 'AgeGroup', 'Season']))} tables)")
+    return records_path
+
+def site_records(records):
+    """The records in the shape the website generator loads from the records file: {category: [results]}."""
+    return {category: df.drop(columns=['Gender', 'Pool']).to_dict('records')
+            for category, df in records_by_category(records).items()}
+
+def process_records():
+    """Read the grdRanking and Exceptions files and write the age group and season records."""
+    import process_all_events
+    
+    _, all_results = process_all_events.read_all_files()
+    with stage("records", rows_in=len(all_results)) as record:
+        records = compute_records(all_results)
+        record["rows_out"] = len(records)
+    export_records(records)
+    return records
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compute the age group and season records")
+    parser.add_argument("--report", metavar="PATH",
+                        help="Write a JSON run report with per-stage timing and memory to PATH")
+    parser.add_argument("--summary", action="store_true", help="Print a per-stage summary table")
+    parser.add_argument("--profile", action="store_true",
+                        help="Run under cProfile, write a .prof and .collapsed file to profiles/ and print the top functions")
+    args = parser.parse_args()
+    
+    if args.report or args.summary:
+        start_run("records")
+    if args.profile:
+        run_profiled(process_records, "records")
+    else:
+        process_records()
+    finish_run(args.report, summary=args.summary)
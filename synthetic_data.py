@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Generate synthetic grdRanking files in the medley.no export layout.
+
+Used by the benchmark suite to test the pipeline on much larger exports than
+the club has today. Each file holds one event with a header row, "Navn:" rows
+for each swimmer and their result rows (Nr, Distanse, Tid, Poeng, Dato, Sted,
+Basseng, D, RK, RA).
+"""
+
+import argparse
+import math
+import os
+import random
+
+from openpyxl import Workbook
+
+# Approximate long course world records in seconds, used to derive times from points
+EVENTS = {
+    "50m Butterfly": 22.27,
+    "50m Rygg": 23.55,
+    "50m Bryst": 25.95,
+    "50m Fri": 20.91,
+    "100m Butterfly": 49.45,
+    "100m Rygg": 51.60,
+    "100m Bryst": 56.88,
+    "100m Fri": 46.40,
+    "100m Medley": 49.28,
+    "200m Butterfly": 110.34,
+    "200m Rygg": 111.92,
+    "200m Bryst": 125.48,
+    "200m Fri": 102.00,
+    "200m Medley": 114.00,
+    "400m Fri": 220.07,
+    "400m Medley": 242.50,
+    "800m Fri": 452.12,
+    "1500m Fri": 871.02,
+}
+
+MALE_FIRST_NAMES = [
+    "Odin", "Adam", "Jon", "Albert", "Ole", "Johannes", "Tomas", "Sondre", "Andreas", "Bjarne",
+    "Brage", "Ådne", "Sindre", "Vetle", "Terje", "Gabriel", "Thomas", "Einar", "Elias", "Magnus",
+    "Bendik", "Jakob", "Rasmus", "Sebastian", "Johan", "Kristian", "Tobias", "Simen", "Bjørnar",
+    "Erlend", "Fredrik", "Edvin", "Håkon", "Øyvind", "Kåre", "Sigurd",
+]
+
+FEMALE_FIRST_NAMES = [
+    "Sara", "Maria", "Silje", "Carina", "Henriette", "Elise", "Vilde", "Tove", "Amanda", "Kirsti",
+    "Guro", "Frøydis", "Mari", "Sissel", "Gudrun", "Solveig", "Elisabeth", "Malin", "Sigrid",
+    "Heidi", "Ingrid", "Ada", "Nicole", "Marie", "Stine", "Annika", "Julie", "Karoline", "Åse",
+    "Ragnhild", "Synnøve", "Kjersti",
+]
+
+LAST_NAMES = [
+    "Hansen", "Johansen", "Olsen", "Larsen", "Andersen", "Pedersen", "Nilsen", "Kristiansen",
+    "Jensen", "Karlsen", "Johnsen", "Pettersen", "Eriksen", "Berg", "Haugen", "Hagen", "Dahl",
+    "Jørgensen", "Halvorsen", "Henriksen", "Lund", "Sørensen", "Moen", "Gundersen", "Iversen",
+    "Strand", "Solberg", "Svendsen", "Eide", "Knutsen", "Martinsen", "Bakken", "Mathisen", "Lie",
+    "Amundsen", "Lunde", "Solheim", "Berge", "Moe", "Nygård", "Bakke", "Holm", "Lien", "Hauge",
+    "Sæther", "Aas", "Myhre", "Haugland", "Sandvik", "Rønning", "Næss", "Vik", "Birkeland",
+    "Strøm", "Tangen", "Ødegård", "Aune", "Brekke", "Volden", "Båtbukt", "Alvestad", "Tronvoll",
+]
+
+LOCATIONS = [
+    "Trondheim", "Stjørdal", "Bergen", "Stavanger", "Kristiansand", "Drammen", "Tøyen",
+    "Fredrikstad", "Ålesund", "Tromsø", "Bodø", "Molde", "Steinkjer", "Orkanger",
+]
+
+HEADER = ["Nr", "Distanse", "Tid", "Poeng", "Dato", "Sted", "Basseng", "D", "RK", "RA"]
+
+# Keep each workbook to a realistic size; bigger datasets are split over several files per event
+MAX_RESULTS_PER_FILE = 50000
+
+def format_time(seconds):
+    """Format seconds the way medley.no does ('50,11' or '1.01,16')."""
+    hundredths = int(round(seconds * 100))
+    minutes, hundredths = divmod(hundredths, 6000)
+    secs, hundredths = divmod(hundredths, 100)
+    if minutes:
+        return f"{minutes}.{secs:02d},{hundredths:02d}"
+    return f"{secs},{hundredths:02d}"
+
+def make_swimmers(count, rng):
+    """Create a list of swimmer names in 'Last, First Middle' format."""
+    swimmers = []
+    for _ in range(count):
+        if rng.random() < 0.5:
+            first_name = rng.choice(MALE_FIRST_NAMES)
+        else:
+            first_name = rng.choice(FEMALE_FIRST_NAMES)
+        middle = f" {rng.choice(LAST_NAMES)}" if rng.random() < 0.3 else ""
+        swimmers.append(f"{rng.choice(LAST_NAMES)}, {first_name}{middle}")
+    return swimmers
+
+def make_result(event_name, world_record, rng):
+    """Create one result row (without Nr) with consistent time and points."""
+    points = max(1, min(999, int(rng.gauss(350, 150))))
+    # FINA points: 1000 * (WR / time)^3
+    seconds = world_record * (1000 / points) ** (1 / 3)
+    pool = "25m" if rng.random() < 0.65 else "50m"
+    if pool == "25m":
+        seconds *= 0.97
+    date = f"{rng.randint(1, 28):02d}.{rng.randint(1, 12):02d}.{rng.randint(2000, 2026)}"
+    rank = rng.randint(1, 300) if rng.random() < 0.5 else None
+    return [
+        event_name,
+        format_time(seconds),
+        points,
+        date,
+        rng.choice(LOCATIONS),
+        pool,
+        "D" if rng.random() < 0.4 else None,
+        rank,
+        rank * 5 if rank else None,
+    ]
+
+def write_grd_file(file_path, event_name, swimmers, result_count, rng):
+    """Write one grdRanking workbook with result_count results for event_name."""
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(HEADER)
+    
+    world_record = EVENTS[event_name]
+    nr = 1
+    written = 0
+    while written < result_count:
+        sheet.append([f"Navn: {rng.choice(swimmers)}"])
+        for _ in range(min(rng.randint(1, 8), result_count - written)):
+            sheet.append([nr] + make_result(event_name, world_record, rng))
+            nr += 1
+            written += 1
+    
+    workbook.save(file_path)
+
+def generate_rawdata(output_folder, total_results, seed=42):
+    """
+    Write synthetic grdRanking files with total_results results spread over all events.
+    
+    Returns the list of written files.
+    """
+    rng = random.Random(seed)
+    os.makedirs(output_folder, exist_ok=True)
+    
+    # Roughly 20 results per swimmer, as in the real club exports
+    swimmers = make_swimmers(max(10, total_results // 20), rng)
+    
+    per_event = total_results // len(EVENTS)
+    remainder = total_results % len(EVENTS)
+    
+    files = []
+    file_number = 1
+    for index, event_name in enumerate(EVENTS):
+        event_results = per_event + (1 if index < remainder else 0)
+        file_count = max(1, math.ceil(event_results / MAX_RESULTS_PER_FILE))
+        for part in range(file_count):
+            part_results = event_results // file_count + (1 if part < event_results % file_count else 0)
+            if part_results == 0:
+                continue
+            file_path = os.path.join(output_folder, f"grdRanking ({file_number}).xlsx")
+            write_grd_file(file_path, event_name, swimmers, part_results, rng)
+            files.append(file_path)
+            file_number += 1
+    
+    return files
+
+def main():
+    """Write a synthetic Rawdata folder."""
+    parser = argparse.ArgumentParser(description="Generate synthetic grdRanking files")
+    parser.add_argument("output_folder", help="Folder to write grdRanking files to")
+    parser.add_argument("--results", type=int, default=10000, help="Total number of results (default: 10000)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed (default: 42)")
+    args = parser.parse_args()
+    
+    files = generate_rawdata(args.output_folder, args.results, args.seed)
+    print(f"✅ Wrote {args.results} results in {len(files)} files to {args.output_folder}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,550 @@
+#!/usr/bin/env python3
+"""
+Command-line interface that runs the TSLK pipeline stages in one process.
+
+    python3 tslk.py ingest       # Rawdata/ grdRanking files -> EndResult/ and Statistics/
+    python3 tslk.py diff         # compare the grdRanking files with the current records
+    python3 tslk.py records      # age group and season records -> Records/records.xlsx
+    python3 tslk.py progression  # personal best and club record progression -> History/progression.xlsx
+    python3 tslk.py build-site   # generate the website in www/
+    python3 tslk.py verify       # check the results the website is built from
+    python3 tslk.py stats        # print a summary of the results
+    python3 tslk.py all          # all of the above
+    python3 tslk.py info         # latest update date, events and last site build
+    python3 tslk.py watch        # rebuild the website whenever Rawdata/ changes
+    python3 tslk.py serve        # preview the website from memory, with live reload
+    python3 tslk.py api          # read-only JSON API over the results
+
+Several commands can be given at once (e.g. `tslk.py ingest build-site`); they always run
+in the order above. Results loaded by one stage are kept in memory for the next, so
+`all` reads the grdRanking files once and never reads back the Excel files it writes.
+
+The pipeline modules (and with them pandas) are imported by the stages that use them,
+so `info` only reads file names, dates and the build manifest and starts in milliseconds.
+"""
+
+import argparse
+import glob
+import hashlib
+import importlib
+import json
+import os
+import sys
+import time
+import traceback
+from contextlib import contextmanager
+from datetime import datetime
+
+from instrumentation import start_run, finish_run, run_profiled
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "www"))
+
+# Pipeline stages in the order they run
+PIPELINE = ["ingest", "diff", "records", "progression", "build-site", "verify", "stats"]
+
+# Commands that are not part of `all`: metadata only, and the long-running watch and server modes
+COMMANDS = PIPELINE + ["info", "watch", "serve", "api"]
+
+ROOT_FOLDER = os.path.dirname(os.path.abspath(__file__))
+WWW_FOLDER = os.path.join(ROOT_FOLDER, "www")
+RAWDATA_FOLDER = "Rawdata"
+
+# Watch mode polls Rawdata/ this often (seconds), and rebuilds once the files have not
+# changed for WATCH_DEBOUNCE seconds, so a file that is still being copied is not read
+WATCH_INTERVAL = 0.25
+WATCH_DEBOUNCE = 0.5
+
+# The preview server (`tslk.py serve`) also rebuilds when the site generator changes
+GENERATOR_SOURCE = os.path.join(WWW_FOLDER, "generate_website.py")
+
+# Default ports of the preview server and the JSON API (`tslk.py api`)
+PREVIEW_PORT = 8000
+API_PORT = 8001
+
+@contextmanager
+def in_folder(folder):
+    """Run the enclosed code with folder as the working directory."""
+    previous = os.getcwd()
+    os.chdir(folder)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+def new_session(commands, port=None):
+    """The data shared between the stages of one run; filled in as the stages load it."""
+    return {
+        "commands": commands,
+        "port": port,
+        "events": None,
+        "all_results": None,
+        "records": None,
+        "history": None,
+        "progression": None,
+        "previous_records": None,
+        "all_data": None,
+        "statistics_data": None,
+        "improvements": None,
+    }
+
+def site_results(session):
+    """
+    The display (top 10) and statistics (all data) results of the session: from the
+    ingested events when there are any, otherwise from the EndResult and Statistics files.
+    """
+    import process_all_events
+    import generate_website
+    
+    if session["all_data"] is None:
+        if session["events"] is not None:
+            session["all_data"], session["statistics_data"] = process_all_events.site_data(session["events"])
+        else:
+            with in_folder(WWW_FOLDER):
+                session["all_data"] = generate_website.load_all_results()
+                session["statistics_data"] = generate_website.load_statistics_data()
+    return session["all_data"], session["statistics_data"]
+
+def record_tables(session):
+    """The age group and season records, computed from all parsed results once per session."""
+    import process_all_events
+    import records
+    
+    if session["records"] is None:
+        if session["all_results"] is None:
+            session["events"], session["all_results"] = process_all_events.read_all_files()
+        session["records"] = records.compute_records(session["all_results"])
+    return session["records"]
+
+def progression_tables(session):
+    """
+    The personal best and club record progression, computed once per session from the
+    history file and the session's parsed results that are not in it yet.
+    """
+    import history
+    
+    if session["progression"] is None:
+        if session["history"] is None:
+            session["history"] = history.load_history()
+            if session["all_results"] is not None:
+                session["history"] = history.merge_history(session["history"], session["all_results"])
+        session["progression"] = history.compute_progression(session["history"])
+    return session["progression"]
+
+def site_records(session):
+    """The records for the website when the session has ingested results; None lets the site load Records/."""
+    import records
+    
+    if session["events"] is None:
+        return None
+    return records.site_records(record_tables(session))
+
+def site_progression(session):
+    """The progression for the website when the session has ingested results; None lets the site load History/."""
+    import history
+    
+    if session["events"] is None:
+        return None
+    return history.site_progression(progression_tables(session))
+
+def run_ingest(session):
+    """Process the grdRanking files into the EndResult and Statistics files."""
+    import process_all_events
+    import analyze_new_records
+    
+    if "diff" in session["commands"]:
+        # diff compares with the records as they were before this run replaces them
+        session["previous_records"] = analyze_new_records.load_current_records()
+    
+    session["events"], session["all_results"] = process_all_events.process_all_files()
+    session["all_data"] = session["statistics_data"] = None
+    session["records"] = session["improvements"] = None
+    session["history"] = session["progression"] = None
+
+def record_improvements(session):
+    """The results of the grdRanking files that beat the current records, computed once per session."""
+    import process_all_events
+    import analyze_new_records
+    
+    if session["improvements"] is None:
+        if session["events"] is None:
+            session["events"], session["all_results"] = process_all_events.read_all_files()
+        
+        current_records = session["previous_records"]
+        if current_records is None:
+            current_records = analyze_new_records.load_current_records()
+        
+        # Compare under the event names used for the EndResult files
+        new_records = {process_all_events.clean_event_file_name(event_name): result_df
+                       for event_name, result_df in session["events"].items()}
+        session["improvements"] = analyze_new_records.compare_records(new_records, current_records)
+    return session["improvements"]
+
+def run_diff(session):
+    """Print the results of the grdRanking files that beat the current records."""
+    import analyze_new_records
+    
+    analyze_new_records.print_improvements(record_improvements(session))
+
+def run_records(session):
+    """Compute the age group and season records and write Records/records.xlsx."""
+    import records
+    
+    records.export_records(record_tables(session))
+
+def run_progression(session):
+    """Compute the personal best and club record progression and write History/progression.xlsx."""
+    import history
+    
+    history.export_progression(progression_tables(session))
+
+def run_build_site(session):
+    """Generate the website from the session's results; returns False when the payload is over budget."""
+    import generate_website
+    
+    all_data, statistics_data = site_results(session)
+    records_data = site_records(session)
+    progression_data = site_progression(session)
+    with in_folder(WWW_FOLDER):
+        try:
+            generate_website.generate_html(all_data=all_data, statistics_data=statistics_data, records_data=records_data,
+                                           progression_data=progression_data)
+        except generate_website.PayloadBudgetError:
+            # The site is still written; the later stages run and the command exits with an error
+            return False
+
+def run_verify(session):
+    """Check the session's results; returns False when a problem was found."""
+    import verify_all_results
+    import generate_website
+    
+    all_data, statistics_data = site_results(session)
+    
+    print("\n🔍 Verifying results...")
+    problem_count = 0
+    for event_name in sorted(statistics_data, key=generate_website.sort_events):
+        problems = verify_all_results.verify_event_data(event_name, all_data.get(event_name, {}),
+                                                        statistics_data[event_name])
+        problem_count += len(problems)
+    
+    missing = sorted(set(all_data) - set(statistics_data))
+    for event_name in missing:
+        print(f"❌ {event_name}: no statistics results")
+    problem_count += len(missing)
+    
+    if problem_count:
+        print(f"\n❌ {problem_count} problems found")
+        return False
+    print(f"\n✅ All {len(statistics_data)} events verified")
+    return True
+
+def run_stats(session):
+    """Print the totals shown on the statistics page."""
+    import generate_website
+    
+    _, statistics_data = site_results(session)
+    
+    events = sorted(statistics_data, key=generate_website.sort_events)
+    statistics = generate_website.compute_statistics(generate_website.build_results_store(statistics_data), events)
+    
+    print("\n📊 Statistics")
+    print(f"  Events: {len(events)}")
+    print(f"  Results: {statistics['total_swimmers']}")
+    print(f"  Men: {statistics['gender_stats']['Male']}, women: {statistics['gender_stats']['Female']}")
+    print(f"  25m pool: {statistics['pool_stats']['25m']}, 50m pool: {statistics['pool_stats']['50m']}")
+    for label, top_10 in [("men", statistics['top_10_male']), ("women", statistics['top_10_female'])]:
+        if top_10:
+            best = top_10[0]
+            print(f"  Best result ({label}): {best['Name']} - {best['Poeng']} points, {best['Event']} {best['Pool']}")
+
+def run_info(session):
+    """Print the latest update date, the events and the last site build, without loading any results."""
+    import generate_website
+    
+    with in_folder(WWW_FOLDER):
+        latest_date = generate_website.get_latest_file_date()
+    print(f"📅 Latest update: {latest_date}")
+    
+    event_files = glob.glob(os.path.join(ROOT_FOLDER, "EndResult", "*.xlsx"))
+    events = sorted((os.path.splitext(os.path.basename(path))[0] for path in event_files
+                     if not os.path.basename(path).startswith("~$")), key=generate_website.sort_events)
+    print(f"🏊 Events ({len(events)}): {', '.join(events)}")
+    
+    manifest_path = os.path.join(WWW_FOLDER, generate_website.BUILD_MANIFEST)
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            files = json.load(f).get("files", {})
+        built = datetime.fromtimestamp(os.path.getmtime(manifest_path)).strftime("%d.%m.%Y %H:%M")
+        print(f"🌐 Last site build: {built}, {len(files)} files ({sum(entry['bytes'] for entry in files.values()) / 1024:.0f} KB)")
+    else:
+        print("🌐 No site build yet (run `python3 tslk.py build-site`)")
+
+def watched_files(rawdata_folder=RAWDATA_FOLDER, extra_files=()):
+    """
+    (modification time, size) of the grdRanking files in Rawdata/ and Rawdata/Org/, of the
+    Exceptions file and of extra_files, with the grdRanking files in the order a full run
+    reads them. Excel's ~$ lock files are skipped.
+    """
+    import process_all_events
+    
+    paths = process_all_events.find_grd_files(rawdata_folder)
+    paths.append(os.path.join(rawdata_folder, "Exceptions.xlsx"))
+    paths.extend(extra_files)
+    
+    snapshot = {}
+    for path in paths:
+        try:
+            file_stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        snapshot[path] = (file_stat.st_mtime_ns, file_stat.st_size)
+    return snapshot
+
+def update_events(session, snapshot, rawdata_folder=RAWDATA_FOLDER):
+    """
+    Bring the session's events up to date with the files in snapshot. Only new and changed
+    files are parsed again; the merge and the exceptions are redone from the parsed files
+    kept in the session. Returns the names of the events whose results changed.
+    """
+    import process_all_events
+    
+    exceptions_path = os.path.join(rawdata_folder, "Exceptions.xlsx")
+    parsed = session.setdefault("parsed_files", {})
+    
+    grd_files = [path for path in snapshot if os.path.basename(path).startswith("grdRanking")]
+    for path in grd_files:
+        if path not in parsed or parsed[path][0] != snapshot[path]:
+            parsed[path] = (snapshot[path], process_all_events.process_single_file(path))
+    for path in set(parsed) - set(grd_files):
+        print(f"Removed: {path}")
+        del parsed[path]
+    
+    exceptions = session.get("exceptions")
+    if exceptions is None or exceptions[0] != snapshot.get(exceptions_path):
+        session["exceptions"] = (snapshot.get(exceptions_path), process_all_events.read_exceptions_file())
+    
+    processed_files = [parsed[path][1] for path in grd_files]
+    all_events = process_all_events.merge_event_results(processed_files)
+    all_results = process_all_events.collect_all_results(processed_files, session["exceptions"][1])
+    all_events = process_all_events.add_exceptions(all_events, session["exceptions"][1])
+    
+    previous = session["events"] or {}
+    changed = [event_name for event_name, result_df in all_events.items()
+               if event_name not in previous or not result_df.equals(previous[event_name])]
+    changed += [event_name for event_name in previous if event_name not in all_events]
+    
+    session["events"], session["all_results"] = all_events, all_results
+    session["all_data"] = session["statistics_data"] = None
+    session["records"] = session["improvements"] = None
+    session["history"] = session["progression"] = None
+    return changed
+
+def reload_generator(session, snapshot):
+    """Reload generate_website when its source changed since the last build; returns True if it did."""
+    import generate_website
+    
+    signature = snapshot.get(GENERATOR_SOURCE)
+    previous = session.get("generator_signature", signature)
+    session["generator_signature"] = signature
+    if signature is None or signature == previous:
+        return False
+    
+    try:
+        importlib.reload(generate_website)
+    except Exception as e:
+        print(f"❌ Could not reload generate_website.py: {e}")
+        return False
+    return True
+
+def rebuild(session, snapshot):
+    """
+    Update the events from the changed files, then the website, then the changed events'
+    and the records' Excel files and the history. In a preview session the site is built
+    into memory and nothing is written.
+    """
+    import process_all_events
+    import generate_website
+    
+    started = time.perf_counter()
+    previous_records = session["records"]
+    previous_history = session["history"]
+    changed = update_events(session, snapshot)
+    # A result that is nobody's best can still change an age group or season record, and the progression
+    records_changed = previous_records is None or not record_tables(session).equals(previous_records)
+    progression_tables(session)
+    history_changed = previous_history is None or len(session["history"]) != len(previous_history)
+    layout_changed = reload_generator(session, snapshot)
+    if not changed and not records_changed and not history_changed and not layout_changed and session.get("site_built"):
+        print("✅ No results changed")
+        return
+    
+    all_data, statistics_data = site_results(session)
+    records_data = site_records(session)
+    progression_data = site_progression(session)
+    preview = session.get("preview")
+    # Built into a copy, so the server keeps serving the previous build until this one is done
+    files = dict(preview["files"]) if preview else None
+    with in_folder(WWW_FOLDER):
+        # An over-budget payload is reported, but must not stop the watcher
+        generate_website.generate_html(enforce_budgets=False, all_data=all_data, statistics_data=statistics_data,
+                                       memory=files, records_data=records_data, progression_data=progression_data)
+    session["site_built"] = True
+    
+    if preview:
+        import preview_server
+        
+        preview_server.publish_preview(preview, files)
+        print(f"\n✅ Preview updated in {time.perf_counter() - started:.1f}s ({len(changed)} events changed)")
+        return
+    print(f"\n✅ Website updated in {time.perf_counter() - started:.1f}s ({len(changed)} events changed)")
+    
+    # The Excel files are only read by the other scripts, so they are written after the site
+    changed_events = {event_name: session["events"][event_name] for event_name in changed if event_name in session["events"]}
+    if changed_events:
+        process_all_events.export_events(changed_events)
+    if records_changed:
+        import records
+        
+        records.export_records(record_tables(session))
+    if history_changed:
+        import history
+        
+        history.append_history(session["all_results"])
+        history.export_progression(progression_tables(session))
+
+def watch_loop(session, snapshot, extra_files=()):
+    """Poll the watched files and rebuild after every change, until interrupted."""
+    while True:
+        time.sleep(WATCH_INTERVAL)
+        current = watched_files(extra_files=extra_files)
+        if current == snapshot:
+            continue
+        
+        # Wait until the files stop changing, e.g. while a large export is being copied
+        while True:
+            time.sleep(WATCH_DEBOUNCE)
+            settled = watched_files(extra_files=extra_files)
+            if settled == current:
+                break
+            current = settled
+        
+        changed_files = sorted(path for path in set(current) | set(snapshot) if current.get(path) != snapshot.get(path))
+        print(f"\n🔄 Changed: {', '.join(changed_files)}")
+        try:
+            rebuild(session, current)
+        except Exception:
+            # e.g. a half-saved file or a mistake in generate_website.py; the next change retries
+            traceback.print_exc()
+            print("❌ Rebuild failed")
+        snapshot = current
+        print(f"\n👀 Watching {RAWDATA_FOLDER}/ ({len(snapshot)} files)")
+
+def run_watch(session):
+    """Rebuild the website whenever the grdRanking files or the Exceptions file change, until Ctrl+C."""
+    snapshot = watched_files()
+    print(f"👀 Watching {RAWDATA_FOLDER}/ ({len(snapshot)} files); the first build reads every file")
+    rebuild(session, snapshot)
+    
+    try:
+        watch_loop(session, snapshot)
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")
+
+def run_serve(session):
+    """
+    Serve the website from memory on localhost and rebuild it, reloading the open pages,
+    whenever Rawdata/ or www/generate_website.py change, until Ctrl+C.
+    """
+    import preview_server
+    import generate_website
+    
+    session["preview"] = preview_server.new_preview()
+    snapshot = watched_files(extra_files=[GENERATOR_SOURCE])
+    print(f"👀 Watching {RAWDATA_FOLDER}/ ({len(snapshot) - 1} files) and generate_website.py; the first build reads every file")
+    rebuild(session, snapshot)
+    
+    port = session["port"] or PREVIEW_PORT
+    server = preview_server.start_preview_server(session["preview"], WWW_FOLDER, [generate_website.LOGO_SOURCE], port)
+    print(f"🌐 Preview at http://localhost:{port}/ (Ctrl+C stops)")
+    try:
+        watch_loop(session, snapshot, extra_files=[GENERATOR_SOURCE])
+    except KeyboardInterrupt:
+        print("\n👋 Stopped the preview server")
+    finally:
+        server.shutdown()
+
+def run_api(session):
+    """Serve the read-only JSON API (see api_server.py) over the session's results on localhost, until Ctrl+C."""
+    import api_server
+    import generate_website
+    
+    _, statistics_data = site_results(session)
+    events = sorted(statistics_data, key=generate_website.sort_events)
+    results = generate_website.build_results_store(statistics_data)
+    
+    # The ETag covers the results and the grdRanking files /api/diff is computed from
+    data = json.dumps([statistics_data, list(watched_files().items())], sort_keys=True, default=str)
+    data_hash = hashlib.sha256(data.encode("utf-8")).hexdigest()
+    
+    api = api_server.new_api(results, events, data_hash, lambda: record_improvements(session))
+    port = session["port"] or API_PORT
+    server = api_server.api_server(api, port)
+    print(f"🔌 API at http://localhost:{port}/api/events ({len(events)} events, {len(results)} results; Ctrl+C stops)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Stopped the API server")
+    finally:
+        server.server_close()
+
+STAGES = {
+    "ingest": run_ingest,
+    "diff": run_diff,
+    "records": run_records,
+    "progression": run_progression,
+    "build-site": run_build_site,
+    "verify": run_verify,
+    "stats": run_stats,
+    "info": run_info,
+    "watch": run_watch,
+    "serve": run_serve,
+    "api": run_api,
+}
+
+def run_commands(commands, port=None):
+    """Run the given pipeline stages in pipeline order; returns False when a stage (build-site or verify) failed."""
+    if "all" in commands:
+        commands = PIPELINE + [command for command in commands if command not in PIPELINE + ["all"]]
+    commands = [command for command in COMMANDS if command in commands]
+    
+    session = new_session(commands, port)
+    success = True
+    with in_folder(ROOT_FOLDER):
+        for command in commands:
+            print(f"\n▶️  tslk {command}")
+            if STAGES[command](session) is False:
+                success = False
+    return success
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the TSLK pipeline stages in one process")
+    parser.add_argument("commands", nargs="+", choices=COMMANDS + ["all"], metavar="command",
+                        help=f"Stages to run: {', '.join(COMMANDS)} or all ({', '.join(PIPELINE)})")
+    parser.add_argument("--report", metavar="PATH",
+                        help="Write a JSON run report with per-stage timing and memory to PATH")
+    parser.add_argument("--summary", action="store_true", help="Print a per-stage summary table")
+    parser.add_argument("--profile", action="store_true",
+                        help="Run under cProfile, write a .prof and .collapsed file to profiles/ and print the top functions")
+    parser.add_argument("--port", type=int,
+                        help=f"Port of the preview server (default {PREVIEW_PORT}) or the API (default {API_PORT})")
+    args = parser.parse_args()
+    
+    if args.report or args.summary:
+        start_run("tslk")
+    if args.profile:
+        success = run_profiled(lambda: run_commands(args.commands, args.port), "tslk")
+    else:
+        success = run_commands(args.commands, args.port)
+    finish_run(args.report, summary=args.summary)
+    
+    if not success:
+        sys.exit(1)
@@ -3,10 +3,11 @@
 Script to regenerate the TSLK website after updating the data.
 """
 
-import subprocess
 import os
 import sys
 
+import tslk
+
 def main():
     """Regenerate the website."""
     print("🔄 Regenerating TSLK website...")
@@ -16,16 +17,13 @@ def main():
         print("❌ www folder not found!")
         return
     
-    # Change to www directory
-    os.chdir("www")
-    
     try:
-        # Run the website generation script
-        result = subprocess.run([sys.executable, "generate_website.py"], 
-                              capture_output=True, text=True, check=True)
+        # Generate the website in this process (same as `python3 tslk.py build-site`)
+        if not tslk.run_commands(["build-site"]):
+            print("❌ Website generated, but the payload is over budget (see the report above)")
+            sys.exit(1)
         
         print("✅ Website regenerated successfully!")
-        print(result.stdout)
         
         print("\n📁 Files created:")
         print("  - www/index.html (main website)")
@@ -36,9 +34,6 @@ def main():
         print("  - Open www/index.html in your web browser")
         print("  - Or run: open www/index.html")
         
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Error generating website: {e}")
-        print(f"Error output: {e.stderr}")
     except Exception as e:
         print(f"❌ Unexpected error: {e}")
 
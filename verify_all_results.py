@@ -1,6 +1,8 @@
 import pandas as pd
 import os
 
+from categories import CATEGORY_NAMES, category_key
+
 def verify_event_file(file_path):
     """
     Verify the contents of a single event file.
@@ -10,33 +12,17 @@ def verify_event_file(file_path):
     print(f"{'='*60}")
     
     try:
-        # Read all four sheets from the Excel file
-        males_25m = pd.read_excel(file_path, sheet_name='Male_25m')
-        males_50m = pd.read_excel(file_path, sheet_name='Male_50m')
-        females_25m = pd.read_excel(file_path, sheet_name='Female_25m')
-        females_50m = pd.read_excel(file_path, sheet_name='Female_50m')
-        
-        print(f"\n📊 MALE 25m SWIMMERS: {len(males_25m)}")
-        if len(males_25m) > 0:
-            print(f"Best: {males_25m.iloc[0]['Name']} - {males_25m.iloc[0]['Poeng']} points")
-            print(f"Average: {males_25m['Poeng'].mean():.1f} points")
-        
-        print(f"\n🏊‍♂️ MALE 50m SWIMMERS: {len(males_50m)}")
-        if len(males_50m) > 0:
-            print(f"Best: {males_50m.iloc[0]['Name']} - {males_50m.iloc[0]['Poeng']} points")
-            print(f"Average: {males_50m['Poeng'].mean():.1f} points")
-        
-        print(f"\n🏊‍♀️ FEMALE 25m SWIMMERS: {len(females_25m)}")
-        if len(females_25m) > 0:
-            print(f"Best: {females_25m.iloc[0]['Name']} - {females_25m.iloc[0]['Poeng']} points")
-            print(f"Average: {females_25m['Poeng'].mean():.1f} points")
+        # Read all category sheets from the Excel file in one call
+        sheets = pd.read_excel(file_path, sheet_name=CATEGORY_NAMES)
         
-        print(f"\n🏊‍♀️ FEMALE 50m SWIMMERS: {len(females_50m)}")
-        if len(females_50m) > 0:
-            print(f"Best: {females_50m.iloc[0]['Name']} - {females_50m.iloc[0]['Poeng']} points")
-            print(f"Average: {females_50m['Poeng'].mean():.1f} points")
+        for category, df in sheets.items():
+            gender, pool = category_key(category)
+            print(f"\n📊 {gender.upper()} {pool} SWIMMERS: {len(df)}")
+            if len(df) > 0:
+                print(f"Best: {df.iloc[0]['Name']} - {df.iloc[0]['Poeng']} points")
+                print(f"Average: {df['Poeng'].mean():.1f} points")
         
-        total_swimmers = len(males_25m) + len(males_50m) + len(females_25m) + len(females_50m)
+        total_swimmers = sum(len(df) for df in sheets.values())
         print(f"\n📈 TOTAL SWIMMERS: {total_swimmers}")
         
         return True
@@ -45,6 +31,44 @@ def verify_event_file(file_path):
         print(f"Error reading file {file_path}: {e}")
         return False
 
+def verify_event_data(event_name, display_data, statistics_data):
+    """
+    Verify one event's results as the website loads them ({category: [results]}).
+    
+    Checks that each category has at most 10 display results, that results are sorted by
+    points with one result per swimmer, and that the display results are the top of the
+    statistics results. Returns the problems found.
+    """
+    problems = []
+    
+    for category in CATEGORY_NAMES:
+        display = display_data.get(category, [])
+        results = statistics_data.get(category, [])
+        
+        if len(display) > 10:
+            problems.append(f"{category}: {len(display)} display results (max 10)")
+        
+        points = [row['Poeng'] for row in results]
+        if any(higher < lower for higher, lower in zip(points, points[1:])):
+            problems.append(f"{category}: results are not sorted by points")
+        
+        names = [row['Name'] for row in results]
+        if len(set(names)) != len(names):
+            problems.append(f"{category}: {len(names) - len(set(names))} duplicate swimmers")
+        
+        if [row['Name'] for row in display] != names[:len(display)]:
+            problems.append(f"{category}: display results are not the top of the statistics results")
+    
+    total_swimmers = sum(len(results) for results in statistics_data.values())
+    if problems:
+        print(f"❌ {event_name}: {len(problems)} problems")
+        for problem in problems:
+            print(f"   - {problem}")
+    else:
+        print(f"✅ {event_name}: {total_swimmers} results")
+    
+    return problems
+
 def main():
     """
     Verify all files in the EndResult folder.
@@ -1,9 +1,53 @@
-import pandas as pd
 import os
+import math
+import re
 import json
+import html
+import hashlib
+import gzip
+import io
+import textwrap
+import unicodedata
+import sys
+import argparse
+from contextlib import contextmanager
 from datetime import datetime
 import glob
 
+# categories and instrumentation live in the repository root. tslk.py and benchmark.py import
+# this module with the root on the path; run as a script from www/, the script adds it
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from categories import CATEGORIES, CATEGORY_NAMES, DIMENSIONS, category_key
+
+# The per-stage run report is optional; without instrumentation the site is built without one
+try:
+    from instrumentation import stage, start_run, finish_run, run_profiled
+except ImportError:
+    @contextmanager
+    def stage(name, rows_in=None, **details):
+        yield {"stage": name, "rows_in": rows_in, "rows_out": None, **details}
+    
+    def start_run(name, track_memory=True):
+        return None
+    
+    def finish_run(report_path=None, summary=False):
+        return None
+    
+    def run_profiled(func, name, output_folder=None, top=None):
+        return func()
+
+# pandas (and numpy) are imported by the functions that load and aggregate results, so
+# quick commands that only need file names and dates (see tslk.py info) start without them
+
+# brotli is in requirements.txt; without it no .br assets are written (the build says so)
+# and the payload report only has raw and gzip sizes
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
 def get_file_creation_date(file_path):
     """Get the creation date of a file."""
     stat = os.stat(file_path)
@@ -11,6 +55,8 @@ def get_file_creation_date(file_path):
 
 def load_all_results():
     """Load all results from Excel files in EndResult folder (top 10 for website display)."""
+    import pandas as pd
+    
     all_data = {}
     
     # Get all Excel files in EndResult folder
@@ -19,7 +65,7 @@ def load_all_results():
         print(f"EndResult folder not found: {endresult_folder}")
         return {}
     
-    excel_files = glob.glob(os.path.join(endresult_folder, "*.xlsx"))
+    excel_files = sorted(glob.glob(os.path.join(endresult_folder, "*.xlsx")))
     
     for file_path in excel_files:
         try:
@@ -55,6 +101,8 @@ def load_all_results():
 
 def load_statistics_data():
     """Load all results from Statistics folder (all data for statistics page)."""
+    import pandas as pd
+    
     all_data = {}
     
     # Get all Excel files in Statistics folder
@@ -63,7 +111,7 @@ def load_statistics_data():
         print(f"Statistics folder not found: {statistics_folder}")
         return {}
     
-    excel_files = glob.glob(os.path.join(statistics_folder, "*_statistics.xlsx"))
+    excel_files = sorted(glob.glob(os.path.join(statistics_folder, "*_statistics.xlsx")))
     
     for file_path in excel_files:
         try:
@@ -93,6 +141,38 @@ def load_statistics_data():
     
     return all_data
 
+def load_records_data():
+    """Load the age group and season records from Records/records.xlsx ({category: [results]}, empty without the file)."""
+    import pandas as pd
+    
+    records_path = os.path.join("..", "Records", "records.xlsx")
+    if not os.path.exists(records_path):
+        print(f"Records file not found: {records_path}")
+        return {}
+    
+    try:
+        sheets = pd.read_excel(records_path, sheet_name=None, dtype={'Season': str})
+    except Exception as e:
+        print(f"Error loading records file {records_path}: {e}")
+        return {}
+    return {category: df.to_dict('records') for category, df in sheets.items()}
+
+def load_progression_data():
+    """Load the personal best and club record progression from History/progression.xlsx ({table: [results]}, empty without the file)."""
+    import pandas as pd
+    
+    progression_path = os.path.join("..", "History", "progression.xlsx")
+    if not os.path.exists(progression_path):
+        print(f"Progression file not found: {progression_path}")
+        return {}
+    
+    try:
+        sheets = pd.read_excel(progression_path, sheet_name=None)
+    except Exception as e:
+        print(f"Error loading progression file {progression_path}: {e}")
+        return {}
+    return {table: df.to_dict('records') for table, df in sheets.items()}
+
 def get_latest_file_date():
     """Get the latest modification date from grdRanking files."""
     rawdata_folder = "../Rawdata"
@@ -111,102 +191,1545 @@ def get_latest_file_date():
     latest_time = max(os.path.getmtime(f) for f in grd_files)
     return datetime.fromtimestamp(latest_time).strftime('%d.%m.%Y')
 
-def generate_statistics_page(statistics_data, latest_date):
-    """Generate a statistics page with comprehensive data overview."""
+def sort_events(event_name):
+    """Sort events by length first, then by type in specified order."""
+    # Extract length (number before 'm')
+    length_match = re.search(r'(\d+)m', event_name)
+    if length_match:
+        length = int(length_match.group(1))
+    else:
+        length = 0
     
-    # Calculate statistics
-    total_events = len(statistics_data)
-    total_swimmers = 0
-    event_stats = {}
-    pool_stats = {'25m': 0, '50m': 0}
-    gender_stats = {'Male': 0, 'Female': 0}
+    # Define type order (lower number = higher priority)
+    type_order = {
+        'butterfly': 1,
+        'rygg': 2,
+        'bryst': 3,
+        'fri': 4,
+        'medley': 5
+    }
     
-    for event_name, event_data in statistics_data.items():
-        event_total = 0
-        event_male_25m = len(event_data.get('Male_25m', []))
-        event_male_50m = len(event_data.get('Male_50m', []))
-        event_female_25m = len(event_data.get('Female_25m', []))
-        event_female_50m = len(event_data.get('Female_50m', []))
-        
-        event_total = event_male_25m + event_male_50m + event_female_25m + event_female_50m
-        total_swimmers += event_total
-        
-        event_stats[event_name] = {
-            'total': event_total,
-            'male_25m': event_male_25m,
-            'male_50m': event_male_50m,
-            'female_25m': event_female_25m,
-            'female_50m': event_female_50m
-        }
+    # Find the type in the event name
+    event_lower = event_name.lower()
+    event_type = 6  # Default for unknown types
+    
+    for type_name, order in type_order.items():
+        if type_name in event_lower:
+            event_type = order
+            break
+    
+    return (length, event_type)
+
+# Longest name prefix stored in the search index; longer queries are verified client-side
+SEARCH_PREFIX_LENGTH = 4
+SEARCH_INDEX_PATH = 'data/search-index.js'
+
+def normalize_search_text(text):
+    """Normalize a name for searching (lowercase, ø/å/æ folded, accents removed)."""
+    text = str(text).lower()
+    text = text.replace('æ', 'ae').replace('ø', 'o').replace('å', 'a')
+    text = unicodedata.normalize('NFD', text)
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return ' '.join(re.findall(r'[a-z0-9]+', text))
+
+def build_search_index(swimmer_results, events, swimmer_slugs=None):
+    """Build the swimmer search index the page loads on the first search.
+
+    It covers every swimmer in the statistics data, not only those in the top-10 lists.
+    Each swimmer, as (name, gender), gets one entry with the normalized name, the gender,
+    the profile page (if any) and the best result per event and pool as
+    [event, pool, rank, time, points, date], where event indexes into events. The prefix
+    map points every name-token prefix to the swimmers having it, so a lookup is one
+    dictionary access per typed word instead of a scan over all results.
+    """
+    event_ids = {event_name: event_id for event_id, event_name in enumerate(events)}
+    swimmers = []
+
+    # group_results_by_swimmer lists swimmers and their results in event display order
+    for (name, gender), results in swimmer_results.items():
+        swimmer = {'n': name, 'k': normalize_search_text(name), 'g': gender, 'r': []}
+        if swimmer_slugs and (name, gender) in swimmer_slugs:
+            swimmer['p'] = swimmer_slugs[(name, gender)]
+        for result in results:
+            points = result['Poeng']
+            if isinstance(points, float) and math.isnan(points):
+                points = None
+            swimmer['r'].append([event_ids[result['Event']], result['Pool'], result['Rank'],
+                                 result['Tid'], points, result['Dato']])
+        swimmers.append(swimmer)
+
+    prefixes = {}
+    for swimmer_id, swimmer in enumerate(swimmers):
+        for token in sorted(set(swimmer['k'].split())):
+            for length in range(1, min(len(token), SEARCH_PREFIX_LENGTH) + 1):
+                ids = prefixes.setdefault(token[:length], [])
+                if not ids or ids[-1] != swimmer_id:
+                    ids.append(swimmer_id)
+
+    return {'events': list(events), 'swimmers': swimmers, 'prefixes': prefixes, 'prefixLength': SEARCH_PREFIX_LENGTH}
+
+def generate_search_index(search_index, build):
+    """
+    Write the search index as a script that sets self.tslkSearchIndex.
+
+    The page loads it on the first search. It holds every swimmer's results, so it is not
+    precached: the service worker caches it when it is first requested.
+    """
+    os.makedirs(os.path.dirname(SEARCH_INDEX_PATH), exist_ok=True)
+    index_json = json.dumps(search_index, ensure_ascii=False, separators=(',', ':'))
+    write_output(SEARCH_INDEX_PATH, f"self.tslkSearchIndex = {index_json};\n", build)
+
+def registration_bitsets(all_data):
+    """
+    Bitsets of the latest registrations per gender and pool, for filtering on the page.
+    
+    Registrations are numbered in the order buildRegistrations() lists them (events in
+    all_data order, then Male_25m, Male_50m, Female_25m, Female_50m, then rank); bit
+    i % 32 of word i // 32 is set when registration i belongs to the group.
+    """
+    members = {value: [] for dimension in ('gender', 'pool') for value in DIMENSIONS[dimension][1]}
+    count = 0
+    
+    for event_data in all_data.values():
+        for category in CATEGORY_NAMES:
+            category_gender, category_pool = category_key(category)
+            for result in event_data.get(category) or []:
+                # Same fallbacks as the page: a missing or empty gender or pool is the category's
+                gender = result.get('Gender')
+                pool = result.get('Pool')
+                gender = gender if isinstance(gender, str) and gender else category_gender
+                pool = pool if isinstance(pool, str) and pool else category_pool
+                if gender in members:
+                    members[gender].append(count)
+                if pool in members:
+                    members[pool].append(count)
+                count += 1
+    
+    bitsets = {'count': count}
+    for group, indexes in members.items():
+        words = [0] * ((count + 31) // 32)
+        for index in indexes:
+            words[index >> 5] |= 1 << (index & 31)
+        bitsets[group] = words
+    return bitsets
+
+def format_cell(value):
+    """Format a result value for an HTML table cell (empty for missing values)."""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ''
+    return html.escape(str(value))
+
+def format_improvement(value):
+    """Format the points gained on an earlier best ('+12'; empty for a first result)."""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ''
+    return f"+{int(value)}"
+
+def group_results_by_swimmer(statistics_data, events):
+    """Group all statistics results by swimmer in a single pass.
+
+    Returns a dict mapping each swimmer, as (name, gender), to a list of results,
+    each with the event, pool, gender, rank within the category and category size
+    added. The gender keeps two swimmers with the same name apart.
+    """
+    swimmers = {}
+
+    for event_name in events:
+        event_data = statistics_data[event_name]
+        for category in CATEGORY_NAMES:
+            gender, pool = category_key(category)
+            category_results = event_data.get(category, [])
+            for position, result in enumerate(category_results):
+                name = result.get('Name')
+                if not isinstance(name, str) or not name.strip():
+                    continue
+
+                swimmers.setdefault((name, gender), []).append({
+                    'Event': event_name,
+                    'Pool': pool,
+                    'Gender': gender,
+                    'Rank': position + 1,
+                    'Total': len(category_results),
+                    'Tid': result.get('Tid'),
+                    'Poeng': result.get('Poeng'),
+                    'Dato': result.get('Dato'),
+                    'Sted': result.get('Sted')
+                })
+
+    return swimmers
+
+def assign_swimmer_slugs(swimmers):
+    """Map each swimmer (name, gender) to a unique, URL-safe file name."""
+    slugs = {}
+    used = set()
+
+    for name, gender in sorted(swimmers):
+        base = normalize_search_text(name).replace(' ', '-') or 'svommer'
+        slug = base
+        counter = 2
+        while slug in used:
+            slug = f"{base}-{counter}"
+            counter += 1
+        used.add(slug)
+        slugs[(name, gender)] = f"{slug}.html"
+
+    return slugs
+
+GENDER_TITLES = {'Male': 'Menn', 'Female': 'Kvinner'}
+
+def generate_swimmer_page(name, results, latest_date, logo_html=None, progression=None):
+    """Generate a static profile page for one swimmer, with their personal best progression when given."""
+    logo_html = logo_html or logo_markup(None, prefix='../')
+    best_points = max((r['Poeng'] for r in results if isinstance(r['Poeng'], (int, float))), default='')
+
+    rows = ''.join(f'''
+                    <tr>
+                        <td>{format_cell(r['Event'])}</td>
+                        <td>{r['Pool']}</td>
+                        <td class="rank">{r['Rank']} / {r['Total']}</td>
+                        <td>{format_cell(r['Tid'])}</td>
+                        <td class="points">{format_cell(r['Poeng'])}</td>
+                        <td>{format_cell(r['Dato'])}</td>
+                        <td>{format_cell(r['Sted']) or 'Ukjent'}</td>
+                    </tr>''' for r in results)
+
+    progression_html = ''
+    if progression:
+        progression_rows = ''.join(f'''
+                    <tr>
+                        <td>{format_cell(r['Event'])}</td>
+                        <td>{r['Pool']}</td>
+                        <td>{format_cell(r['Dato'])}</td>
+                        <td>{format_cell(r['Tid'])}</td>
+                        <td class="points">{format_cell(r['Poeng'])}</td>
+                        <td>{format_improvement(r['Improvement'])}</td>
+                        <td>{format_cell(r['Sted']) or 'Ukjent'}</td>
+                    </tr>''' for r in progression)
+        progression_html = f'''
+    
+    <div class="results-container">
+        <h2>Personlige rekorder over tid</h2>
+        <table>
+            <thead>
+                <tr>
+                    <th>Øvelse</th>
+                    <th>Basseng</th>
+                    <th>Dato</th>
+                    <th>Tid</th>
+                    <th>Poeng</th>
+                    <th>Forbedring</th>
+                    <th>Sted</th>
+                </tr>
+            </thead>
+            <tbody>{progression_rows}
+            </tbody>
+        </table>
+    </div>'''
+    
+    return f"""<!DOCTYPE html>
+<html lang="no">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>TSLK - {html.escape(name)}</title>
+    <style>
+        * {{
+            margin: 0;
+            padding: 0;
+            box-sizing: border-box;
+        }}
+
+        body {{
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
+            background-color: #ffffff;
+            color: #2c3e50;
+            line-height: 1.6;
+        }}
+
+        .header {{
+            max-width: 1200px;
+            margin: 0 auto;
+            padding: 20px;
+            display: flex;
+            align-items: center;
+            gap: 20px;
+            border-bottom: 1px solid #e9ecef;
+        }}
+
+        .logo {{
+            height: 70px;
+        }}
+
+        .header h1 {{
+            font-size: 1.45em;
+            font-weight: 600;
+        }}
+
+        .header-info {{
+            font-size: 0.9em;
+            color: #6c757d;
+        }}
+
+        .back-link {{
+            color: #007bff;
+            text-decoration: none;
+        }}
+
+        .results-container {{
+            max-width: 1200px;
+            margin: 20px auto;
+            padding: 0 20px;
+            overflow-x: auto;
+        }}
+
+        h2 {{
+            font-size: 1.25em;
+            font-weight: 600;
+            margin-bottom: 6px;
+        }}
         
-        pool_stats['25m'] += event_male_25m + event_female_25m
-        pool_stats['50m'] += event_male_50m + event_female_50m
-        gender_stats['Male'] += event_male_25m + event_male_50m
-        gender_stats['Female'] += event_female_25m + event_female_50m
-    
-    # Sort events using the same logic as the main page
-    def sort_events(event_name):
-        """Sort events by length first, then by type in specified order."""
-        # Extract length (number before 'm')
-        import re
-        length_match = re.search(r'(\d+)m', event_name)
-        if length_match:
-            length = int(length_match.group(1))
-        else:
-            length = 0
-        
-        # Define type order (lower number = higher priority)
-        type_order = {
-            'butterfly': 1,
-            'rygg': 2,
-            'bryst': 3,
-            'fri': 4,
-            'medley': 5
-        }
+        table {{
+            width: 100%;
+            border-collapse: collapse;
+            border: 1px solid #e9ecef;
+        }}
+
+        th, td {{
+            padding: 10px 12px;
+            text-align: left;
+            border-bottom: 1px solid #e9ecef;
+        }}
+
+        th {{
+            background-color: #f8f9fa;
+            font-weight: 600;
+            color: #495057;
+            font-size: 0.85em;
+            text-transform: uppercase;
+            letter-spacing: 0.5px;
+        }}
+
+        .rank {{
+            color: #007bff;
+            font-weight: 600;
+        }}
+
+        .points {{
+            font-weight: 600;
+        }}
+    </style>
+</head>
+<body>
+    <div class="header">
+        <a href="../index.html">{logo_html}</a>
+        <div>
+            <h1>{html.escape(name)}</h1>
+            <div class="header-info">{GENDER_TITLES.get(results[0]['Gender'], '')} · {len(results)} resultater · Beste poeng: {best_points} · Sist oppdatert {latest_date}</div>
+            <a href="../index.html" class="back-link">← Klubbrekorder</a>
+        </div>
+    </div>
+
+    <div class="results-container">
+        <table>
+            <thead>
+                <tr>
+                    <th>Øvelse</th>
+                    <th>Basseng</th>
+                    <th>Plass</th>
+                    <th>Tid</th>
+                    <th>Poeng</th>
+                    <th>Dato</th>
+                    <th>Sted</th>
+                </tr>
+            </thead>
+            <tbody>{rows}
+            </tbody>
+        </table>
+    </div>{progression_html}
+</body>
+</html>"""
+
+# Norwegian names of the age groups and of the tables over all age groups or seasons
+RECORD_LABELS = {'All': 'Alle', '12 and under': '12 år og yngre'}
+CATEGORY_TITLES = {'Male_25m': 'Menn 25m', 'Male_50m': 'Menn 50m', 'Female_25m': 'Kvinner 25m', 'Female_50m': 'Kvinner 50m'}
+
+def group_records_by_event(records_data, club_records=None):
+    """Group the records and the club record progression as {event: {category: (records, progression)}}, events in display order."""
+    events = {}
+    for category in CATEGORY_NAMES:
+        for r in records_data.get(category, []):
+            events.setdefault(r['Event'], {}).setdefault(category, ([], []))[0].append(r)
+    for r in club_records or []:
+        category = f"{r['Gender']}_{r['Pool']}"
+        events.setdefault(r['Event'], {}).setdefault(category, ([], []))[1].append(r)
+    
+    return {event_name: {category: events[event_name][category] for category in sorted(events[event_name], key=CATEGORY_NAMES.index)}
+            for event_name in sorted(events, key=sort_events)}
+
+def records_page_path(event_name, output_folder='records'):
+    """Path of the records page of an event."""
+    return os.path.join(output_folder, f"{event_slug(event_name)}.html")
+
+def records_page(title, header_info, back_link, sections, logo_html, prefix=''):
+    """The page around the records tables: head, styles and header, with links relative to prefix."""
+    return f"""<!DOCTYPE html>
+<html lang="no">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>TSLK - {html.escape(title)}</title>
+    <style>
+        * {{
+            margin: 0;
+            padding: 0;
+            box-sizing: border-box;
+        }}
+        
+        body {{
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
+            background-color: #ffffff;
+            color: #2c3e50;
+            line-height: 1.6;
+        }}
+        
+        .header {{
+            max-width: 1200px;
+            margin: 0 auto;
+            padding: 20px;
+            display: flex;
+            align-items: center;
+            gap: 20px;
+            border-bottom: 1px solid #e9ecef;
+        }}
+        
+        .logo {{
+            height: 70px;
+        }}
+        
+        .header h1 {{
+            font-size: 1.45em;
+            font-weight: 600;
+        }}
+        
+        .header-info {{
+            font-size: 0.9em;
+            color: #6c757d;
+        }}
+        
+        .back-link {{
+            color: #007bff;
+            text-decoration: none;
+        }}
+        
+        .results-container {{
+            max-width: 1200px;
+            margin: 20px auto;
+            padding: 0 20px;
+            overflow-x: auto;
+        }}
+        
+        h2 {{
+            font-size: 1.25em;
+            font-weight: 600;
+        }}
+        
+        h3 {{
+            font-size: 1em;
+            font-weight: 600;
+            color: #495057;
+            margin: 12px 0 6px;
+        }}
+        
+        table {{
+            width: 100%;
+            border-collapse: collapse;
+            border: 1px solid #e9ecef;
+        }}
+        
+        th, td {{
+            padding: 10px 12px;
+            text-align: left;
+            border-bottom: 1px solid #e9ecef;
+        }}
+        
+        th {{
+            background-color: #f8f9fa;
+            font-weight: 600;
+            color: #495057;
+            font-size: 0.85em;
+            text-transform: uppercase;
+            letter-spacing: 0.5px;
+        }}
         
-        # Find the type in the event name
-        event_lower = event_name.lower()
-        event_type = 6  # Default for unknown types
+        .rank {{
+            color: #007bff;
+            font-weight: 600;
+        }}
         
-        for type_name, order in type_order.items():
-            if type_name in event_lower:
-                event_type = order
-                break
+        .points {{
+            font-weight: 600;
+        }}
         
-        return (length, event_type)
+        .event-list {{
+            list-style: none;
+            display: grid;
+            grid-template-columns: repeat(auto-fill, minmax(220px, 1fr));
+            gap: 10px;
+        }}
+        
+        .event-list a {{
+            display: block;
+            padding: 12px 16px;
+            border: 1px solid #e9ecef;
+            border-radius: 8px;
+            color: #2c3e50;
+            font-weight: 600;
+            text-decoration: none;
+        }}
+        
+        .event-list span {{
+            display: block;
+            font-size: 0.85em;
+            font-weight: 400;
+            color: #6c757d;
+        }}
+    </style>
+</head>
+<body>
+    <div class="header">
+        <a href="{prefix}index.html">{logo_html}</a>
+        <div>
+            <h1>{html.escape(title)}</h1>
+            <div class="header-info">{header_info}</div>
+            {back_link}
+        </div>
+    </div>
+    {sections}
+</body>
+</html>"""
+
+def generate_records_page(events, latest_date, logo_html=None):
+    """Generate records.html, which links to the records page of every event."""
+    logo_html = logo_html or logo_markup(None)
+    
+    links = ''.join(f'''
+            <li><a href="{records_page_path(event_name).replace(os.sep, '/')}">{html.escape(event_name)}<span>{' · '.join(CATEGORY_TITLES[category] for category in categories)}</span></a></li>'''
+                    for event_name, categories in events.items())
+    if links:
+        sections = f'''
+    <div class="results-container">
+        <ul class="event-list">{links}
+        </ul>
+    </div>'''
+    else:
+        sections = '''
+    <div class="results-container">Ingen klasse- eller sesongrekorder ennå.</div>'''
+    
+    return records_page('Klasse- og sesongrekorder',
+                        f'Beste resultater per aldersklasse og sesong, og klubbrekordenes utvikling · Sist oppdatert {latest_date}',
+                        '<a href="index.html" class="back-link">← Klubbrekorder</a>', sections, logo_html)
+
+def generate_event_records_page(event_name, categories, latest_date, logo_html):
+    """Generate the page with the age group and season records and the club record progression of one event."""
+    tables = []
+    for category, (results, progression) in categories.items():
+        # One line per row: the records tables have thousands of rows, so indentation adds up
+        if progression:
+            progression_rows = ''.join(
+                f"\n<tr><td>{format_cell(r['Dato'])}</td><td>{format_cell(r['Name'])}</td><td>{format_cell(r['Tid'])}</td>"
+                f"<td class=\"points\">{format_cell(r['Poeng'])}</td><td>{format_improvement(r['Improvement'])}</td>"
+                f"<td>{format_cell(r['Sted']) or 'Ukjent'}</td></tr>" for r in progression)
+            tables.append(f'''
+        <h3>Rekordutvikling {CATEGORY_TITLES[category]}</h3>
+        <table>
+            <thead>
+                <tr>
+                    <th>Dato</th>
+                    <th>Navn</th>
+                    <th>Tid</th>
+                    <th>Poeng</th>
+                    <th>Forbedring</th>
+                    <th>Sted</th>
+                </tr>
+            </thead>
+            <tbody>{progression_rows}
+            </tbody>
+        </table>''')
+        if not results:
+            continue
+        rows = ''.join(
+            f"\n<tr><td>{format_cell(RECORD_LABELS.get(r['AgeGroup'], r['AgeGroup']))}</td>"
+            f"<td>{format_cell(RECORD_LABELS.get(r['Season'], r['Season']))}</td><td class=\"rank\">{r['Rank']}</td>"
+            f"<td>{format_cell(r['Name'])}</td><td>{format_cell(r['Tid'])}</td><td class=\"points\">{format_cell(r['Poeng'])}</td>"
+            f"<td>{format_cell(r['Dato'])}</td><td>{format_cell(r['Sted']) or 'Ukjent'}</td></tr>" for r in results)
+        tables.append(f'''
+        <h3>{CATEGORY_TITLES[category]}</h3>
+        <table>
+            <thead>
+                <tr>
+                    <th>Klasse</th>
+                    <th>Sesong</th>
+                    <th>Plass</th>
+                    <th>Navn</th>
+                    <th>Tid</th>
+                    <th>Poeng</th>
+                    <th>Dato</th>
+                    <th>Sted</th>
+                </tr>
+            </thead>
+            <tbody>{rows}
+            </tbody>
+        </table>''')
+    
+    sections = f'''
+    <div class="results-container">{''.join(tables)}
+    </div>'''
+    return records_page(event_name, f'Klasse- og sesongrekorder · Sist oppdatert {latest_date}',
+                        '<a href="../records.html" class="back-link">← Klasse- og sesongrekorder</a>', sections, logo_html, prefix='../')
+
+def generate_records_pages(events, latest_date, build, output_folder='records', logo_variants=None):
+    """Write one records page per event, so records.html does not hold every table at once."""
+    os.makedirs(output_folder, exist_ok=True)
+    logo_html = logo_markup(logo_variants, prefix='../')
+    
+    for event_name, categories in events.items():
+        write_output(records_page_path(event_name, output_folder),
+                     generate_event_records_page(event_name, categories, latest_date, logo_html), build)
+    
+    return len(events)
+
+# Manifest of the last build: output path -> content hash and size
+BUILD_MANIFEST = 'build-manifest.json'
+
+def output_entry(data):
+    """Manifest entry of an output file: content hash and size."""
+    return {'sha256': hashlib.sha256(data).hexdigest(), 'bytes': len(data)}
+
+def start_build(manifest_path=BUILD_MANIFEST, memory=None):
+    """
+    Start an incremental build, loading the manifest of the previous build.
+    
+    With memory (a dict of output path -> bytes, e.g. for the tslk.py preview server)
+    nothing is written to disk: outputs are stored in the dict, and the previous build
+    is what the dict already holds.
+    """
+    previous = {}
+    if memory is not None:
+        previous = {key: output_entry(data) for key, data in memory.items() if key != manifest_path}
+    elif os.path.exists(manifest_path):
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                previous = json.load(f).get('files', {})
+        except (OSError, ValueError) as e:
+            print(f"Could not read build manifest, rebuilding everything: {e}")
+
+    return {'manifest_path': manifest_path, 'previous': previous, 'files': {}, 'written': [], 'memory': memory}
+
+def write_output(path, content, build):
+    """Write an output file unless its content is unchanged since the last build.
+
+    Returns True if the file was written. Unchanged files are not touched, so
+    their modification time (and the deploy copy) stays the same.
+    """
+    data = content.encode('utf-8') if isinstance(content, str) else content
+    entry = output_entry(data)
+    key = path.replace(os.sep, '/')
+    build['files'][key] = entry
+
+    if build['memory'] is not None:
+        if build['previous'].get(key) == entry:
+            return False
+        build['memory'][key] = data
+        build['written'].append(key)
+        return True
+    
+    if os.path.exists(path) and os.path.getsize(path) == len(data):
+        if build['previous'].get(key) == entry:
+            return False
+        # No (matching) manifest entry, compare with the file on disk instead
+        with open(path, 'rb') as f:
+            if hashlib.sha256(f.read()).hexdigest() == entry['sha256']:
+                return False
+
+    with open(path, 'wb') as f:
+        f.write(data)
+    build['written'].append(key)
+    return True
+
+def remove_stale_outputs(build):
+    """
+    Remove the files the previous build produced and this one did not (e.g. the data file
+    of a removed event or the page of a swimmer no longer in the results); returns how many.
+    """
+    removed = 0
+    for key in build['previous']:
+        if key in build['files']:
+            continue
+        if build['memory'] is not None:
+            del build['memory'][key]
+            removed += 1
+        elif os.path.exists(key):
+            os.remove(key)
+            removed += 1
+    return removed
+
+def finish_build(build):
+    """Remove stale outputs, write the build manifest and report what changed."""
+    written = len(build['written'])
+    unchanged = len(build['files']) - written
+    removed = remove_stale_outputs(build)
+
+    manifest = json.dumps({'files': build['files']}, indent=2, sort_keys=True)
+    write_output(build['manifest_path'], manifest, build)
+
+    print(f"Build: {written} files written, {unchanged} unchanged, {removed} removed")
+
+def output_exists(path, build):
+    """Whether an output file is still there from an earlier build (in memory for an in-memory build)."""
+    if build['memory'] is not None:
+        return path.replace(os.sep, '/') in build['memory']
+    return os.path.exists(path)
+
+def read_output(path, build):
+    """Read back an output file of the build; files that are not outputs (e.g. logo.png) come from disk."""
+    key = path.replace(os.sep, '/')
+    if build['memory'] is not None and key in build['memory']:
+        return build['memory'][key]
+    with open(path, 'rb') as f:
+        return f.read()
+
+IMAGE_FOLDER = 'images'
+LOGO_SOURCE = 'logo.png'
+
+# Logo widths for 1x, 2x and 3x screens; the headers show it at about 80px
+LOGO_WIDTHS = [80, 160, 240]
+
+def load_pillow():
+    """
+    Pillow's Image and features modules, or (None, None) when Pillow is not installed.
+    
+    Pillow is optional; without it the logo is served as the original PNG. It is imported
+    here rather than at module level because only the image stage needs it.
+    """
+    try:
+        from PIL import Image, features
+    except ImportError:
+        return None, None
+    return Image, features
+
+def image_formats(features):
+    """(extension, Pillow format, save options) per encoding, preferred format first."""
+    formats = [('webp', 'WEBP', {'quality': 85, 'method': 6}), ('png', 'PNG', {'optimize': True})]
+    if features.check('avif'):
+        formats.insert(0, ('avif', 'AVIF', {'quality': 60}))
+    return formats
+
+def generate_image_variants(source, widths, build):
+    """
+    Encode resized variants of an image into images/ in every supported format.
+    
+    Variant names contain the source's content hash, so a build only re-encodes when
+    the source changed and otherwise keeps the files from the previous build. Returns
+    {'width', 'sources': {extension: [(url, width)]}}, or None without Pillow.
+    """
+    Image, features = load_pillow()
+    if Image is None or not os.path.exists(source):
+        return None
+    
+    with open(source, 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()[:12]
+    name = os.path.splitext(os.path.basename(source))[0]
+    os.makedirs(IMAGE_FOLDER, exist_ok=True)
+    
+    image = Image.open(source)
+    source_width, source_height = image.size
+    widths = [width for width in widths if width <= source_width] or [source_width]
+    
+    sources = {}
+    for extension, image_format, options in image_formats(features):
+        for width in widths:
+            path = os.path.join(IMAGE_FOLDER, f"{name}.{digest}.{width}.{extension}")
+            key = path.replace(os.sep, '/')
+            if key in build['previous'] and output_exists(path, build):
+                # Encoded from the same source by an earlier build
+                build['files'][key] = build['previous'][key]
+            else:
+                height = round(source_height * width / source_width)
+                buffer = io.BytesIO()
+                image.resize((width, height), Image.LANCZOS).save(buffer, image_format, **options)
+                write_output(path, buffer.getvalue(), build)
+            sources.setdefault(extension, []).append((key, width))
+    
+    return {'width': widths[0], 'sources': sources}
+
+def logo_markup(variants, prefix=''):
+    """The logo <img>, wrapped in a <picture> with WebP/AVIF srcsets when variants exist."""
+    if not variants:
+        return f'<img src="{prefix}{LOGO_SOURCE}" alt="TSLK Logo" class="logo">'
+    
+    def srcset(extension):
+        return ', '.join(f"{prefix}{url} {width / variants['width']:g}x" for url, width in variants['sources'][extension])
+    
+    sources = ''.join(f'<source type="image/{extension}" srcset="{srcset(extension)}">'
+                      for extension in variants['sources'] if extension != 'png')
+    fallback = variants['sources']['png'][0][0]
+    return f'<picture>{sources}<img src="{prefix}{fallback}" srcset="{srcset("png")}" alt="TSLK Logo" class="logo"></picture>'
+
+ASSET_FOLDER = 'assets'
+
+def minify_css(css):
+    """Strip comments and the whitespace around CSS punctuation."""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+    css = re.sub(r':\s+', ':', css)
+    return css.replace(';}', '}').strip()
+
+def minify_js(script):
+    """
+    Drop indentation, blank lines and whole-line // comments.
+    
+    The rest of each line is left alone, so strings, template literals and regexes stay intact.
+    """
+    lines = [line.strip() for line in script.split('\n')]
+    return '\n'.join(line for line in lines if line and not line.startswith('//'))
+
+def write_asset(content, name, extension, build):
+    """Write a content-hashed asset with .gz (and .br) siblings and return its URL."""
+    data = content.encode('utf-8')
+    url = f"{ASSET_FOLDER}/{name}.{hashlib.sha256(data).hexdigest()[:12]}.{extension}"
+    path = os.path.join(ASSET_FOLDER, os.path.basename(url))
+    
+    os.makedirs(ASSET_FOLDER, exist_ok=True)
+    write_output(path, data, build)
+    write_output(path + '.gz', gzip.compress(data, compresslevel=9, mtime=0), build)
+    if brotli is not None:
+        write_output(path + '.br', brotli.compress(data, quality=11), build)
+    return url
+
+def externalize_assets(html_content, name, build, inline_pattern=None):
+    """
+    Move a page's inline <style> and <script> blocks into minified, content-hashed asset files.
+    
+    Script lines matching inline_pattern (the embedded data) stay in a small inline script,
+    so a data update leaves the hashed stylesheet and script, and their cached copies, unchanged.
+    """
+    def replace_style(match):
+        url = write_asset(minify_css(match.group(1)), name, 'css', build)
+        return f'<link rel="stylesheet" href="{url}">'
+    
+    def replace_script(match):
+        script = match.group(1)
+        inline = ''
+        if inline_pattern:
+            inline = '\n'.join(re.findall(inline_pattern, script, re.M))
+            script = re.sub(inline_pattern, '', script, flags=re.M)
+        url = write_asset(minify_js(script), name, 'js', build)
+        tag = f'<script src="{url}"></script>'
+        if inline:
+            tag = f'<script>\n{inline}\n    </script>\n    {tag}'
+        return tag
+    
+    html_content = re.sub(r'<style>(.*?)</style>', replace_style, html_content, flags=re.S)
+    return re.sub(r'<script>(.*?)</script>', replace_script, html_content, flags=re.S)
+
+SERVICE_WORKER = 'sw.js'
+PRECACHE_MANIFEST = 'precache-manifest.json'
+
+# Served as-is, so the worker only changes when this code does; the data
+# version comes from the precache manifest it fetches.
+SERVICE_WORKER_JS = """// Service worker for the TSLK records site, generated by generate_website.py.
+// Precached files are served from the cache at once and revalidated in the background
+// against precache-manifest.json; only files whose hash changed are downloaded again.
+const CACHE_NAME = 'tslk-v1';
+const STAGING_CACHE = 'tslk-v1-staging';
+const MANIFEST_URL = 'precache-manifest.json';
+const REVALIDATE_INTERVAL = 60 * 1000;
+
+let lastRevalidation = 0;
+
+function scopeUrl(path) {
+    return new URL(path, self.registration.scope).href;
+}
+
+function scopePath(url) {
+    return url.startsWith(self.registration.scope) ? url.slice(self.registration.scope.length) : null;
+}
+
+async function sha256(buffer) {
+    const digest = await crypto.subtle.digest('SHA-256', buffer);
+    return Array.from(new Uint8Array(digest), byte => byte.toString(16).padStart(2, '0')).join('');
+}
+
+async function cachedManifest(cache) {
+    const response = await cache.match(scopeUrl(MANIFEST_URL));
+    return response ? response.json() : { files: {} };
+}
+
+// Download the files whose hash differs from the cached manifest into a staging cache, and only
+// when every one arrived with its manifest hash move them into the cache, drop removed files and
+// store the new manifest. A failed download or a hash mismatch (deploy still in progress) leaves
+// the cache as it was, so a page never gets new assets next to old data; it is retried next time
+async function syncWithManifest() {
+    const cache = await caches.open(CACHE_NAME);
+    const response = await fetch(scopeUrl(MANIFEST_URL), { cache: 'no-store' });
+    if (!response.ok) {
+        throw new Error(`Could not fetch ${MANIFEST_URL}: ${response.status}`);
+    }
+    const manifest = await response.clone().json();
+    const previous = await cachedManifest(cache);
+    
+    const changedPaths = [];
+    for (const [path, hash] of Object.entries(manifest.files)) {
+        if (previous.files[path] !== hash || !await cache.match(scopeUrl(path))) {
+            changedPaths.push(path);
+        }
+    }
+    const removedPaths = Object.keys(previous.files).filter(path => !(path in manifest.files));
+    
+    await caches.delete(STAGING_CACHE);
+    const staging = await caches.open(STAGING_CACHE);
+    try {
+        for (const path of changedPaths) {
+            const fileResponse = await fetch(scopeUrl(path), { cache: 'no-cache' });
+            const body = fileResponse.ok ? await fileResponse.clone().arrayBuffer() : null;
+            if (!body || await sha256(body) !== manifest.files[path]) {
+                return false;
+            }
+            await staging.put(scopeUrl(path), fileResponse);
+        }
+        
+        for (const path of changedPaths) {
+            await cache.put(scopeUrl(path), await staging.match(scopeUrl(path)));
+        }
+        for (const path of removedPaths) {
+            await cache.delete(scopeUrl(path));
+        }
+        await cache.put(scopeUrl(MANIFEST_URL), response);
+        return changedPaths.length > 0 || removedPaths.length > 0;
+    } finally {
+        await caches.delete(STAGING_CACHE);
+    }
+}
+
+async function revalidate() {
+    if (Date.now() - lastRevalidation < REVALIDATE_INTERVAL) {
+        return;
+    }
+    lastRevalidation = Date.now();
+    try {
+        if (await syncWithManifest()) {
+            const clients = await self.clients.matchAll();
+            clients.forEach(client => client.postMessage({ type: 'tslk-updated' }));
+        }
+    } catch (error) {
+        // Offline: keep serving the cached copies
+    }
+}
+
+// Stale-while-revalidate for pages that are not in the manifest, e.g. swimmer profiles
+async function refresh(cache, request, key) {
+    try {
+        const response = await fetch(request);
+        if (response.ok) {
+            await cache.put(key, response.clone());
+        }
+        return response;
+    } catch (error) {
+        return Response.error();
+    }
+}
+
+self.addEventListener('install', event => {
+    event.waitUntil(syncWithManifest().then(() => self.skipWaiting()));
+});
+
+self.addEventListener('activate', event => {
+    event.waitUntil(
+        caches.keys()
+            .then(keys => Promise.all(keys.filter(key => key !== CACHE_NAME).map(key => caches.delete(key))))
+            .then(() => self.clients.claim())
+    );
+});
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    const url = new URL(request.url);
+    if (request.method !== 'GET' || url.origin !== self.location.origin) {
+        return;
+    }
+    
+    let path = scopePath(url.origin + url.pathname);
+    if (path === null || path === MANIFEST_URL || path === 'sw.js') {
+        return;
+    }
+    if (path === '') {
+        path = 'index.html';
+    }
+    const key = scopeUrl(path);
+    
+    event.respondWith(caches.open(CACHE_NAME).then(async cache => {
+        const cached = await cache.match(key);
+        const manifest = await cachedManifest(cache);
+        
+        if (path in manifest.files) {
+            event.waitUntil(revalidate());
+            return cached || refresh(cache, request, key);
+        }
+        // Hashed assets and images never change under the same name
+        if (cached && (path.startsWith('assets/') || path.startsWith('images/'))) {
+            return cached;
+        }
+        if (cached) {
+            event.waitUntil(refresh(cache, request, key));
+            return cached;
+        }
+        return refresh(cache, request, key);
+    }));
+});
+"""
+
+def precache_files(build):
+    """The pages, hashed assets and data files the service worker caches, with their content hashes."""
+    files = {}
+    for path, entry in build['files'].items():
+        if path in ('index.html', 'statistics.html') or is_data_shard(path):
+            files[path] = entry['sha256']
+        elif path.startswith('assets/') and path.endswith(('.css', '.js')):
+            files[path] = entry['sha256']
+    return files
+
+def generate_service_worker(build):
+    """Write the service worker and the precache manifest for the files written so far."""
+    manifest = {'files': precache_files(build)}
+    write_output(PRECACHE_MANIFEST, json.dumps(manifest, indent=2, sort_keys=True), build)
+    write_output(SERVICE_WORKER, SERVICE_WORKER_JS, build)
+    return manifest
+
+REGISTRATIONS_WORKER = 'registrations-worker'
+
+# Shared by the registrations worker and the index page script: the page runs the same
+# code on the main thread where workers are not available (e.g. when opened from file://).
+LATEST_REGISTRATIONS_JS = """function parseDate(dateStr) {
+    if (!dateStr) return new Date(0);
+    const parts = String(dateStr).split('.');
+    if (parts.length !== 3) return new Date(0);
+    const [day, month, year] = parts.map(Number);
+    return new Date(year, month - 1, day);
+}
+
+function parseTime(timeStr) {
+    if (!timeStr) return Infinity;
+    const str = String(timeStr).trim();
+    if (str.includes('.')) {
+        const [mins, secs] = str.split('.');
+        return parseInt(mins, 10) * 60 + parseFloat(secs.replace(',', '.'));
+    }
+    return parseFloat(str.replace(',', '.'));
+}
+
+// Flatten {event: {category: [results]}} into one row per registration
+function buildRegistrations(data) {
+    const categories = ['Male_25m', 'Male_50m', 'Female_25m', 'Female_50m'];
+    const allResults = [];
+    
+    for (const [eventName, eventData] of Object.entries(data)) {
+        for (const category of categories) {
+            if (eventData[category]) {
+                eventData[category].forEach((result, index) => {
+                    allResults.push({
+                        ...result,
+                        Event: eventName,
+                        Pool: result.Pool || (category.endsWith('25m') ? '25m' : '50m'),
+                        Gender: result.Gender || (category.startsWith('Male') ? 'Male' : 'Female'),
+                        Pos: index + 1
+                    });
+                });
+            }
+        }
+    }
+    
+    return allResults;
+}
+
+function compareRegistrations(a, b, sortColumn) {
+    switch (sortColumn) {
+        case 'Name':
+            return (a.Name || '').localeCompare(b.Name || '', 'no');
+        case 'Event':
+            return (a.Event || '').localeCompare(b.Event || '', 'no');
+        case 'Pool':
+            return (a.Pool || '').localeCompare(b.Pool || '', 'no');
+        case 'Pos':
+            return (a.Pos || 0) - (b.Pos || 0);
+        case 'Tid':
+            return parseTime(a.Tid) - parseTime(b.Tid);
+        case 'Poeng':
+            return (a.Poeng || 0) - (b.Poeng || 0);
+        case 'Sted':
+            return (a.Sted || '').localeCompare(b.Sted || '', 'no');
+        default:
+            return parseDate(a.Dato) - parseDate(b.Dato);
+    }
+}
+
+// Registration indexes in sort order, sorted once per column and direction for all filters
+const sortPermutations = new Map();
+
+function sortPermutation(registrations, sortColumn, sortDirection) {
+    const key = `${sortColumn}|${sortDirection}`;
+    if (!sortPermutations.has(key)) {
+        const multiplier = sortDirection === 'asc' ? 1 : -1;
+        const permutation = registrations.map((row, index) => index);
+        permutation.sort((a, b) => compareRegistrations(registrations[a], registrations[b], sortColumn) * multiplier);
+        sortPermutations.set(key, permutation);
+    }
+    return sortPermutations.get(key);
+}
+
+// Combine the generated bitsets of the checked boxes: (male OR female) AND (25m OR 50m)
+function registrationMask(bitsets, filters) {
+    const mask = new Uint32Array(bitsets.Male.length);
+    for (let word = 0; word < mask.length; word++) {
+        const gender = (filters.male ? bitsets.Male[word] : 0) | (filters.female ? bitsets.Female[word] : 0);
+        const pool = (filters.pool25 ? bitsets['25m'][word] : 0) | (filters.pool50 ? bitsets['50m'][word] : 0);
+        mask[word] = gender & pool;
+    }
+    return mask;
+}
+
+function countBits(mask) {
+    let count = 0;
+    for (let word of mask) {
+        word = word - ((word >>> 1) & 0x55555555);
+        word = (word & 0x33333333) + ((word >>> 2) & 0x33333333);
+        count += Math.imul((word + (word >>> 4)) & 0x0F0F0F0F, 0x01010101) >>> 24;
+    }
+    return count;
+}
+
+// One page of the registrations matching query {filters, sortColumn, sortDirection, page, pageSize}
+function pageOfRegistrations(registrations, bitsets, query) {
+    const mask = registrationMask(bitsets, query.filters);
+    const total = countBits(mask);
+    const totalPages = Math.max(1, Math.ceil(total / query.pageSize));
+    const page = Math.min(Math.max(1, query.page), totalPages);
+    
+    // Walk the sort order and keep the registrations whose bit is set, up to the end of the page
+    const start = (page - 1) * query.pageSize;
+    const rows = [];
+    let matched = 0;
+    for (const index of sortPermutation(registrations, query.sortColumn, query.sortDirection)) {
+        if ((mask[index >>> 5] >>> (index & 31)) & 1) {
+            if (matched >= start) {
+                rows.push(registrations[index]);
+                if (rows.length === query.pageSize) break;
+            }
+            matched++;
+        }
+    }
+    
+    return { rows, page, totalPages, total };
+}
+"""
+
+# The worker loads the per-event data files itself, and only the requested page is posted back
+REGISTRATIONS_WORKER_JS = """// Latest registrations worker for index.html, generated by generate_website.py.
+let registrationsReady = null;
+
+async function loadRegistrations(shards, bitsets) {
+    // The page's <script> tags loaded the same files, so they come from the browser cache
+    importScripts(...Object.values(shards));
+    
+    // The bitsets come from the page; data files from another build would not line up with them
+    const registrations = buildRegistrations(self.tslkData || {});
+    if (registrations.length !== bitsets.count) {
+        throw new Error(`${registrations.length} registrations in the data files, ${bitsets.count} in the page`);
+    }
+    return { registrations, bitsets };
+}
+
+self.onmessage = async event => {
+    const message = event.data;
+    if (message.type === 'init') {
+        registrationsReady = loadRegistrations(message.shards, message.bitsets);
+        registrationsReady.catch(() => {});
+        return;
+    }
+    
+    try {
+        const { registrations, bitsets } = await registrationsReady;
+        self.postMessage({ id: message.id, ...pageOfRegistrations(registrations, bitsets, message.query) });
+    } catch (error) {
+        self.postMessage({ id: message.id, error: String(error) });
+    }
+};
+"""
+
+def write_registrations_worker(build):
+    """Write the latest registrations worker as a hashed asset and return its URL."""
+    return write_asset(minify_js(LATEST_REGISTRATIONS_JS + '\n' + REGISTRATIONS_WORKER_JS), REGISTRATIONS_WORKER, 'js', build)
+
+PAYLOAD_REPORT = 'payload-report.json'
+PAYLOAD_BUDGETS_FILE = 'payload-budgets.json'
+
+class PayloadBudgetError(Exception):
+    """The site payload exceeds its budgets; violations lists one message per exceeded budget."""
+    def __init__(self, violations):
+        super().__init__(f"Payload over budget: {'; '.join(violations)}")
+        self.violations = violations
+
+# Byte budgets per payload part, used when payload-budgets.json does not exist
+DEFAULT_PAYLOAD_BUDGETS = {
+    'index.html': {'raw': 60000, 'gzip': 15000},
+    'statistics.html': {'raw': 80000, 'gzip': 12000},
+    'records.html': {'raw': 20000, 'gzip': 4000},
+    'data': {'raw': 20000, 'gzip': 5000},
+    'css': {'raw': 25000, 'gzip': 4000},
+    'script': {'raw': 55000, 'gzip': 8000},
+    'translations': {'raw': 12000, 'gzip': 3000},
+    'images': {'raw': 80000},
+    'data_shards': {'raw': 180000, 'gzip': 40000},
+    'search_index': {'raw': 600000, 'gzip': 170000},
+    'records_page': {'raw': 100000, 'gzip': 15000},
+    'swimmer_page': {'raw': 250000, 'gzip': 20000},
+}
+
+def compressed_sizes(content):
+    """Return raw, gzip and (if brotli is installed) brotli sizes in bytes."""
+    data = content.encode('utf-8') if isinstance(content, str) else content
+    sizes = {'raw': len(data), 'gzip': len(gzip.compress(data, compresslevel=9, mtime=0))}
+    if brotli is not None:
+        sizes['brotli'] = len(brotli.compress(data))
+    return sizes
+
+def add_sizes(total, sizes):
+    """Add one set of compressed_sizes to a running total."""
+    for kind, size in sizes.items():
+        total[kind] = total.get(kind, 0) + size
+    return total
+
+def split_index_payload(html_content):
+    """Split index.html into its markup, CSS, embedded data, translations and remaining script."""
+    style_pattern = r'<style>(.*?)</style>'
+    script_pattern = r'<script>(.*?)</script>'
+    data_pattern = r'^ *const (?:events|searchIndexUrl|latestBitsets) = .*$'
+    translations_pattern = r'^( *)const (?:eventTranslations|translations) = \{.*?^\1\};$'
+    
+    css = ''.join(re.findall(style_pattern, html_content, re.S))
+    scripts = ''.join(re.findall(script_pattern, html_content, re.S))
+    data = ''.join(re.findall(data_pattern, scripts, re.M))
+    translations = ''.join(match.group(0) for match in re.finditer(translations_pattern, scripts, re.M | re.S))
+    script = re.sub(translations_pattern, '', re.sub(data_pattern, '', scripts, flags=re.M), flags=re.M | re.S)
+    markup = re.sub(script_pattern, '', re.sub(style_pattern, '', html_content, flags=re.S), flags=re.S)
+    
+    return {'markup': markup, 'css': css, 'data': data, 'translations': translations, 'script': script}
+
+def largest_output(folder, build):
+    """Path of the largest file written to folder in this build (by raw size), or None."""
+    paths = [path for path in build['files'] if path.startswith(f'{folder}/')]
+    return max(paths, key=lambda path: build['files'][path]['bytes'], default=None)
+
+def build_payload_report(html_content, statistics_content, records_content, build):
+    """Measure the size of each part of the site payload, raw and compressed."""
+    report = {
+        'index.html': compressed_sizes(html_content),
+        'statistics.html': compressed_sizes(statistics_content),
+        'records.html': compressed_sizes(records_content),
+    }
+    
+    # Count the linked stylesheets and scripts as part of the page that loads them (the data shards are reported below)
+    page = re.sub(r'<link rel="stylesheet" href="[^"]+">|<script src="[^"]+"></script>', '', html_content)
+    for path in re.findall(r'<link rel="stylesheet" href="([^"]+)">', html_content):
+        page += f'<style>{read_output(path, build).decode("utf-8")}</style>'
+    for path in re.findall(r'<script src="([^"]+)"></script>', html_content):
+        if not is_data_shard(path):
+            page += f'<script>\n{read_output(path, build).decode("utf-8")}\n</script>'
+    for part, content in split_index_payload(page).items():
+        report[part] = compressed_sizes(content)
+    
+    # Images referenced from the main page, e.g. the logo
+    images = {}
+    for image_path in sorted(set(re.findall(r'<img src="([^"]+)"', html_content))):
+        if output_exists(image_path, build) or os.path.exists(image_path):
+            add_sizes(images, compressed_sizes(read_output(image_path, build)))
+    report['images'] = images
     
-    # Sort events by length and type (same as main page)
-    sorted_events = sorted(event_stats.items(), key=lambda x: sort_events(x[0]))
+    # Per-event data shards, as downloaded one at a time
+    shards = {}
+    for path in sorted(build['files']):
+        if is_data_shard(path):
+            add_sizes(shards, compressed_sizes(read_output(path, build)))
+    report['data_shards'] = shards
     
-    # Create top 10 lists across all events and pools
-    all_male_results = []
-    all_female_results = []
+    # The search index, downloaded on the first search
+    if output_exists(SEARCH_INDEX_PATH, build):
+        report['search_index'] = compressed_sizes(read_output(SEARCH_INDEX_PATH, build))
+    
+    # Event records and swimmer pages are opened one at a time, so the largest one is what counts
+    for part, folder in (('records_page', 'records'), ('swimmer_page', 'swimmers')):
+        path = largest_output(folder, build)
+        if path:
+            report[part] = compressed_sizes(read_output(path, build))
+    
+    return report
+
+def load_payload_budgets(budgets_path=PAYLOAD_BUDGETS_FILE):
+    """Load the payload budgets, falling back to DEFAULT_PAYLOAD_BUDGETS."""
+    if not os.path.exists(budgets_path):
+        return DEFAULT_PAYLOAD_BUDGETS
+    with open(budgets_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def check_payload_budgets(report, budgets):
+    """Return a message for every part and size kind that exceeds its budget."""
+    violations = []
+    for part, limits in budgets.items():
+        for kind, limit in limits.items():
+            size = report.get(part, {}).get(kind)
+            if size is not None and size > limit:
+                violations.append(f"{part} {kind}: {size} bytes (budget {limit})")
+    return violations
+
+def print_payload_report(report, budgets):
+    """Print the payload sizes per part with their budgets."""
+    kinds = ['raw', 'gzip'] + (['brotli'] if brotli is not None else [])
+    print(f"\n📦 Payload size report")
+    print(f"{'Part':<16} " + " ".join(f"{kind:>10}" for kind in kinds) + "   Budget")
+    for part, sizes in report.items():
+        budget = ', '.join(f"{kind} {limit}" for kind, limit in budgets.get(part, {}).items())
+        print(f"{part:<16} " + " ".join(f"{sizes.get(kind, 0):>10}" for kind in kinds) + f"   {budget}")
+
+def event_slug(event_name):
+    """File name (without extension) of an event's data file and records page, e.g. 50m-fri."""
+    return normalize_search_text(event_name).replace(' ', '-')
+
+def data_shard_path(event_name, output_folder='data'):
+    """Path of the data file of an event."""
+    return os.path.join(output_folder, f"{event_slug(event_name)}.js")
+
+def is_data_shard(path):
+    """Whether an output path (as in the build manifest) is one of the per-event data files the page loads."""
+    return path.startswith('data/') and path.endswith('.js') and path != SEARCH_INDEX_PATH
+
+def without_missing_values(event_data):
+    """Replace missing (NaN) values in an event's results with None, so they serialize as null."""
+    return {
+        category: [{key: None if isinstance(value, float) and math.isnan(value) else value for key, value in result.items()}
+                   for result in results]
+        for category, results in event_data.items()
+    }
+
+def generate_data_shards(all_data, events, build, output_folder='data'):
+    """
+    Write one data file per event, named after the event.
+
+    The files are scripts that add the event to self.tslkData, so index.html loads them with
+    <script> tags (which also works when it is opened from disk) and the registrations worker
+    with importScripts. Both get them from the browser cache, and a data update only changes
+    the files of the events that changed.
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    shards = {}
+
+    for event_name in events:
+        shard_path = data_shard_path(event_name, output_folder)
+        event_json = json.dumps(without_missing_values(all_data[event_name]), ensure_ascii=False, sort_keys=True)
+        write_output(shard_path, f"(self.tslkData = self.tslkData || {{}})[{json.dumps(event_name, ensure_ascii=False)}] = {event_json};\n", build)
+        shards[event_name] = shard_path.replace(os.sep, '/')
+
+    return shards
+
+def generate_swimmer_pages(swimmer_results, swimmer_slugs, latest_date, build, output_folder='swimmers', logo_variants=None,
+                           personal_bests=None):
+    """
+    Render and write one profile page per swimmer.
+
+    Rendering is CPU-bound string formatting, so the pages are rendered in a plain loop:
+    a thread pool measured slightly slower (the GIL), and unchanged pages are not written.
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    logo_html = logo_markup(logo_variants, prefix='../')
+
+    # Personal best progression per swimmer, in event display order
+    progression = {}
+    for r in sorted(personal_bests or [], key=lambda r: sort_events(r['Event'])):
+        progression.setdefault((r['Name'], r['Gender']), []).append(r)
+
+    for swimmer, results in swimmer_results.items():
+        page_path = os.path.join(output_folder, swimmer_slugs[swimmer])
+        write_output(page_path, generate_swimmer_page(swimmer[0], results, latest_date, logo_html, progression.get(swimmer)), build)
+
+    return len(swimmer_results)
+
+def build_results_store(statistics_data):
+    """Flatten the statistics data into one DataFrame with Event, Gender, Pool and Rank columns."""
+    import pandas as pd
+    
+    frames = []
     
     for event_name, event_data in statistics_data.items():
-        # Add male results
-        for category in ['Male_25m', 'Male_50m']:
-            if category in event_data:
-                for result in event_data[category]:
-                    result_copy = result.copy()
-                    result_copy['Event'] = event_name
-                    result_copy['Pool'] = '25m' if category == 'Male_25m' else '50m'
-                    all_male_results.append(result_copy)
-        
-        # Add female results
-        for category in ['Female_25m', 'Female_50m']:
-            if category in event_data:
-                for result in event_data[category]:
-                    result_copy = result.copy()
-                    result_copy['Event'] = event_name
-                    result_copy['Pool'] = '25m' if category == 'Female_25m' else '50m'
-                    all_female_results.append(result_copy)
-    
-    # Sort by points (highest first) and take top 10
-    all_male_results.sort(key=lambda x: x.get('Poeng', 0), reverse=True)
-    all_female_results.sort(key=lambda x: x.get('Poeng', 0), reverse=True)
-    
-    top_10_male = all_male_results[:10]
-    top_10_female = all_female_results[:10]
+        for category in CATEGORY_NAMES:
+            results = event_data.get(category, [])
+            if not results:
+                continue
+            
+            frame = pd.DataFrame.from_records(results)
+            frame['Event'] = event_name
+            frame['Gender'], frame['Pool'] = category_key(category)
+            frame['Rank'] = range(1, len(frame) + 1)
+            frames.append(frame)
+    
+    columns = ['Name', 'Tid', 'Poeng', 'Dato', 'Sted', 'Event', 'Gender', 'Pool', 'Rank']
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    
+    results = pd.concat(frames, ignore_index=True)
+    results['Poeng'] = pd.to_numeric(results['Poeng'], errors='coerce')
+    return results[columns]
+
+def compute_statistics(results, events):
+    """Compute all statistics page aggregates from the results store in one grouped pass."""
+    import pandas as pd
+    
+    # Counts per event and category
+    counts = (results.groupby(['Event', 'Gender', 'Pool']).size()
+              .unstack(['Gender', 'Pool'], fill_value=0)
+              .reindex(index=events, columns=pd.MultiIndex.from_tuples(CATEGORIES), fill_value=0))
+    totals = counts.sum(axis=1)
+    
+    event_stats = [
+        (event_name, {
+            'total': int(totals[event_name]),
+            **{name.lower(): int(counts.at[event_name, key]) for key, name in zip(CATEGORIES, CATEGORY_NAMES)}
+        })
+        for event_name in events
+    ]
+    
+    category_totals = counts.sum(axis=0)
+    gender_stats = {gender: int(category_totals[gender].sum()) for gender in DIMENSIONS['gender'][1]}
+    pool_stats = {pool: int(category_totals.xs(pool, level=1).sum()) for pool in DIMENSIONS['pool'][1]}
+    
+    # Top 10 across all events and pools per gender
+    top_10 = (results.sort_values('Poeng', ascending=False, kind='stable')
+              .groupby('Gender', sort=False).head(10))
+    
+    return {
+        'event_stats': event_stats,
+        'max_total': int(totals.max()) if len(totals) else 0,
+        'total_swimmers': int(totals.sum()),
+        'gender_stats': gender_stats,
+        'pool_stats': pool_stats,
+        'top_10_male': top_10[top_10['Gender'] == 'Male'].to_dict('records'),
+        'top_10_female': top_10[top_10['Gender'] == 'Female'].to_dict('records')
+    }
+
+# Width of the points histogram bins on the statistics page
+POINTS_BIN_WIDTH = 50
+POINTS_BIN_COUNT = 20
+
+def parse_times(times):
+    """Convert times like '50,11' or '1.01,16' to seconds (NaN if unparseable)."""
+    import pandas as pd
+    
+    # Times repeat a lot across results, so only the distinct values are parsed
+    codes, uniques = pd.factorize(times.astype(str))
+    parts = pd.Series(uniques).str.extract(r'^(?:(\d+)\.)?(\d+),(\d+)$')
+    parsed = pd.to_numeric(parts[0]).fillna(0).to_numpy() * 60 + pd.to_numeric(parts[1] + '.' + parts[2]).to_numpy()
+    return pd.Series(parsed[codes], index=times.index)
+
+def format_seconds(seconds):
+    """Format seconds in the same style as the results ('50,11' or '1.01,16')."""
+    hundredths = int(round(seconds * 100))
+    minutes, hundredths = divmod(hundredths, 6000)
+    secs, hundredths = divmod(hundredths, 100)
+    if minutes:
+        return f"{minutes}.{secs:02d},{hundredths:02d}"
+    return f"{secs},{hundredths:02d}"
+
+def compute_event_analytics(results):
+    """Compute points distributions and percentiles per (event, gender, pool).
+    
+    Everything is computed with grouped, vectorized operations over the whole
+    results store: a points histogram, points percentiles, the median time,
+    the club top 10 cutoff and how far the median result is from it. 'gaps'
+    holds, per group and in rank order, how far each result is from the cutoff.
+    """
+    import numpy as np
+    import pandas as pd
+    
+    keys = ['Event', 'Gender', 'Pool']
+    results = results.dropna(subset=['Poeng']).assign(Seconds=lambda df: parse_times(df['Tid']))
+    grouped = results.groupby(keys, sort=False)
+    
+    # Points histogram: bin index per result, then one grouped count
+    bins = np.clip(results['Poeng'].to_numpy() // POINTS_BIN_WIDTH, 0, POINTS_BIN_COUNT - 1).astype(int)
+    histograms = (results.assign(Bin=bins).groupby(keys + ['Bin'], sort=False).size()
+                  .unstack('Bin', fill_value=0)
+                  .reindex(columns=range(POINTS_BIN_COUNT), fill_value=0))
+    
+    percentiles = grouped['Poeng'].quantile([0.1, 0.25, 0.5, 0.75, 0.9]).unstack()
+    median_seconds = grouped['Seconds'].median()
+    counts = grouped.size()
+    
+    # Rank is the position within the category, so the cutoff is the lowest points in the top 10
+    cutoff = results[results['Rank'] <= 10].groupby(keys, sort=False)['Poeng'].min()
+    
+    summary = pd.DataFrame({
+        'count': counts,
+        'p10': percentiles[0.1],
+        'p25': percentiles[0.25],
+        'p50': percentiles[0.5],
+        'p75': percentiles[0.75],
+        'p90': percentiles[0.9],
+        'medianSeconds': median_seconds,
+        'top10Cutoff': cutoff,
+    })
+    summary['medianGapToTop10'] = summary['p50'] - summary['top10Cutoff']
+    
+    # Each result's distance from its category's cutoff (negative below it), in rank order
+    gaps = (results['Poeng'] - results.join(cutoff.rename('Cutoff'), on=keys)['Cutoff']).round(1)
+    gaps = gaps.astype(object).where(gaps.notna(), None).groupby([results[key] for key in keys], sort=False).agg(list)
+    
+    summary = summary.round(1).astype(object).where(summary.notna(), None)
+    
+    groups = []
+    for (event_name, gender, pool), row in summary.iterrows():
+        groups.append({
+            'event': event_name,
+            'gender': gender,
+            'pool': pool,
+            'count': int(row['count']),
+            'histogram': histograms.loc[(event_name, gender, pool)].astype(int).tolist(),
+            'percentiles': {name: row[name] for name in ['p10', 'p25', 'p50', 'p75', 'p90']},
+            'medianTime': format_seconds(row['medianSeconds']) if row['medianSeconds'] is not None else '',
+            'top10Cutoff': row['top10Cutoff'],
+            'medianGapToTop10': row['medianGapToTop10']
+        })
+    
+    groups.sort(key=lambda g: (sort_events(g['event']), g['gender'] != 'Male', g['pool']))
+    return {
+        'binWidth': POINTS_BIN_WIDTH,
+        'bins': [i * POINTS_BIN_WIDTH for i in range(POINTS_BIN_COUNT)],
+        'groups': groups,
+        'gaps': [gaps.loc[(g['event'], g['gender'], g['pool'])] for g in groups]
+    }
+
+def generate_statistics_page(statistics, latest_date, logo_html=None):
+    """Generate a statistics page with comprehensive data overview."""
+    logo_html = logo_html or logo_markup(None)
+    sorted_events = statistics['event_stats']
+    gender_stats = statistics['gender_stats']
+    total_swimmers = statistics['total_swimmers']
+    top_10_male = statistics['top_10_male']
+    top_10_female = statistics['top_10_female']
+    analytics = statistics['analytics']
+    # The per-result gaps are only written to data/analytics.json; the page charts the distributions
+    page_analytics = {key: value for key, value in analytics.items() if key != 'gaps'}
+    
+    # Computed once for the whole chart instead of per bar
+    max_total = max(statistics['max_total'], 1)
+    male_share = gender_stats['Male'] / max(gender_stats['Male'] + gender_stats['Female'], 1)
     
     stats_html = f"""<!DOCTYPE html>
 <html lang="no">
@@ -390,8 +1913,8 @@ def generate_statistics_page(statistics_data, latest_date):
             margin: 0 auto;
             position: relative;
             background: conic-gradient(
-                #52a2d6 0deg {gender_stats['Male'] / (gender_stats['Male'] + gender_stats['Female']) * 360}deg,
-                #ff6b6b {gender_stats['Male'] / (gender_stats['Male'] + gender_stats['Female']) * 360}deg 360deg
+                #52a2d6 0deg {male_share * 360}deg,
+                #ff6b6b {male_share * 360}deg 360deg
             );
         }}
         
@@ -493,14 +2016,66 @@ def generate_statistics_page(statistics_data, latest_date):
             color: #52a2d6;
         }}
         
-        .last-updated {{
-            text-align: center;
-            padding: 20px;
-            color: #666;
-            font-style: italic;
-            background: white;
-            border-radius: 10px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+        .distribution-select {{
+            display: block;
+            margin: 0 auto 20px;
+            padding: 8px 12px;
+            border: 1px solid #ccc;
+            border-radius: 6px;
+            font-size: 0.95em;
+        }}
+        
+        .distribution-summary {{
+            display: grid;
+            grid-template-columns: repeat(auto-fit, minmax(120px, 1fr));
+            gap: 10px;
+            margin-top: 20px;
+            text-align: center;
+        }}
+        
+        .distribution-summary .stat-number {{
+            font-size: 1.4em;
+            margin-bottom: 0;
+        }}
+        
+        .last-updated {{
+            text-align: center;
+            padding: 20px;
+            color: #666;
+            font-style: italic;
+            background: white;
+            border-radius: 10px;
+            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+        }}
+        
+        .update-notice {{
+            position: fixed;
+            bottom: 20px;
+            left: 50%;
+            transform: translateX(-50%);
+            display: flex;
+            align-items: center;
+            gap: 12px;
+            padding: 10px 16px;
+            background: #212529;
+            color: white;
+            border-radius: 6px;
+            box-shadow: 0 4px 12px rgba(0, 0, 0, 0.25);
+            z-index: 1000;
+        }}
+        
+        .update-notice[hidden] {{
+            display: none;
+        }}
+        
+        .update-notice button {{
+            padding: 6px 12px;
+            border: none;
+            border-radius: 4px;
+            background: #52a2d6;
+            color: white;
+            font-weight: 600;
+            cursor: pointer;
         }}
         
         @media (max-width: 768px) {{
@@ -542,13 +2117,18 @@ def generate_statistics_page(statistics_data, latest_date):
     </style>
 </head>
 <body>
+    <div class="update-notice" id="updateNotice" hidden>
+        <span id="updateNoticeText">Nye resultater er tilgjengelige.</span>
+        <button type="button" id="updateNoticeReload" onclick="location.reload()">Oppdater</button>
+    </div>
     <div class="header">
         <div class="header-content">
-            <img src="logo.png" alt="TSLK Logo" class="logo">
+            {logo_html}
             <h1>TS&LK - Statistikk</h1>
             <div class="nav-buttons">
                 <a href="index.html" class="nav-btn">Rekorder</a>
                 <a href="statistics.html" class="nav-btn">Statistikk</a>
+                <a href="records.html" class="nav-btn">Klasserekorder</a>
             </div>
         </div>
     </div>
@@ -575,7 +2155,7 @@ def generate_statistics_page(statistics_data, latest_date):
             <div class="chart-title">Deltakelse per Øvelse</div>
             <div class="bar-chart">
                 {''.join(f'''
-                <div class="bar" style="height: {min(180, event[1]['total'] / max([e[1]['total'] for e in sorted_events]) * 180)}px">
+                <div class="bar" style="height: {min(180, event[1]['total'] / max_total * 180)}px">
                     <div class="bar-value">{event[1]['total']}</div>
                     <div class="bar-label">{event[0]}</div>
                 </div>''' for event in sorted_events)}
@@ -584,6 +2164,16 @@ def generate_statistics_page(statistics_data, latest_date):
         
 
         
+        <!-- Points distribution per event, gender and pool (precomputed at build time) -->
+        <div class="chart-container">
+            <div class="chart-title">Poengfordeling per Øvelse</div>
+            <select id="distributionSelect" class="distribution-select">
+                {''.join(f'<option value="{i}">{format_cell(g["event"])} - {"Menn" if g["gender"] == "Male" else "Kvinner"} {g["pool"]}</option>' for i, g in enumerate(analytics['groups']))}
+            </select>
+            <div class="bar-chart" id="distributionChart"></div>
+            <div class="distribution-summary" id="distributionSummary"></div>
+        </div>
+        
         <!-- Top 10 Results Tables -->
         <div class="top-results-grid">
             <div class="top-results-table">
@@ -605,13 +2195,13 @@ def generate_statistics_page(statistics_data, latest_date):
                         {''.join(f'''
                         <tr>
                             <td>{i+1}</td>
-                            <td>{result.get('Name', '')}</td>
-                            <td>{result.get('Event', '')}</td>
-                            <td>{result.get('Pool', '')}</td>
-                            <td>{result.get('Tid', '')}</td>
-                            <td class="points-cell">{result.get('Poeng', '')}</td>
-                            <td>{result.get('Dato', '')}</td>
-                            <td>{result.get('Sted', '')}</td>
+                            <td>{format_cell(result['Name'])}</td>
+                            <td>{format_cell(result['Event'])}</td>
+                            <td>{result['Pool']}</td>
+                            <td>{format_cell(result['Tid'])}</td>
+                            <td class="points-cell">{format_cell(result['Poeng'])}</td>
+                            <td>{format_cell(result['Dato'])}</td>
+                            <td>{format_cell(result['Sted'])}</td>
                         </tr>''' for i, result in enumerate(top_10_male))}
                     </tbody>
                 </table>
@@ -636,13 +2226,13 @@ def generate_statistics_page(statistics_data, latest_date):
                         {''.join(f'''
                         <tr>
                             <td>{i+1}</td>
-                            <td>{result.get('Name', '')}</td>
-                            <td>{result.get('Event', '')}</td>
-                            <td>{result.get('Pool', '')}</td>
-                            <td>{result.get('Tid', '')}</td>
-                            <td class="points-cell">{result.get('Poeng', '')}</td>
-                            <td>{result.get('Dato', '')}</td>
-                            <td>{result.get('Sted', '')}</td>
+                            <td>{format_cell(result['Name'])}</td>
+                            <td>{format_cell(result['Event'])}</td>
+                            <td>{result['Pool']}</td>
+                            <td>{format_cell(result['Tid'])}</td>
+                            <td class="points-cell">{format_cell(result['Poeng'])}</td>
+                            <td>{format_cell(result['Dato'])}</td>
+                            <td>{format_cell(result['Sted'])}</td>
                         </tr>''' for i, result in enumerate(top_10_female))}
                     </tbody>
                 </table>
@@ -681,59 +2271,135 @@ def generate_statistics_page(statistics_data, latest_date):
             Sist oppdatert: {latest_date}
         </div>
     </div>
+    
+    <script>
+        const analytics = {json.dumps(page_analytics, separators=(',', ':'))};
+        
+        function showDistribution(index) {{
+            const group = analytics.groups[index];
+            if (!group) return;
+            
+            const maxCount = Math.max(1, ...group.histogram);
+            document.getElementById('distributionChart').innerHTML = group.histogram.map((count, bin) => `
+                <div class="bar" style="height: ${{count / maxCount * 180}}px">
+                    <div class="bar-value">${{count || ''}}</div>
+                    <div class="bar-label">${{analytics.bins[bin]}}</div>
+                </div>`).join('');
+            
+            const summary = [
+                ['Antall', group.count],
+                ['10. persentil', group.percentiles.p10],
+                ['Median', group.percentiles.p50],
+                ['90. persentil', group.percentiles.p90],
+                ['Mediantid', group.medianTime],
+                ['Topp 10-grense', group.top10Cutoff],
+                ['Median fra topp 10', group.medianGapToTop10]
+            ];
+            document.getElementById('distributionSummary').innerHTML = summary.map(([label, value]) => `
+                <div>
+                    <div class="stat-number">${{value ?? ''}}</div>
+                    <div class="stat-label">${{label}}</div>
+                </div>`).join('');
+        }}
+        
+        document.getElementById('distributionSelect').addEventListener('change', event => showDistribution(event.target.value));
+        showDistribution(0);
+        
+        // Offline cache with background data updates (sw.js)
+        if ('serviceWorker' in navigator) {{
+            navigator.serviceWorker.register('sw.js');
+            // sw.js posts tslk-updated after it has cached new data; offer a reload
+            navigator.serviceWorker.addEventListener('message', event => {{
+                if (event.data && event.data.type === 'tslk-updated') {{
+                    document.getElementById('updateNotice').hidden = false;
+                }}
+            }});
+        }}
+    </script>
 </body>
 </html>"""
     
     return stats_html
 
-def generate_html():
-    """Generate the HTML file."""
+def generate_html(enforce_budgets=True, all_data=None, statistics_data=None, memory=None, records_data=None,
+                  progression_data=None):
+    """
+    Generate the HTML file.
+    
+    all_data, statistics_data, records_data and progression_data can be passed in by a caller
+    that already has the results in memory (see tslk.py); otherwise they are loaded from the
+    EndResult and Statistics files, Records/records.xlsx and History/progression.xlsx.
+    With memory (output path -> bytes) the site is built into that dict instead of to disk.
+    With enforce_budgets, PayloadBudgetError is raised after the build when the payload is
+    over budget.
+    """
     # Load data for website display (top 10)
-    all_data = load_all_results()
+    with stage("site_load", file=os.path.join("..", "EndResult")) as record:
+        if all_data is None:
+            all_data = load_all_results()
+        record["rows_out"] = sum(len(rows) for categories in all_data.values() for rows in categories.values())
     
     # Load data for statistics (all data)
-    statistics_data = load_statistics_data()
+    with stage("site_load", file=os.path.join("..", "Statistics")) as record:
+        if statistics_data is None:
+            statistics_data = load_statistics_data()
+        statistics_rows = sum(len(rows) for categories in statistics_data.values() for rows in categories.values())
+        record["rows_out"] = statistics_rows
+    
+    # Load the age group and season records
+    with stage("site_load", file=os.path.join("..", "Records")) as record:
+        if records_data is None:
+            records_data = load_records_data()
+        record["rows_out"] = sum(len(rows) for rows in records_data.values())
+    
+    # Load the personal best and club record progression
+    with stage("site_load", file=os.path.join("..", "History")) as record:
+        if progression_data is None:
+            progression_data = load_progression_data()
+        record["rows_out"] = sum(len(rows) for rows in progression_data.values())
     
     latest_date = get_latest_file_date()
     
     # Get unique events and sort them by length and type
     events = list(all_data.keys())
     
-    def sort_events(event_name):
-        """Sort events by length first, then by type in specified order."""
-        # Extract length (number before 'm')
-        import re
-        length_match = re.search(r'(\d+)m', event_name)
-        if length_match:
-            length = int(length_match.group(1))
-        else:
-            length = 0
-        
-        # Define type order (lower number = higher priority)
-        type_order = {
-            'butterfly': 1,
-            'rygg': 2,
-            'bryst': 3,
-            'fri': 4,
-            'medley': 5
-        }
-        
-        # Find the type in the event name
-        event_lower = event_name.lower()
-        event_type = 6  # Default for unknown types
-        
-        for type_name, order in type_order.items():
-            if type_name in event_lower:
-                event_type = order
-                break
-        
-        return (length, event_type)
-    
     # Sort events by length and type
     events.sort(key=sort_events)
     
+    statistics_events = sorted(statistics_data, key=sort_events)
+    
+    with stage("site_aggregate", rows_in=statistics_rows) as record:
+        # Aggregates for the statistics page
+        results_store = build_results_store(statistics_data)
+        statistics = compute_statistics(results_store, statistics_events)
+        statistics['analytics'] = compute_event_analytics(results_store)
+        
+        # Group all statistics results per swimmer for the profile pages
+        swimmer_results = group_results_by_swimmer(statistics_data, statistics_events)
+        swimmer_slugs = assign_swimmer_slugs(swimmer_results)
+        
+        # Build swimmer search index over all statistics results
+        search_index = build_search_index(swimmer_results, statistics_events, swimmer_slugs)
+        record["rows_out"] = len(swimmer_results)
+    
+    # Output files are tracked from here on, so unchanged images are not re-encoded
+    build = start_build(memory=memory)
+    
+    with stage("site_images", file=LOGO_SOURCE) as record:
+        logo_variants = generate_image_variants(LOGO_SOURCE, LOGO_WIDTHS, build)
+        logo_html = logo_markup(logo_variants)
+        record["rows_out"] = sum(len(urls) for urls in logo_variants['sources'].values()) if logo_variants else 0
+    
     # Generate main page
-    html_content = f"""<!DOCTYPE html>
+    with stage("site_render", rows_in=len(events), file='index.html') as record:
+        # The latest registrations worker, the data files it decodes and the code it shares with the page
+        registrations_worker_url = write_registrations_worker(build)
+        # Loaded in all_data order, so allData (and the registration numbering of the bitsets) has that order
+        data_shards = {event_name: data_shard_path(event_name).replace(os.sep, '/') for event_name in all_data}
+        data_scripts = '\n    '.join(f'<script src="{path}"></script>' for path in data_shards.values())
+        registrations_js = textwrap.indent(LATEST_REGISTRATIONS_JS, ' ' * 8)
+        
+        html_content = f"""<!DOCTYPE html>
 <html lang="no">
 <head>
     <meta charset="UTF-8">
@@ -912,6 +2578,17 @@ def generate_html():
             min-width: 180px;
         }}
         
+        .filter-group input[type="search"] {{
+            padding: 8px 12px;
+            border: 1px solid #ced4da;
+            border-radius: 6px;
+            font-size: 0.9em;
+            background: white;
+            transition: border-color 0.2s, box-shadow 0.2s;
+            min-width: 220px;
+        }}
+        
+        .filter-group input[type="search"]:focus,
         .filter-group select:focus {{
             outline: none;
             border-color: #007bff;
@@ -1098,6 +2775,36 @@ def generate_html():
             padding: 0 20px;
         }}
         
+        .update-notice {{
+            position: fixed;
+            bottom: 20px;
+            left: 50%;
+            transform: translateX(-50%);
+            display: flex;
+            align-items: center;
+            gap: 12px;
+            padding: 10px 16px;
+            background: #212529;
+            color: white;
+            border-radius: 6px;
+            box-shadow: 0 4px 12px rgba(0, 0, 0, 0.25);
+            z-index: 1000;
+        }}
+        
+        .update-notice[hidden] {{
+            display: none;
+        }}
+        
+        .update-notice button {{
+            padding: 6px 12px;
+            border: none;
+            border-radius: 4px;
+            background: #52a2d6;
+            color: white;
+            font-weight: 600;
+            cursor: pointer;
+        }}
+        
         .results-table {{
             background: white;
             border-radius: 8px;
@@ -1302,7 +3009,8 @@ def generate_html():
                 width: 100%;
             }}
             
-            .filter-group select {{
+            .filter-group select,
+            .filter-group input[type="search"] {{
                 width: 100%;
                 padding: 12px;
                 font-size: 1em;
@@ -1435,16 +3143,22 @@ def generate_html():
     </style>
 </head>
 <body>
+    <div class="update-notice" id="updateNotice" hidden>
+        <span id="updateNoticeText">Nye resultater er tilgjengelige.</span>
+        <button type="button" id="updateNoticeReload" onclick="location.reload()">Oppdater</button>
+    </div>
     <div class="header">
         <div class="header-content">
             <div class="header-main">
-                <img src="logo.png" alt="TSLK Logo" class="logo">
+                {logo_html}
                 <h1 id="mainTitle">
                     <span id="mainTitleText">Klubbrekorder TS&LK</span>
                     <span class="main-title-updated" id="mainTitleUpdated">Sist oppdatert {latest_date}</span>
                 </h1>
                 <div class="nav-buttons">
                     <!-- Logo click will return to best swimmers view -->
+                    <a href="statistics.html" class="nav-btn" id="statisticsLink">Statistikk</a>
+                    <a href="records.html" class="nav-btn" id="classRecordsLink">Klasserekorder</a>
                 </div>
                 <div class="language-switcher">
                     <button class="flag-btn active" onclick="changeLanguage('no')" title="Norsk">🇳🇴</button>
@@ -1485,6 +3199,10 @@ def generate_html():
                 </label>
             </div>
         </div>
+        
+        <div class="filter-group">
+            <input type="search" id="swimmerSearch" placeholder="Søk etter svømmer" autocomplete="off">
+        </div>
     </div>
     
     <div class="filters" id="latestFilters" style="display: none;">
@@ -1519,11 +3237,42 @@ def generate_html():
     <div class="results-container" id="resultsContainer">
         <!-- Results will be populated by JavaScript -->
     </div>
+    
+    <template id="resultsTableTemplate">
+        <div class="results-table">
+            <div class="table-header">
+                <span class="table-header-title">
+                    <span class="table-header-text"></span>
+                    <span class="info-icon" tabindex="0"></span>
+                </span>
+            </div>
+            <div class="table-content">
+                <table>
+                    <thead>
+                        <tr></tr>
+                    </thead>
+                    <tbody></tbody>
+                </table>
+            </div>
+            <div class="table-pagination">
+                <button type="button" class="pagination-btn pagination-prev" data-step="-1"></button>
+                <span class="pagination-info"></span>
+                <button type="button" class="pagination-btn pagination-next" data-step="1"></button>
+            </div>
+        </div>
+    </template>
+    
+    <template id="eventLinkTemplate">
+        <button type="button" class="event-link"></button>
+    </template>
 
+    {data_scripts}
     <script>
-        // Data from Python
-        const allData = {json.dumps(all_data)};
+        // Data from Python; the results of each event come from its data file
+        const allData = self.tslkData || {{}};
         const events = {json.dumps(events)};
+        const searchIndexUrl = '{SEARCH_INDEX_PATH}';
+        const latestBitsets = {json.dumps(registration_bitsets(all_data), separators=(',', ':'))};
         
         // Event name translations
         const eventTranslations = {{
@@ -1610,8 +3359,14 @@ def generate_html():
                 pageLabel: "Side",
                 pageOf: "av",
                 lastUpdated: "Sist oppdatert",
+                statisticsLink: "Statistikk",
+                classRecordsLink: "Klasserekorder",
+                searchPlaceholder: "Søk etter svømmer",
+                searchResults: "Søkeresultater",
                 filterMessage: "Vennligst velg både øvelse og kjønn for å se resultater.",
-                noResultsMessage: "Ingen resultater funnet for de valgte filtrene."
+                noResultsMessage: "Ingen resultater funnet for de valgte filtrene.",
+                updateAvailable: "Nye resultater er tilgjengelige.",
+                reloadPage: "Oppdater"
             }},
             en: {{
                 mainTitle: "Club Records",
@@ -1650,8 +3405,14 @@ def generate_html():
                 pageLabel: "Page",
                 pageOf: "of",
                 lastUpdated: "Last updated",
+                statisticsLink: "Statistics",
+                classRecordsLink: "Age group records",
+                searchPlaceholder: "Search for swimmer",
+                searchResults: "Search results",
                 filterMessage: "Please select both event and gender to see results.",
-                noResultsMessage: "No results found for the selected filters."
+                noResultsMessage: "No results found for the selected filters.",
+                updateAvailable: "New results are available.",
+                reloadPage: "Reload"
             }}
         }};
         
@@ -1668,66 +3429,303 @@ def generate_html():
                 `${{translations[lang].mainTitleUpdated}} ${{latestUpdateDate}}`;
         }}
         
-        function parseDate(dateStr) {{
-            if (!dateStr) return new Date(0);
-            const parts = String(dateStr).split('.');
-            if (parts.length !== 3) return new Date(0);
-            const [day, month, year] = parts.map(Number);
-            return new Date(year, month - 1, day);
+{registrations_js}
+        // Latest registrations are filtered, sorted and paged in a worker that loads the data
+        // files itself (from the cache the page's <script> tags filled), so only the rows of the
+        // current page reach this thread. Where workers are not available (e.g. file:// URLs)
+        // the same code runs here instead
+        const registrationsWorkerUrl = '{registrations_worker_url}';
+        const dataShards = {json.dumps(data_shards, ensure_ascii=False)};
+        const pendingRegistrations = new Map();
+        let registrationsWorker = null;
+        let registrationsRequestId = 0;
+        let localRegistrations = null;
+        
+        function startRegistrationsWorker() {{
+            if (typeof Worker === 'undefined' || location.protocol === 'file:') return;
+            try {{
+                registrationsWorker = new Worker(registrationsWorkerUrl);
+            }} catch (error) {{
+                return;
+            }}
+            
+            registrationsWorker.onmessage = event => {{
+                const {{ id, error, ...result }} = event.data;
+                const pending = pendingRegistrations.get(id);
+                if (!pending) return;
+                if (error) {{
+                    stopRegistrationsWorker();
+                    return;
+                }}
+                pendingRegistrations.delete(id);
+                pending.resolve(result);
+            }};
+            registrationsWorker.onerror = stopRegistrationsWorker;
+            
+            const shards = {{}};
+            for (const [eventName, path] of Object.entries(dataShards)) {{
+                shards[eventName] = new URL(path, document.baseURI).href;
+            }}
+            registrationsWorker.postMessage({{ type: 'init', shards, bitsets: latestBitsets }});
+        }}
+        
+        // Fall back to the main thread, answering the requests still waiting on the worker
+        function stopRegistrationsWorker() {{
+            if (registrationsWorker) {{
+                registrationsWorker.terminate();
+                registrationsWorker = null;
+            }}
+            for (const {{ query, resolve }} of pendingRegistrations.values()) {{
+                resolve(localRegistrationsPage(query));
+            }}
+            pendingRegistrations.clear();
+        }}
+        
+        function localRegistrationsPage(query) {{
+            if (!localRegistrations) {{
+                localRegistrations = buildRegistrations(allData);
+            }}
+            return pageOfRegistrations(localRegistrations, latestBitsets, query);
+        }}
+        
+        function queryRegistrations(query) {{
+            if (!registrationsWorker) {{
+                return Promise.resolve(localRegistrationsPage(query));
+            }}
+            return new Promise(resolve => {{
+                const id = ++registrationsRequestId;
+                pendingRegistrations.set(id, {{ query, resolve }});
+                registrationsWorker.postMessage({{ type: 'query', id, query }});
+            }});
+        }}
+        
+        // Rendering layer: result tables are cloned from <template>s and kept between renders.
+        // Rows are keyed, so paging, sorting and language changes only touch the cells that
+        // changed, and a single delegated listener on resultsContainer handles every click.
+        const renderedTables = new Map();
+        
+        const columnTypes = {{
+            rank: {{ header: 'rankHeader', className: 'rank', value: (row, rank) => rank }},
+            name: {{ header: 'nameHeader', value: row => row.Name || '' }},
+            swimmer: {{ header: 'nameHeader', value: row => row.Name || '', link: row => row.Page ? `swimmers/${{row.Page}}` : null }},
+            event: {{ header: 'eventHeader', value: row => eventTranslations[currentLanguage][row.Event] || row.Event || '' }},
+            eventLink: {{ header: 'eventHeader', eventLink: true, value: row => eventTranslations[currentLanguage][row.Event] || row.Event || '' }},
+            pool: {{ header: 'poolHeader', value: row => row.Pool || '' }},
+            pos: {{ header: 'posHeader', value: row => row.Pos || '' }},
+            time: {{ header: 'timeHeader', value: row => row.Tid || '' }},
+            points: {{ header: 'pointsHeader', className: 'points', value: row => row.Poeng || '' }},
+            date: {{ header: 'dateHeader', value: row => row.Dato || '' }},
+            location: {{ header: 'locationHeader', value: row => row.Sted || 'Ukjent' }}
+        }};
+        
+        const latestColumns = [
+            columnTypes.rank,
+            {{ ...columnTypes.name, sort: 'Name' }},
+            {{ ...columnTypes.eventLink, sort: 'Event' }},
+            {{ ...columnTypes.pool, sort: 'Pool' }},
+            {{ ...columnTypes.pos, sort: 'Pos' }},
+            {{ ...columnTypes.time, sort: 'Tid' }},
+            {{ ...columnTypes.points, sort: 'Poeng' }},
+            {{ ...columnTypes.date, sort: 'Dato' }},
+            {{ ...columnTypes.location, sort: 'Sted' }}
+        ];
+        const searchColumns = ['swimmer', 'eventLink', 'pool', 'pos', 'time', 'points', 'date'].map(type => columnTypes[type]);
+        const bestColumns = ['rank', 'name', 'event', 'pool', 'time', 'points', 'date', 'location'].map(type => columnTypes[type]);
+        const eventColumns = ['rank', 'name', 'time', 'points', 'date', 'location'].map(type => columnTypes[type]);
+        
+        function setText(element, text) {{
+            text = String(text);
+            if (element.textContent !== text) {{
+                element.textContent = text;
+            }}
+        }}
+        
+        function cloneTemplate(id) {{
+            return document.getElementById(id).content.firstElementChild.cloneNode(true);
         }}
         
-        function parseTime(timeStr) {{
-            if (!timeStr) return Infinity;
-            const str = String(timeStr).trim();
-            if (str.includes('.')) {{
-                const [mins, secs] = str.split('.');
-                return parseInt(mins, 10) * 60 + parseFloat(secs.replace(',', '.'));
+        function createTable() {{
+            const element = cloneTemplate('resultsTableTemplate');
+            return {{
+                element,
+                title: element.querySelector('.table-header-text'),
+                tooltip: element.querySelector('.info-icon'),
+                headRow: element.querySelector('thead tr'),
+                body: element.querySelector('tbody'),
+                pagination: element.querySelector('.table-pagination'),
+                layout: null,
+                rowTemplate: null,
+                rows: new Map()
+            }};
+        }}
+        
+        // Build the header cells and the row template once per column layout
+        function setColumns(table, columns) {{
+            const layout = columns.map(column => [column.header, column.sort, column.eventLink, !!column.link].join(':')).join('|');
+            if (table.layout === layout) return;
+            
+            const rowTemplate = document.createElement('tr');
+            table.headRow.replaceChildren(...columns.map(column => {{
+                const th = document.createElement('th');
+                const td = document.createElement('td');
+                if (column.className) {{
+                    th.className = column.className;
+                    td.className = column.className;
+                }}
+                if (column.sort) {{
+                    th.classList.add('sortable');
+                    th.dataset.sort = column.sort;
+                }}
+                if (column.eventLink) {{
+                    td.appendChild(cloneTemplate('eventLinkTemplate'));
+                }}
+                rowTemplate.appendChild(td);
+                return th;
+            }}));
+            
+            table.layout = layout;
+            table.rowTemplate = rowTemplate;
+            table.rows.clear();
+            table.body.replaceChildren();
+        }}
+        
+        function updateHeader(th, column, spec) {{
+            const label = translations[currentLanguage][column.header];
+            const sorted = column.sort && spec.sortColumn === column.sort;
+            const indicator = sorted ? (spec.sortDirection === 'asc' ? '↑' : '↓') : '';
+            if (th.dataset.label === label + indicator) return;
+            
+            th.dataset.label = label + indicator;
+            th.textContent = label;
+            if (indicator) {{
+                const span = document.createElement('span');
+                span.className = 'sort-indicator';
+                span.textContent = indicator;
+                th.appendChild(span);
             }}
-            return parseFloat(str.replace(',', '.'));
         }}
         
-        function getSortIndicator(column) {{
-            if (latestSortColumn !== column) return '';
-            return `<span class="sort-indicator">${{latestSortDirection === 'asc' ? '↑' : '↓'}}</span>`;
+        function updateCell(td, column, row, rank) {{
+            const text = column.value(row, rank);
+            const href = column.link ? column.link(row) : null;
+            
+            if (column.eventLink) {{
+                const button = td.firstElementChild;
+                button.dataset.event = row.Event || '';
+                button.dataset.gender = row.Gender || '';
+                setText(button, text);
+            }}
+            else if (href) {{
+                let anchor = td.firstElementChild;
+                if (!anchor) {{
+                    anchor = document.createElement('a');
+                    td.replaceChildren(anchor);
+                }}
+                if (anchor.getAttribute('href') !== href) {{
+                    anchor.setAttribute('href', href);
+                }}
+                setText(anchor, text);
+            }}
+            else {{
+                if (td.firstElementChild) {{
+                    td.replaceChildren();
+                }}
+                setText(td, text);
+            }}
         }}
         
-        function sortLatestRegistrations(results) {{
-            const multiplier = latestSortDirection === 'asc' ? 1 : -1;
+        function updateRows(table, spec) {{
+            const rankOffset = spec.rankOffset || 0;
+            const seen = new Set();
+            let previous = null;
             
-            return [...results].sort((a, b) => {{
-                let cmp = 0;
+            spec.rows.forEach((row, index) => {{
+                let key = spec.rowKey(row);
+                if (seen.has(key)) {{
+                    key = `${{key}}#${{index}}`;
+                }}
+                seen.add(key);
                 
-                switch (latestSortColumn) {{
-                    case 'Name':
-                        cmp = (a.Name || '').localeCompare(b.Name || '', 'no');
-                        break;
-                    case 'Event':
-                        cmp = (a.Event || '').localeCompare(b.Event || '', 'no');
-                        break;
-                    case 'Pool':
-                        cmp = (a.Pool || '').localeCompare(b.Pool || '', 'no');
-                        break;
-                    case 'Pos':
-                        cmp = (a.Pos || 0) - (b.Pos || 0);
-                        break;
-                    case 'Tid':
-                        cmp = parseTime(a.Tid) - parseTime(b.Tid);
-                        break;
-                    case 'Poeng':
-                        cmp = (a.Poeng || 0) - (b.Poeng || 0);
-                        break;
-                    case 'Dato':
-                        cmp = parseDate(a.Dato) - parseDate(b.Dato);
-                        break;
-                    case 'Sted':
-                        cmp = (a.Sted || '').localeCompare(b.Sted || '', 'no');
-                        break;
-                    default:
-                        cmp = parseDate(a.Dato) - parseDate(b.Dato);
+                let tr = table.rows.get(key);
+                if (!tr) {{
+                    tr = table.rowTemplate.cloneNode(true);
+                    table.rows.set(key, tr);
                 }}
+                spec.columns.forEach((column, columnIndex) => updateCell(tr.children[columnIndex], column, row, rankOffset + index + 1));
                 
-                return cmp * multiplier;
+                // Only move rows that are not already in place
+                const expected = previous ? previous.nextSibling : table.body.firstChild;
+                if (expected !== tr) {{
+                    table.body.insertBefore(tr, expected);
+                }}
+                previous = tr;
+            }});
+            
+            for (const [key, tr] of table.rows) {{
+                if (!seen.has(key)) {{
+                    tr.remove();
+                    table.rows.delete(key);
+                }}
+            }}
+        }}
+        
+        function renderTable(table, spec) {{
+            const t = translations[currentLanguage];
+            setColumns(table, spec.columns);
+            setText(table.title, spec.title);
+            
+            table.tooltip.style.display = spec.tooltip ? '' : 'none';
+            if (spec.tooltip && table.tooltip.dataset.tooltip !== spec.tooltip) {{
+                table.tooltip.dataset.tooltip = spec.tooltip;
+                table.tooltip.setAttribute('aria-label', spec.tooltip);
+            }}
+            
+            Array.from(table.headRow.children).forEach((th, index) => updateHeader(th, spec.columns[index], spec));
+            updateRows(table, spec);
+            
+            table.pagination.style.display = spec.pagination ? '' : 'none';
+            if (spec.pagination) {{
+                const {{ page, totalPages }} = spec.pagination;
+                const [prevButton, info, nextButton] = table.pagination.children;
+                prevButton.disabled = page <= 1;
+                nextButton.disabled = page >= totalPages;
+                setText(prevButton, t.prevPage);
+                setText(nextButton, t.nextPage);
+                setText(info, `${{t.pageLabel}} ${{page}} ${{t.pageOf}} ${{totalPages}}`);
+            }}
+        }}
+        
+        // Show the given tables in resultsContainer, reusing the ones already on screen by id
+        function renderTables(specs, emptyMessage) {{
+            const container = document.getElementById('resultsContainer');
+            const elements = specs.map(spec => {{
+                let table = renderedTables.get(spec.id);
+                if (!table) {{
+                    table = createTable();
+                    renderedTables.set(spec.id, table);
+                }}
+                renderTable(table, spec);
+                return table.element;
             }});
+            
+            const ids = new Set(specs.map(spec => spec.id));
+            for (const id of renderedTables.keys()) {{
+                if (!ids.has(id)) {{
+                    renderedTables.delete(id);
+                }}
+            }}
+            
+            if (elements.length === 0 && emptyMessage) {{
+                const message = document.createElement('div');
+                message.className = 'no-data';
+                message.textContent = emptyMessage;
+                elements.push(message);
+            }}
+            
+            const current = Array.from(container.children);
+            if (current.length !== elements.length || current.some((element, index) => element !== elements[index])) {{
+                container.replaceChildren(...elements);
+            }}
         }}
         
         function handleLatestSort(column) {{
@@ -1750,6 +3748,7 @@ def generate_html():
         }}
         
         function navigateToEventRecord(eventName, gender) {{
+            document.getElementById('swimmerSearch').value = '';
             document.getElementById('eventSelect').value = eventName;
             if (gender === 'Male') {{
                 document.getElementById('maleOption').checked = true;
@@ -1760,41 +3759,109 @@ def generate_html():
             filterResults();
         }}
         
-        function filterLatestRegistrations(results) {{
-            const showMale = document.getElementById('latestMale').checked;
-            const showFemale = document.getElementById('latestFemale').checked;
-            const show25m = document.getElementById('latestPool25').checked;
-            const show50m = document.getElementById('latestPool50').checked;
-            
-            return results.filter(row => {{
-                const genderMatch = (row.Gender === 'Male' && showMale) || (row.Gender === 'Female' && showFemale);
-                const pool = row.Pool || '';
-                const poolMatch = (pool === '25m' && show25m) || (pool === '50m' && show50m);
-                return genderMatch && poolMatch;
-            }});
+        function latestFilterState() {{
+            return {{
+                male: document.getElementById('latestMale').checked,
+                female: document.getElementById('latestFemale').checked,
+                pool25: document.getElementById('latestPool25').checked,
+                pool50: document.getElementById('latestPool50').checked
+            }};
         }}
         
-        function getAllRegistrations() {{
-            const categories = ['Male_25m', 'Male_50m', 'Female_25m', 'Female_50m'];
-            const allResults = [];
+        function normalizeSearchText(text) {{
+            return String(text).toLowerCase()
+                .replace(/æ/g, 'ae').replace(/ø/g, 'o').replace(/å/g, 'a')
+                .normalize('NFD').replace(/[\\u0300-\\u036f]/g, '')
+                .match(/[a-z0-9]+/g) || [];
+        }}
+        
+        function intersectSorted(a, b) {{
+            const result = [];
+            let i = 0;
+            let j = 0;
+            while (i < a.length && j < b.length) {{
+                if (a[i] === b[j]) {{
+                    result.push(a[i]);
+                    i++;
+                    j++;
+                }} else if (a[i] < b[j]) {{
+                    i++;
+                }} else {{
+                    j++;
+                }}
+            }}
+            return result;
+        }}
+        
+        // The search index covers all swimmers, so it is only loaded once the user searches.
+        // A script tag (unlike fetch) also works when the page is opened from disk
+        let searchIndexPromise = null;
+        
+        function loadSearchIndex() {{
+            if (!searchIndexPromise) {{
+                searchIndexPromise = new Promise((resolve, reject) => {{
+                    const script = document.createElement('script');
+                    script.src = searchIndexUrl;
+                    script.onload = () => resolve(self.tslkSearchIndex);
+                    script.onerror = () => {{
+                        searchIndexPromise = null;
+                        script.remove();
+                        reject(new Error(`Could not load ${{searchIndexUrl}}`));
+                    }};
+                    document.head.appendChild(script);
+                }});
+            }}
+            return searchIndexPromise;
+        }}
+        
+        function searchSwimmers(searchIndex, query) {{
+            const terms = normalizeSearchText(query);
+            if (terms.length === 0) return [];
             
-            for (const [eventName, eventData] of Object.entries(allData)) {{
-                for (const category of categories) {{
-                    if (eventData[category]) {{
-                        eventData[category].forEach((result, index) => {{
-                            allResults.push({{
-                                ...result,
-                                Event: eventName,
-                                Pool: result.Pool || (category.endsWith('25m') ? '25m' : '50m'),
-                                Gender: result.Gender || (category.startsWith('Male') ? 'Male' : 'Female'),
-                                Pos: index + 1
-                            }});
-                        }});
-                    }}
+            // One prefix lookup per typed word, then intersect the (sorted) id lists
+            let ids = null;
+            for (const term of terms) {{
+                let matches = searchIndex.prefixes[term.slice(0, searchIndex.prefixLength)] || [];
+                if (term.length > searchIndex.prefixLength) {{
+                    matches = matches.filter(id =>
+                        searchIndex.swimmers[id].k.split(' ').some(token => token.startsWith(term)));
                 }}
+                ids = ids === null ? matches : intersectSorted(ids, matches);
+                if (ids.length === 0) break;
             }}
             
-            return allResults;
+            return ids.map(id => searchIndex.swimmers[id]);
+        }}
+        
+        async function searchResultsView(query) {{
+            const searchIndex = await loadSearchIndex();
+            const swimmers = searchSwimmers(searchIndex, query).slice(0, 20);
+            
+            const rows = [];
+            swimmers.forEach(swimmer => {{
+                swimmer.r.forEach(([eventId, pool, rank, time, points, date]) => {{
+                    rows.push({{
+                        Name: swimmer.n,
+                        Page: swimmer.p,
+                        Gender: swimmer.g,
+                        Event: searchIndex.events[eventId],
+                        Pool: pool,
+                        Pos: rank,
+                        Tid: time,
+                        Poeng: points,
+                        Dato: date
+                    }});
+                }});
+            }});
+            
+            const specs = rows.length === 0 ? [] : [{{
+                id: 'search',
+                title: translations[currentLanguage].searchResults,
+                columns: searchColumns,
+                rows,
+                rowKey: row => `${{row.Page || row.Name}}|${{row.Event}}|${{row.Pool}}`
+            }}];
+            return {{ specs, emptyMessage: translations[currentLanguage].noResultsMessage }};
         }}
         
         function toggleSubtext(event) {{
@@ -1836,6 +3903,11 @@ def generate_html():
             fullText.innerHTML = `${{translations[lang].headerSubtextFull}} <a href="#" class="read-less-link" onclick="toggleSubtext(event)">${{translations[lang].readLess}}</a>`;
             
             document.getElementById('allEvents').textContent = translations[lang].allEvents;
+            document.getElementById('swimmerSearch').placeholder = translations[lang].searchPlaceholder;
+            document.getElementById('statisticsLink').textContent = translations[lang].statisticsLink;
+            document.getElementById('classRecordsLink').textContent = translations[lang].classRecordsLink;
+            document.getElementById('updateNoticeText').textContent = translations[lang].updateAvailable;
+            document.getElementById('updateNoticeReload').textContent = translations[lang].reloadPage;
             document.querySelector('#maleOption + .radio-text').textContent = translations[lang].maleOption;
             document.querySelector('#femaleOption + .radio-text').textContent = translations[lang].femaleOption;
             document.getElementById('latestMaleLabel').textContent = translations[lang].maleOption;
@@ -1870,324 +3942,190 @@ def generate_html():
             filterResults();
         }}
         
-        function filterResults() {{
-            const container = document.getElementById('resultsContainer');
-            container.innerHTML = '';
+        // Computed views (table specs) by filter state, evicted least recently used first.
+        // The data is fixed for the lifetime of the page, so entries never go stale; the
+        // tables they render into are reused by id (see renderTables)
+        const VIEW_CACHE_SIZE = 50;
+        const viewCache = new Map();
+        let requestedViewKey = null;
+        
+        function cachedView(key, build) {{
+            if (viewCache.has(key)) {{
+                const view = viewCache.get(key);
+                viewCache.delete(key);
+                viewCache.set(key, view);
+                return view;
+            }}
             
+            const view = build();
+            viewCache.set(key, view);
+            // A view that failed to load (e.g. the search index while offline) is built again next time
+            Promise.resolve(view).catch(() => viewCache.delete(key));
+            if (viewCache.size > VIEW_CACHE_SIZE) {{
+                viewCache.delete(viewCache.keys().next().value);
+            }}
+            return view;
+        }}
+        
+        // The cache key and builder of the view for the current filter state
+        function currentView() {{
             if (viewMode === 'latest') {{
-                showLatestRegistrations(latestRegistrationsPage);
-                return;
+                const query = {{
+                    filters: latestFilterState(),
+                    sortColumn: latestSortColumn,
+                    sortDirection: latestSortDirection,
+                    page: latestRegistrationsPage,
+                    pageSize: 10
+                }};
+                return [['latest', query, currentLanguage], () => latestRegistrationsView(query)];
+            }}
+            
+            const searchQuery = document.getElementById('swimmerSearch').value.trim();
+            if (searchQuery) {{
+                return [['search', searchQuery, currentLanguage], () => searchResultsView(searchQuery)];
             }}
             
             const selectedEvent = document.getElementById('eventSelect').value;
             const selectedGender = document.querySelector('input[name="gender"]:checked').value;
             
             if (selectedEvent) {{
-                showEventResults(selectedEvent, selectedGender);
-            }} else {{
-                showBestSwimmers();
+                return [['event', selectedEvent, selectedGender, currentLanguage], () => eventResultsView(selectedEvent, selectedGender)];
             }}
+            return [['best', selectedGender, currentLanguage], () => bestSwimmersView(selectedGender)];
         }}
         
-        function showLatestRegistrations(page = 1) {{
-            const container = document.getElementById('resultsContainer');
-            container.innerHTML = '';
-            const allResults = sortLatestRegistrations(filterLatestRegistrations(getAllRegistrations()));
-            
-            if (allResults.length === 0) {{
-                container.innerHTML = `<div class="no-data">${{translations[currentLanguage].noResultsMessage}}</div>`;
-                return;
-            }}
-            
-            const pageSize = 10;
-            const totalPages = Math.max(1, Math.ceil(allResults.length / pageSize));
-            const currentPage = Math.min(Math.max(1, page), totalPages);
-            latestRegistrationsPage = currentPage;
-            
-            const pageResults = allResults.slice((currentPage - 1) * pageSize, currentPage * pageSize);
-            const startRank = (currentPage - 1) * pageSize;
-            
-            const tableDiv = document.createElement('div');
-            tableDiv.className = 'results-table';
-            tableDiv.innerHTML = `
-                <div class="table-header">
-                    <span class="table-header-title">
-                        <span>${{translations[currentLanguage].latestRegistrations}}</span>
-                        <span class="info-icon" data-tooltip="${{translations[currentLanguage].latestRegistrationsInfoTooltip}}" tabindex="0" aria-label="${{translations[currentLanguage].latestRegistrationsInfoTooltip}}"></span>
-                    </span>
-                </div>
-                <div class="table-content">
-                    <table>
-                        <thead>
-                            <tr>
-                                <th class="rank">${{translations[currentLanguage].rankHeader}}</th>
-                                <th class="sortable" data-sort="Name">${{translations[currentLanguage].nameHeader}}${{getSortIndicator('Name')}}</th>
-                                <th class="sortable" data-sort="Event">${{translations[currentLanguage].eventHeader}}${{getSortIndicator('Event')}}</th>
-                                <th class="sortable" data-sort="Pool">${{translations[currentLanguage].poolHeader}}${{getSortIndicator('Pool')}}</th>
-                                <th class="sortable" data-sort="Pos">${{translations[currentLanguage].posHeader}}${{getSortIndicator('Pos')}}</th>
-                                <th class="sortable" data-sort="Tid">${{translations[currentLanguage].timeHeader}}${{getSortIndicator('Tid')}}</th>
-                                <th class="sortable points" data-sort="Poeng">${{translations[currentLanguage].pointsHeader}}${{getSortIndicator('Poeng')}}</th>
-                                <th class="sortable" data-sort="Dato">${{translations[currentLanguage].dateHeader}}${{getSortIndicator('Dato')}}</th>
-                                <th class="sortable" data-sort="Sted">${{translations[currentLanguage].locationHeader}}${{getSortIndicator('Sted')}}</th>
-                            </tr>
-                        </thead>
-                        <tbody>
-                            ${{pageResults.map((row, index) => `
-                                <tr>
-                                    <td class="rank">${{startRank + index + 1}}</td>
-                                    <td>${{row.Name || ''}}</td>
-                                    <td>
-                                        <button type="button" class="event-link" data-event="${{row.Event || ''}}" data-gender="${{row.Gender || ''}}">
-                                            ${{eventTranslations[currentLanguage][row.Event] || row.Event || ''}}
-                                        </button>
-                                    </td>
-                                    <td>${{row.Pool || ''}}</td>
-                                    <td>${{row.Pos || ''}}</td>
-                                    <td>${{row.Tid || ''}}</td>
-                                    <td class="points">${{row.Poeng || ''}}</td>
-                                    <td>${{row.Dato || ''}}</td>
-                                    <td>${{row.Sted || 'Ukjent'}}</td>
-                                </tr>
-                            `).join('')}}
-                        </tbody>
-                    </table>
-                </div>
-                <div class="table-pagination">
-                    <button type="button" class="pagination-btn pagination-prev" ${{currentPage <= 1 ? 'disabled' : ''}}>${{translations[currentLanguage].prevPage}}</button>
-                    <span class="pagination-info">${{translations[currentLanguage].pageLabel}} ${{currentPage}} ${{translations[currentLanguage].pageOf}} ${{totalPages}}</span>
-                    <button type="button" class="pagination-btn pagination-next" ${{currentPage >= totalPages ? 'disabled' : ''}}>${{translations[currentLanguage].nextPage}}</button>
-                </div>
-            `;
-            
-            container.appendChild(tableDiv);
-            
-            tableDiv.querySelectorAll('th.sortable').forEach(th => {{
-                th.addEventListener('click', () => handleLatestSort(th.dataset.sort));
-            }});
+        function filterResults() {{
+            const [key, build] = currentView();
+            const viewKey = JSON.stringify(key);
+            requestedViewKey = viewKey;
             
-            tableDiv.querySelectorAll('.event-link').forEach(btn => {{
-                btn.addEventListener('click', () => navigateToEventRecord(btn.dataset.event, btn.dataset.gender));
+            // Latest registrations views arrive asynchronously; only the last selection is shown
+            Promise.resolve(cachedView(viewKey, build)).then(view => {{
+                if (requestedViewKey !== viewKey) return;
+                if (view.page) {{
+                    latestRegistrationsPage = view.page;
+                }}
+                renderTables(view.specs, view.emptyMessage);
             }});
+        }}
+        
+        function showLatestRegistrations(page = 1) {{
+            latestRegistrationsPage = page;
+            filterResults();
+        }}
+        
+        async function latestRegistrationsView(query) {{
+            const t = translations[currentLanguage];
+            // Pages are shared by both languages
+            const result = await cachedView(JSON.stringify(['latestPage', query]), () => queryRegistrations(query));
             
-            const prevBtn = tableDiv.querySelector('.pagination-prev');
-            const nextBtn = tableDiv.querySelector('.pagination-next');
-            
-            if (prevBtn && currentPage > 1) {{
-                prevBtn.addEventListener('click', () => showLatestRegistrations(currentPage - 1));
-            }}
-            if (nextBtn && currentPage < totalPages) {{
-                nextBtn.addEventListener('click', () => showLatestRegistrations(currentPage + 1));
+            if (result.total === 0) {{
+                return {{ specs: [], emptyMessage: t.noResultsMessage }};
             }}
+            
+            return {{
+                page: result.page,
+                specs: [{{
+                    id: 'latest',
+                    title: t.latestRegistrations,
+                    tooltip: t.latestRegistrationsInfoTooltip,
+                    columns: latestColumns,
+                    rows: result.rows,
+                    rowKey: row => `${{row.Event}}|${{row.Gender}}|${{row.Pool}}|${{row.Pos}}`,
+                    rankOffset: (result.page - 1) * query.pageSize,
+                    sortColumn: query.sortColumn,
+                    sortDirection: query.sortDirection,
+                    pagination: {{ page: result.page, totalPages: result.totalPages }}
+                }}]
+            }};
         }}
         
-        function showBestSwimmers() {{
-            const container = document.getElementById('resultsContainer');
-            const selectedGender = document.querySelector('input[name="gender"]:checked').value;
-            
-            // Collect all results from all events
-            const allMaleResults = [];
-            const allFemaleResults = [];
+        function bestSwimmersView(selectedGender) {{
+            // Collect all results of the selected gender from all events
+            const categories = selectedGender === 'Male' ? ['Male_25m', 'Male_50m'] : ['Female_25m', 'Female_50m'];
+            const allResults = [];
             
             for (const [eventName, eventData] of Object.entries(allData)) {{
-                // Add male results
-                for (const category of ['Male_25m', 'Male_50m']) {{
-                    if (eventData[category]) {{
-                        for (const result of eventData[category]) {{
-                            const resultCopy = {{...result}};
-                            resultCopy.Event = eventName;
-                            resultCopy.Pool = category.endsWith('25m') ? '25m' : '50m';
-                            allMaleResults.push(resultCopy);
-                        }}
-                    }}
-                }}
-                
-                // Add female results
-                for (const category of ['Female_25m', 'Female_50m']) {{
+                for (const category of categories) {{
                     if (eventData[category]) {{
                         for (const result of eventData[category]) {{
                             const resultCopy = {{...result}};
                             resultCopy.Event = eventName;
                             resultCopy.Pool = category.endsWith('25m') ? '25m' : '50m';
-                            allFemaleResults.push(resultCopy);
+                            allResults.push(resultCopy);
                         }}
                     }}
                 }}
             }}
             
             // Sort by points (highest first) and take top 10
-            allMaleResults.sort((a, b) => (b.Poeng || 0) - (a.Poeng || 0));
-            allFemaleResults.sort((a, b) => (b.Poeng || 0) - (a.Poeng || 0));
-            
-            const top10Male = allMaleResults.slice(0, 10);
-            const top10Female = allFemaleResults.slice(0, 10);
-            
-            // Show tables based on selected gender
-            if (selectedGender === 'Male' && top10Male.length > 0) {{
-                const maleTableDiv = document.createElement('div');
-                maleTableDiv.className = 'results-table';
-                maleTableDiv.innerHTML = `
-                    <div class="table-header">
-                        <span class="table-header-title">
-                            <span>${{translations[currentLanguage].top10Men}}</span>
-                            <span class="info-icon" data-tooltip="${{translations[currentLanguage].top10InfoTooltip}}" tabindex="0" aria-label="${{translations[currentLanguage].top10InfoTooltip}}"></span>
-                        </span>
-                    </div>
-                    <div class="table-content">
-                        <table>
-                            <thead>
-                                <tr>
-                                    <th class="rank">${{translations[currentLanguage].rankHeader}}</th>
-                                    <th>${{translations[currentLanguage].nameHeader}}</th>
-                                    <th>${{translations[currentLanguage].eventHeader}}</th>
-                                    <th>${{translations[currentLanguage].poolHeader}}</th>
-                                    <th>${{translations[currentLanguage].timeHeader}}</th>
-                                    <th class="points">${{translations[currentLanguage].pointsHeader}}</th>
-                                    <th>${{translations[currentLanguage].dateHeader}}</th>
-                                    <th>${{translations[currentLanguage].locationHeader}}</th>
-                                </tr>
-                            </thead>
-                            <tbody>
-                                ${{top10Male.map((row, index) => `
-                                    <tr>
-                                        <td class="rank">${{index + 1}}</td>
-                                        <td>${{row.Name || ''}}</td>
-                                        <td>${{eventTranslations[currentLanguage][row.Event] || row.Event || ''}}</td>
-                                        <td>${{row.Pool || ''}}</td>
-                                        <td>${{row.Tid || ''}}</td>
-                                        <td class="points">${{row.Poeng || ''}}</td>
-                                        <td>${{row.Dato || ''}}</td>
-                                        <td>${{row.Sted || 'Ukjent'}}</td>
-                                    </tr>
-                                `).join('')}}
-                            </tbody>
-                        </table>
-                    </div>
-                `;
-                container.appendChild(maleTableDiv);
-            }}
-            
-            if (selectedGender === 'Female' && top10Female.length > 0) {{
-                const femaleTableDiv = document.createElement('div');
-                femaleTableDiv.className = 'results-table';
-                femaleTableDiv.innerHTML = `
-                    <div class="table-header">
-                        <span class="table-header-title">
-                            <span>${{translations[currentLanguage].top10Women}}</span>
-                            <span class="info-icon" data-tooltip="${{translations[currentLanguage].top10InfoTooltip}}" tabindex="0" aria-label="${{translations[currentLanguage].top10InfoTooltip}}"></span>
-                        </span>
-                    </div>
-                    <div class="table-content">
-                        <table>
-                            <thead>
-                                <tr>
-                                    <th class="rank">${{translations[currentLanguage].rankHeader}}</th>
-                                    <th>${{translations[currentLanguage].nameHeader}}</th>
-                                    <th>${{translations[currentLanguage].eventHeader}}</th>
-                                    <th>${{translations[currentLanguage].poolHeader}}</th>
-                                    <th>${{translations[currentLanguage].timeHeader}}</th>
-                                    <th class="points">${{translations[currentLanguage].pointsHeader}}</th>
-                                    <th>${{translations[currentLanguage].dateHeader}}</th>
-                                    <th>${{translations[currentLanguage].locationHeader}}</th>
-                                </tr>
-                            </thead>
-                            <tbody>
-                                ${{top10Female.map((row, index) => `
-                                    <tr>
-                                        <td class="rank">${{index + 1}}</td>
-                                        <td>${{row.Name || ''}}</td>
-                                        <td>${{eventTranslations[currentLanguage][row.Event] || row.Event || ''}}</td>
-                                        <td>${{row.Pool || ''}}</td>
-                                        <td>${{row.Tid || ''}}</td>
-                                        <td class="points">${{row.Poeng || ''}}</td>
-                                        <td>${{row.Dato || ''}}</td>
-                                        <td>${{row.Sted || 'Ukjent'}}</td>
-                                    </tr>
-                                `).join('')}}
-                            </tbody>
-                        </table>
-                    </div>
-                `;
-                container.appendChild(femaleTableDiv);
-            }}
-            
-
-        }}
-        
-        function showEventResults(selectedEvent, selectedGender) {{
-            const container = document.getElementById('resultsContainer');
+            allResults.sort((a, b) => (b.Poeng || 0) - (a.Poeng || 0));
+            const top10 = allResults.slice(0, 10);
             
+            const specs = top10.length === 0 ? [] : [{{
+                id: `best-${{selectedGender}}`,
+                title: selectedGender === 'Male' ? translations[currentLanguage].top10Men : translations[currentLanguage].top10Women,
+                tooltip: translations[currentLanguage].top10InfoTooltip,
+                columns: bestColumns,
+                rows: top10,
+                rowKey: row => `${{row.Event}}|${{row.Pool}}|${{row.Name}}`
+            }}];
+            return {{ specs }};
+        }}
+        
+        function eventResultsView(selectedEvent, selectedGender) {{
             const eventData = allData[selectedEvent];
             if (!eventData) {{
-                container.innerHTML = `<div class="no-data">${{translations[currentLanguage].noResultsMessage}}</div>`;
-                return;
+                return {{ specs: [], emptyMessage: translations[currentLanguage].noResultsMessage }};
             }}
             
-            // Determine which categories to show based on selected gender
-            const categories = [];
-            if (selectedGender === 'Male') {{
-                categories.push('Male_25m');
-                categories.push('Male_50m');
-            }}
-            if (selectedGender === 'Female') {{
-                categories.push('Female_25m');
-                categories.push('Female_50m');
-            }}
+            // Determine which categories to show based on selected gender (25m first, then 50m)
+            const categories = selectedGender === 'Male' ? ['Male_25m', 'Male_50m'] : ['Female_25m', 'Female_50m'];
             
-            // Show 25m first, then 50m
-            categories.forEach(category => {{
-                const data = eventData[category];
-                if (data && data.length > 0) {{
+            const specs = categories
+                .filter(category => eventData[category] && eventData[category].length > 0)
+                .map(category => {{
                     const gender = category.startsWith('Male') ? translations[currentLanguage].men : translations[currentLanguage].women;
                     const pool = category.endsWith('25m') ? '25m' : '50m';
-                    
-                    const tableDiv = document.createElement('div');
-                    tableDiv.className = 'results-table';
-                    
-                    tableDiv.innerHTML = `
-                        <div class="table-header">
-                            <span>${{eventTranslations[currentLanguage][selectedEvent] || selectedEvent}} - ${{gender}} ${{pool}}</span>
-                        </div>
-                        <div class="table-content">
-                            <table>
-                                <thead>
-                                    <tr>
-                                        <th class="rank">${{translations[currentLanguage].rankHeader}}</th>
-                                        <th>${{translations[currentLanguage].nameHeader}}</th>
-                                        <th>${{translations[currentLanguage].timeHeader}}</th>
-                                        <th class="points">${{translations[currentLanguage].pointsHeader}}</th>
-                                        <th>${{translations[currentLanguage].dateHeader}}</th>
-                                        <th>${{translations[currentLanguage].locationHeader}}</th>
-                                    </tr>
-                                </thead>
-                                <tbody>
-                                    ${{data.map((row, index) => `
-                                        <tr>
-                                            <td class="rank">${{index + 1}}</td>
-                                            <td>${{row.Name || ''}}</td>
-                                            <td>${{row.Tid || ''}}</td>
-                                            <td class="points">${{row.Poeng || ''}}</td>
-                                            <td>${{row.Dato || ''}}</td>
-                                            <td>${{row.Sted || 'Ukjent'}}</td>
-                                        </tr>
-                                    `).join('')}}
-                                </tbody>
-                            </table>
-
-                        </div>
-                    `;
-                    
-                    container.appendChild(tableDiv);
-                }}
-            }});
+                    return {{
+                        id: `event-${{category}}`,
+                        title: `${{eventTranslations[currentLanguage][selectedEvent] || selectedEvent}} - ${{gender}} ${{pool}}`,
+                        columns: eventColumns,
+                        rows: eventData[category],
+                        rowKey: row => row.Name || ''
+                    }};
+                }});
             
             // Show message if no results found for the selected filters
-            if (container.children.length === 0) {{
-                container.innerHTML = `<div class="no-data">${{translations[currentLanguage].noResultsMessage}}</div>`;
-            }}
+            return {{ specs, emptyMessage: translations[currentLanguage].noResultsMessage }};
         }}
         
+        // One delegated listener for the event links, sortable headers and pagination in every table
+        document.getElementById('resultsContainer').addEventListener('click', event => {{
+            const eventLink = event.target.closest('.event-link');
+            if (eventLink) {{
+                navigateToEventRecord(eventLink.dataset.event, eventLink.dataset.gender);
+                return;
+            }}
+            
+            const sortHeader = event.target.closest('th.sortable');
+            if (sortHeader) {{
+                handleLatestSort(sortHeader.dataset.sort);
+                return;
+            }}
+            
+            const pageButton = event.target.closest('.pagination-btn');
+            if (pageButton && !pageButton.disabled) {{
+                showLatestRegistrations(latestRegistrationsPage + Number(pageButton.dataset.step));
+            }}
+        }});
+        
         // Add event listeners
-        document.getElementById('eventSelect').addEventListener('change', filterResults);
+        document.getElementById('eventSelect').addEventListener('change', () => {{
+            document.getElementById('swimmerSearch').value = '';
+            filterResults();
+        }});
+        document.getElementById('swimmerSearch').addEventListener('input', filterResults);
         document.querySelectorAll('input[name="gender"]').forEach(radio => {{
             radio.addEventListener('change', filterResults);
         }});
@@ -2215,6 +4153,7 @@ def generate_html():
         
         // Add logo click event to return to best swimmers view
         document.querySelector('.logo').addEventListener('click', function() {{
+            document.getElementById('swimmerSearch').value = '';
             document.getElementById('eventSelect').value = '';
             document.getElementById('maleOption').checked = true;
             latestRegistrationsPage = 1;
@@ -2227,6 +4166,7 @@ def generate_html():
         
         // Update dropdown options and radio button labels
         document.getElementById('allEvents').textContent = translations[currentLanguage].allEvents;
+        document.getElementById('swimmerSearch').placeholder = translations[currentLanguage].searchPlaceholder;
         document.querySelector('#maleOption + .radio-text').textContent = translations[currentLanguage].maleOption;
         document.querySelector('#femaleOption + .radio-text').textContent = translations[currentLanguage].femaleOption;
         document.getElementById('latestMaleLabel').textContent = translations[currentLanguage].maleOption;
@@ -2243,19 +4183,96 @@ def generate_html():
         fullText.innerHTML = `${{translations[currentLanguage].headerSubtextFull}} <a href="#" class="read-less-link" onclick="toggleSubtext(event)">${{translations[currentLanguage].readLess}}</a>`;
         
         // Initial load
+        startRegistrationsWorker();
         filterResults();
+        
+        // Offline cache with background data updates (sw.js)
+        if ('serviceWorker' in navigator) {{
+            navigator.serviceWorker.register('sw.js');
+            // sw.js posts tslk-updated after it has cached new data; offer a reload
+            navigator.serviceWorker.addEventListener('message', event => {{
+                if (event.data && event.data.type === 'tslk-updated') {{
+                    document.getElementById('updateNotice').hidden = false;
+                }}
+            }});
+        }}
     </script>
 </body>
 </html>"""
+        record["rows_out"] = len(html_content)
+    
+    with stage("site_render", rows_in=len(statistics_events), file='statistics.html') as record:
+        statistics_content = generate_statistics_page(statistics, latest_date, logo_html)
+        record["rows_out"] = len(statistics_content)
+    
+    with stage("site_render", rows_in=sum(len(rows) for rows in records_data.values()), file='records.html') as record:
+        records_events = group_records_by_event(records_data, progression_data.get('ClubRecords'))
+        records_content = generate_records_page(records_events, latest_date, logo_html)
+        record["rows_out"] = len(records_content)
     
-    # Write main HTML file
-    with open('index.html', 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    # Write output files, skipping those whose content has not changed
+    with stage("site_write", rows_in=len(swimmer_results)) as record:
+        # Styles and scripts go to hashed files in assets/; only the data stays inline
+        if brotli is None:
+            print("⚠️  brotli is not installed: assets get .gz but no .br siblings (pip install -r requirements.txt)")
+        html_content = externalize_assets(html_content, 'index', build,
+                                          r'^ *const (?:events|searchIndexUrl|latestBitsets|latestUpdateDate) = .*$')
+        statistics_content = externalize_assets(statistics_content, 'statistics', build, r'^ *const analytics = .*$')
+        write_output('index.html', html_content, build)
+        write_output('statistics.html', statistics_content, build)
+        write_output('records.html', records_content, build)
+        generate_data_shards(all_data, events, build)
+        generate_search_index(search_index, build)
+        write_output(os.path.join('data', 'analytics.json'), json.dumps(statistics['analytics'], ensure_ascii=False, sort_keys=True), build)
+        records_page_count = generate_records_pages(records_events, latest_date, build, logo_variants=logo_variants)
+        swimmer_page_count = generate_swimmer_pages(swimmer_results, swimmer_slugs, latest_date, build,
+                                                    logo_variants=logo_variants,
+                                                    personal_bests=progression_data.get('PersonalBests'))
+        generate_service_worker(build)
+        
+        payload_report = build_payload_report(html_content, statistics_content, records_content, build)
+        write_output(PAYLOAD_REPORT, json.dumps(payload_report, indent=2), build)
+        finish_build(build)
+        record["rows_out"] = len(build['written'])
     
     print(f"Website generated successfully!")
-    print(f"HTML files: index.html")
+    print(f"HTML files: index.html, statistics.html, records.html, {records_page_count} event records pages in records/, "
+          f"{swimmer_page_count} swimmer pages in swimmers/")
     print(f"Data loaded from {len(all_data)} events")
     print(f"Latest update: {latest_date}")
+    
+    budgets = load_payload_budgets()
+    print_payload_report(payload_report, budgets)
+    violations = check_payload_budgets(payload_report, budgets)
+    if violations:
+        print(f"\n❌ Payload over budget ({PAYLOAD_BUDGETS_FILE}):")
+        for violation in violations:
+            print(f"  - {violation}")
+        if enforce_budgets:
+            raise PayloadBudgetError(violations)
+    else:
+        print(f"✅ Payload within budget")
 
 if __name__ == "__main__":
-    generate_html() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Generate the TSLK website from the EndResult and Statistics files")
+    parser.add_argument("--report", metavar="PATH",
+                        help="Write a JSON run report with per-stage timing and memory to PATH")
+    parser.add_argument("--summary", action="store_true", help="Print a per-stage summary table")
+    parser.add_argument("--profile", action="store_true",
+                        help="Run under cProfile, write a .prof and .collapsed file to ../profiles/ and print the top functions")
+    args = parser.parse_args()
+    
+    if args.report or args.summary:
+        start_run("generate_website")
+    success = True
+    try:
+        if args.profile:
+            run_profiled(generate_html, "generate_website", output_folder=os.path.join("..", "profiles"))
+        else:
+            generate_html()
+    except PayloadBudgetError:
+        success = False
+    finish_run(args.report, summary=args.summary)
+    
+    if not success:
+        sys.exit(1) 
\ No newline at end of file